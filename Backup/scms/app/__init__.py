@@ -4,7 +4,7 @@ from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
 from flask_talisman import Talisman
-from flask_ldap3_login import LDAP3LoginManager
+from sqlalchemy import event
 from config import Config
 
 db = SQLAlchemy()
@@ -12,7 +12,14 @@ migrate = Migrate()
 login = LoginManager()
 csrf = CSRFProtect()
 talisman = Talisman()
-ldap_manager = LDAP3LoginManager()
+
+def set_sqlite_journal_mode(engine, mode):
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_journal_mode(dbapi_connection, connection_record):
+        dbapi_connection.execute(f'PRAGMA journal_mode={mode}')
 
 def create_app(config_class=Config):
     app = Flask(__name__)
@@ -23,20 +30,59 @@ def create_app(config_class=Config):
     login.init_app(app)
     csrf.init_app(app)
     talisman.init_app(app)
-    ldap_manager.init_app(app)
 
     login.login_view = 'main.login'
 
     @login.user_loader
     def load_user(user_id):
-        from app.models import User
-        return User.query.get(int(user_id))
+        from app import identity
+        return identity.load_user(int(user_id))
 
     with app.app_context():
+        if app.config.get('SQLITE_JOURNAL_MODE'):
+            set_sqlite_journal_mode(db.engine, app.config['SQLITE_JOURNAL_MODE'])
+
         from app.routes import bp as main_bp
         app.register_blueprint(main_bp)
 
         from app.routes.bookings import bp as bookings_bp
         app.register_blueprint(bookings_bp, url_prefix='/bookings')
 
+        from app import dashboard
+        dashboard.init_app(app)
+
+        from app import conditional
+        conditional.init_app(app)
+
+        from app import template_cache
+        template_cache.init_app(app)
+
+        from app import identity
+        identity.init_app(app)
+
+        from app import ldap_auth
+        ldap_auth.init_app(app)
+
+        from app import sql_profile
+        sql_profile.init_app(app)
+
+        from app import compression
+        compression.init_app(app)
+
+        from app import assets
+        assets.init_app(app)
+
+        from app.commands import create_admin, rebuild_search_index, rebuild_booking_stats, seed, bulk_certificates, worker, restore_backup, import_attachments, import_bookings, export, build_assets
+        app.cli.add_command(create_admin)
+        app.cli.add_command(rebuild_search_index)
+        app.cli.add_command(rebuild_booking_stats)
+        app.cli.add_command(seed)
+        app.cli.add_command(bulk_certificates)
+        app.cli.add_command(worker)
+        app.cli.add_command(restore_backup)
+        app.cli.add_command(import_attachments)
+        app.cli.add_command(import_bookings)
+        app.cli.add_command(export)
+        app.cli.add_command(build_assets)
+
     return app
\ No newline at end of file
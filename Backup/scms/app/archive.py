@@ -0,0 +1,168 @@
+import fnmatch
+import gzip
+import os
+import queue
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_EXCLUDE = (
+    '.git', '__pycache__', '.pytest_cache', 'node_modules', 'venv', '.venv',
+    'uploads', 'backups', 'database_backups',
+    '*.pyc', '*.pyo', '*.zip', '*.tar.gz', '*.partial',
+    # Live databases are added from a consistent snapshot instead.
+    '*.db', '*.db-wal', '*.db-shm', '*.db-journal',
+    # Secrets and logs never leave the server in a backup or a download.
+    '.env', '*.pem', '*.key', 'certs', 'instance', 'logs', '*.log', '*.log.*',
+)
+BLOCK_SIZE = 1024 * 1024
+
+
+class ArchiveRules:
+    """Decides which paths under the archive root are included.
+
+    A pattern without a slash matches a file or directory name at any
+    depth; one with a slash matches the path relative to the root.
+    Excluded directories are not descended into. ``skip_paths`` are
+    absolute paths left out whatever the patterns say, such as the backup
+    folder and the archive being written.
+    """
+
+    def __init__(self, include=None, exclude=DEFAULT_EXCLUDE, skip_paths=()):
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.skip_paths = {os.path.realpath(path) for path in skip_paths}
+
+    @staticmethod
+    def _matches(patterns, relpath):
+        name = relpath.rsplit('/', 1)[-1]
+        return any(fnmatch.fnmatch(relpath if '/' in pattern else name, pattern) for pattern in patterns)
+
+    def excluded(self, relpath, path):
+        return os.path.realpath(path) in self.skip_paths or self._matches(self.exclude, relpath)
+
+    def included(self, relpath):
+        return not self.include or self._matches(self.include, relpath)
+
+
+def iter_files(root, rules):
+    """Yield (relative path, absolute path) for every archived file, in a stable order."""
+    for directory, dirnames, filenames in os.walk(root):
+        reldir = os.path.relpath(directory, root).replace(os.sep, '/')
+        prefix = '' if reldir == '.' else reldir + '/'
+        dirnames[:] = sorted(d for d in dirnames
+                             if not rules.excluded(prefix + d, os.path.join(directory, d)))
+        for filename in sorted(filenames):
+            relpath = prefix + filename
+            path = os.path.join(directory, filename)
+            if os.path.isfile(path) and not rules.excluded(relpath, path) and rules.included(relpath):
+                yield relpath, path
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _BlockSink:
+    # Write-only file object for tarfile: cuts the stream into blocks and
+    # hands each one to the compressor pool. put() blocks while the window
+    # is full, which is what keeps memory flat.
+    def __init__(self, executor, out, level, cancelled, block_size):
+        self.executor = executor
+        self.out = out
+        self.level = level
+        self.cancelled = cancelled
+        self.block_size = block_size
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            self._submit(bytes(self.buffer[:self.block_size]))
+            del self.buffer[:self.block_size]
+        return len(data)
+
+    def close(self):
+        if self.buffer:
+            self._submit(bytes(self.buffer))
+            self.buffer = bytearray()
+
+    def _submit(self, block):
+        self.put(self.executor.submit(gzip.compress, block, self.level, mtime=0))
+
+    def put(self, item):
+        while True:
+            if self.cancelled.is_set():
+                raise _Cancelled()
+            try:
+                self.out.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+def stream_archive(files, workers=None, level=6, block_size=BLOCK_SIZE, progress=None):
+    """Yield a .tar.gz of ``files`` ((archive name, path) pairs) as it is built.
+
+    The tar stream is cut into ``block_size`` blocks that are compressed
+    on ``workers`` threads as independent gzip members (the output reads
+    back like any .tar.gz). At most a few blocks per worker are in flight,
+    so memory stays constant however large the tree or its files are.
+    ``files`` is iterated on a background thread; ``progress(name, size)``
+    is called from the consuming thread once each file has been yielded.
+    """
+    workers = workers or os.cpu_count() or 1
+    out = queue.Queue(maxsize=workers * 2)
+    cancelled = threading.Event()
+    failure = []
+    done = object()
+
+    def produce(executor):
+        sink = _BlockSink(executor, out, level, cancelled, block_size)
+        try:
+            try:
+                with tarfile.open(fileobj=sink, mode='w|', format=tarfile.PAX_FORMAT) as tar:
+                    for name, path in files:
+                        tar.add(path, arcname=name, recursive=False)
+                        sink.put((name, os.path.getsize(path)))
+                sink.close()
+            except _Cancelled:
+                raise
+            except BaseException as e:
+                failure.append(e)
+            sink.put(done)
+        except _Cancelled:
+            pass
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        producer = threading.Thread(target=produce, args=(executor,), daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = out.get()
+                if item is done:
+                    break
+                if isinstance(item, tuple):
+                    if progress:
+                        progress(*item)
+                    continue
+                yield item.result()
+        finally:
+            cancelled.set()
+            producer.join()
+    if failure:
+        raise failure[0]
+
+
+def write_archive(files, path, workers=None, level=6, progress=None):
+    """Write the archive to ``path`` via a temporary name; returns its size."""
+    partial = path + '.partial'
+    try:
+        with open(partial, 'wb') as f:
+            for block in stream_archive(files, workers=workers, level=level, progress=progress):
+                f.write(block)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return os.path.getsize(path)
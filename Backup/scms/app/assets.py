@@ -0,0 +1,106 @@
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import abort, current_app, request, send_file, url_for
+from werkzeug.security import safe_join
+
+from app.compression import COMPRESSIBLE, choose_encoding, compress, encodings
+
+MANIFEST = 'manifest.json'
+# Fingerprinted names change with their content, so a cached copy can never go stale.
+MAX_AGE = 365 * 24 * 3600
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+# A precompressed copy is kept only when it saves at least this share of the bytes.
+MIN_SAVING = 0.1
+
+
+def fingerprinted(name, digest):
+    root, ext = os.path.splitext(name)
+    return f'{root}.{digest[:12]}{ext}'
+
+
+def build_assets(source, target):
+    """Copy every file under ``source`` to ``target`` under a content-hashed name.
+
+    Text assets also get .br (when Brotli is installed) and .gz siblings
+    compressed at the highest level, once, instead of per request. Files
+    from earlier builds are kept, so pages rendered by workers still on
+    the old manifest keep working during a deploy. Returns the manifest
+    ({logical name: fingerprinted name}) and the bytes written.
+    """
+    manifest, written = {}, 0
+    target = os.path.abspath(target)
+    for root, dirs, files in os.walk(source):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != target)
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, source).replace(os.sep, '/')
+            with open(path, 'rb') as f:
+                data = f.read()
+            built = fingerprinted(name, hashlib.sha256(data).hexdigest())
+            manifest[name] = built
+            output = os.path.join(target, built)
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+            outputs = {output: data}
+            if mimetypes.guess_type(filename)[0] in COMPRESSIBLE:
+                for encoding in encodings():
+                    compressed = compress(data, encoding)
+                    if len(compressed) <= len(data) * (1 - MIN_SAVING):
+                        outputs[output + SUFFIXES[encoding]] = compressed
+            for output_path, content in outputs.items():
+                if not os.path.exists(output_path):
+                    with open(output_path, 'wb') as f:
+                        f.write(content)
+                    written += len(content)
+    partial = os.path.join(target, MANIFEST + '.partial')
+    with open(partial, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(partial, os.path.join(target, MANIFEST))
+    return manifest, written
+
+
+def load_manifest(folder):
+    try:
+        with open(os.path.join(folder, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def asset_url(filename):
+    """URL of a static file: its fingerprinted build when one exists, else the plain /static one."""
+    built = current_app.extensions['assets'].get(filename)
+    if built is None:
+        return url_for('static', filename=filename)
+    return url_for('asset', filename=built)
+
+
+def send_asset(filename):
+    folder = current_app.config['ASSET_BUILD_FOLDER']
+    path = safe_join(folder, filename)
+    if path is None or filename == MANIFEST or not os.path.isfile(path):
+        abort(404)
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is not None and os.path.isfile(path + SUFFIXES[encoding]):
+        path += SUFFIXES[encoding]
+    else:
+        encoding = None
+    response = send_file(path, mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                         conditional=True, max_age=MAX_AGE)
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    if mimetypes.guess_type(filename)[0] in COMPRESSIBLE:
+        response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_app(app):
+    app.config['ASSET_BUILD_FOLDER'] = app.config.get('ASSET_BUILD_FOLDER') or os.path.join(app.root_path, 'static_build')
+    # Read once per worker; run `flask build-assets` before starting (or restarting) the workers.
+    app.extensions['assets'] = load_manifest(app.config['ASSET_BUILD_FOLDER'])
+    app.add_url_rule('/assets/<path:filename>', 'asset', send_asset)
+    app.add_template_global(asset_url)
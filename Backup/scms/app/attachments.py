@@ -0,0 +1,101 @@
+import hashlib
+import mimetypes
+import os
+import tempfile
+
+from flask import current_app, request, send_file
+from werkzeug.utils import secure_filename
+
+READ_SIZE = 64 * 1024
+# Objects are named by their content, so a cached copy can never go stale.
+MAX_AGE = 365 * 24 * 3600
+
+
+class AttachmentStore:
+    """Booking attachments kept once per distinct content.
+
+    Layout under ``root``::
+
+        ab/abcdef...   file contents, named by their sha256
+
+    Two uploads with the same bytes share one object and uploads that
+    merely share a name no longer overwrite each other.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.tmp_dir = os.path.join(root, 'tmp')
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def save(self, stream):
+        """Copy ``stream`` into the store, hashing it on the way; returns (digest, size)."""
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, partial = tempfile.mkstemp(dir=self.tmp_dir, suffix='.partial')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for block in iter(lambda: stream.read(READ_SIZE), b''):
+                    digest.update(block)
+                    f.write(block)
+                    size += len(block)
+            digest = digest.hexdigest()
+            path = self.path(digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        return digest, size
+
+    def exists(self, digest):
+        return os.path.isfile(self.path(digest))
+
+
+def attachment_store():
+    root = current_app.config.get('ATTACHMENT_FOLDER') or os.path.join(current_app.config['UPLOAD_FOLDER'], 'objects')
+    return AttachmentStore(root)
+
+
+def save_attachment(booking, file_storage):
+    """Store an uploaded FileStorage and point ``booking`` at it."""
+    digest, size = attachment_store().save(file_storage.stream)
+    booking.attachment_filename = secure_filename(file_storage.filename)
+    booking.attachment_sha256 = digest
+    current_app.logger.info(f"Stored attachment {booking.attachment_filename} as {digest} ({size} bytes)")
+    return digest
+
+
+def send_attachment(digest, download_name):
+    """Serve a stored object with a strong ETag and immutable caching.
+
+    With ATTACHMENT_ACCEL_PREFIX set the body is left to nginx through
+    X-Accel-Redirect (an ``internal`` location aliased to the store);
+    with USE_X_SENDFILE Flask hands it to the front end through
+    X-Sendfile. Otherwise werkzeug answers conditional and Range
+    requests itself and passes the open file to the server's
+    wsgi.file_wrapper, which gunicorn sends with sendfile().
+    """
+    store = attachment_store()
+    if not store.exists(digest):
+        return None
+    prefix = current_app.config.get('ATTACHMENT_ACCEL_PREFIX')
+    if prefix:
+        mimetype = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+        response = current_app.response_class(mimetype=mimetype)
+        response.set_etag(digest)
+        response.headers['Content-Disposition'] = f'inline; filename="{download_name}"'
+        response.headers['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{digest[:2]}/{digest}"
+        response = response.make_conditional(request)
+    else:
+        response = send_file(store.path(digest), download_name=download_name, etag=digest,
+                             conditional=True, max_age=MAX_AGE)
+    # Login-protected, so only the browser may keep a copy.
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = MAX_AGE
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+MANIFEST_NAME = 'manifest.jsonl'
+
+
+class BackupError(Exception):
+    pass
+
+
+class _Restarted(Exception):
+    pass
+
+
+def online_backup(source_path, target_path, pages=256, pause=0.01, max_restarts=3):
+    """Copy a live SQLite database with the online backup API.
+
+    Pages are copied ``pages`` at a time with a ``pause`` between steps so
+    the copy never holds the database for long. In WAL mode the source
+    keeps one read transaction open for the whole copy: the backup sees a
+    single snapshot and writers carry on unaffected. With a rollback
+    journal every write from another connection restarts the copy, so
+    after ``max_restarts`` the rest is copied in one step, which blocks
+    writers for as long as that step takes.
+    """
+    stats = {'steps': 0, 'restarts': 0, 'pages': 0}
+
+    def progress(status, remaining, total):
+        stats['steps'] += 1
+        stats['pages'] = total
+        if remaining > progress.remaining:
+            stats['restarts'] += 1
+            if stats['restarts'] > max_restarts:
+                raise _Restarted()
+        progress.remaining = remaining
+        if remaining and pause:
+            time.sleep(pause)
+    progress.remaining = float('inf')
+
+    started = time.perf_counter()
+    source = sqlite3.connect(source_path, isolation_level=None)
+    target = sqlite3.connect(target_path)
+    try:
+        stats['journal_mode'] = source.execute('PRAGMA journal_mode').fetchone()[0]
+        if stats['journal_mode'] == 'wal':
+            source.execute('BEGIN')
+            source.execute('SELECT count(*) FROM sqlite_master').fetchone()
+        try:
+            source.backup(target, pages=pages, progress=progress)
+        except _Restarted:
+            source.backup(target, pages=-1)
+            stats['steps'] += 1
+        if source.in_transaction:
+            source.execute('COMMIT')
+        # The copy inherits WAL mode; a backup should be a single self-contained file.
+        target.execute('PRAGMA journal_mode=DELETE')
+    finally:
+        target.close()
+        source.close()
+    stats['duration'] = time.perf_counter() - started
+    return stats
+
+
+def integrity_check(path):
+    connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        rows = [row[0] for row in connection.execute('PRAGMA integrity_check')]
+    finally:
+        connection.close()
+    return 'ok' if rows == ['ok'] else '; '.join(rows)
+
+
+def file_checksum(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def append_manifest(directory, entry):
+    with open(os.path.join(directory, MANIFEST_NAME), 'a') as f:
+        f.write(json.dumps(entry, sort_keys=True) + '\n')
+
+
+def read_manifest(directory):
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def create_backup(database_path, directory, backup_type, pages=256, pause=0.01, max_restarts=3):
+    """Back up ``database_path`` into ``directory`` and record it in the manifest.
+
+    The copy is written under a temporary name and only renamed into place
+    once ``PRAGMA integrity_check`` passes, so a listed backup is always
+    complete. Returns the manifest entry.
+    """
+    os.makedirs(directory, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f'{backup_type}_backup_{timestamp}.db'
+    backup_path = os.path.join(directory, filename)
+    partial_path = backup_path + '.partial'
+
+    try:
+        stats = online_backup(database_path, partial_path, pages, pause, max_restarts)
+        integrity = integrity_check(partial_path)
+        if integrity != 'ok':
+            raise BackupError(f'Integrity check failed for {filename}: {integrity}')
+        os.replace(partial_path, backup_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+    entry = {
+        'filename': filename,
+        'type': backup_type,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'source': os.path.abspath(database_path),
+        'size': os.path.getsize(backup_path),
+        'sha256': file_checksum(backup_path),
+        'duration': round(stats['duration'], 3),
+        'pages': stats['pages'],
+        'steps': stats['steps'],
+        'restarts': stats['restarts'],
+        'journal_mode': stats['journal_mode'],
+        'integrity': integrity,
+    }
+    append_manifest(directory, entry)
+    return entry
@@ -0,0 +1,276 @@
+import csv
+import io
+import os
+import re
+import time
+import zipfile
+from datetime import date, datetime, timedelta
+from xml.etree.ElementTree import iterparse
+
+from flask import current_app
+
+from app import db
+from app.dashboard import invalidate_snapshot
+from app.exports import FORMULA_PREFIXES
+from app.template_cache import invalidate_fragments
+from app.models import Booking, ReferenceSequence
+
+STATUSES = ('pending', 'approved', 'completed', 'cancelled')
+# Column name -> longest value the booking table takes.
+TEXT_COLUMNS = {'client_name': 100, 'email': 120, 'mobile_number': 20, 'organization_name': 100, 'address': 255}
+REQUIRED = ('client_name', 'email', 'mobile_number', 'booking_date')
+HEADER_ALIASES = {
+    'name': 'client_name', 'client': 'client_name',
+    'email_address': 'email', 'e_mail': 'email',
+    'mobile': 'mobile_number', 'phone': 'mobile_number', 'phone_number': 'mobile_number',
+    'organization': 'organization_name', 'organisation': 'organization_name',
+    'organisation_name': 'organization_name',
+    'date': 'booking_date', 'training': 'training_date',
+}
+COLUMNS = ('client_name', 'email', 'mobile_number', 'booking_date', 'training_date', 'status',
+           'organization_name', 'address')
+EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+EXCEL_EPOCH = date(1899, 12, 30)
+
+_SHEET = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_RELATIONSHIP = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
+
+class ImportFileError(Exception):
+    """The file as a whole cannot be imported (unreadable, or missing required columns)."""
+
+
+class ImportResult:
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        verb = 'valid' if self.dry_run else 'imported'
+        return (f'{self.rows} rows read, {self.imported} {verb}, {self.failed} rejected '
+                f'in {self.elapsed:.2f}s ({self.rows_per_second:.0f} rows/s).')
+
+
+def _column_name(header):
+    name = re.sub(r'[^a-z0-9]+', '_', str(header or '').strip().lower()).strip('_')
+    return HEADER_ALIASES.get(name, name)
+
+
+def _csv_rows(stream):
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        for number, row in enumerate(csv.reader(text), start=1):
+            # Undo the ' that exports put before formula-like text.
+            yield number, [value[1:] if value[:1] == "'" and value[1:].startswith(FORMULA_PREFIXES) else value
+                   for value in row]
+    finally:
+        text.detach()
+
+
+def _cell_column(reference):
+    column = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        column = column * 26 + ord(char.upper()) - 64
+    return column - 1
+
+
+def _shared_strings(archive):
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as f:
+        for _, element in iterparse(f):
+            if element.tag == f'{_SHEET}si':
+                strings.append(''.join(t.text or '' for t in element.iter(f'{_SHEET}t')))
+                element.clear()
+    return strings
+
+
+def _first_sheet(archive):
+    with archive.open('xl/workbook.xml') as f:
+        sheet = next(element for _, element in iterparse(f) if element.tag == f'{_SHEET}sheet')
+    with archive.open('xl/_rels/workbook.xml.rels') as f:
+        for _, element in iterparse(f):
+            if element.get('Id') == sheet.get(_RELATIONSHIP):
+                target = element.get('Target')
+                return target.lstrip('/') if target.startswith('/') else f'xl/{target}'
+    raise ImportFileError('The workbook has no worksheet.')
+
+
+def _cell_value(cell, shared):
+    kind = cell.get('t')
+    if kind == 'inlineStr':
+        return ''.join(t.text or '' for t in cell.iter(f'{_SHEET}t'))
+    value = cell.find(f'{_SHEET}v')
+    if value is None or value.text is None:
+        return None
+    if kind == 's':
+        return shared[int(value.text)]
+    if kind in ('str', 'e'):
+        return value.text
+    if kind == 'b':
+        return value.text == '1'
+    number = float(value.text)
+    return int(number) if number.is_integer() else number
+
+
+def _xlsx_rows(stream):
+    """(row number, values) for the rows of the first worksheet, parsed one row at a time.
+
+    Rows with no cells are left out of the file, so the number comes from
+    the row's own reference rather than a count.
+    """
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        raise ImportFileError('Not a valid .xlsx file.')
+    with archive:
+        shared = _shared_strings(archive)
+        with archive.open(_first_sheet(archive)) as f:
+            sheet_data, number = None, 0
+            for event, element in iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    if element.tag == f'{_SHEET}sheetData':
+                        sheet_data = element
+                    continue
+                if element.tag != f'{_SHEET}row':
+                    continue
+                number = int(element.get('r') or number + 1)
+                values = []
+                for cell in element.iter(f'{_SHEET}c'):
+                    column = _cell_column(cell.get('r', '')) if cell.get('r') else len(values)
+                    values.extend([None] * (column - len(values)))
+                    values.append(_cell_value(cell, shared))
+                # Drop the parsed row so memory stays flat however long the sheet is.
+                sheet_data.remove(element)
+                yield number, values
+
+
+def read_rows(stream, filename):
+    """Yield (row number, {column: value}) from a .csv or .xlsx upload, header row first removed."""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in ('.csv', '.xlsx'):
+        raise ImportFileError('Upload a .csv or .xlsx file.')
+    rows = _xlsx_rows(stream) if extension == '.xlsx' else _csv_rows(stream)
+    _, header = next(rows, (None, None))
+    if header is None:
+        raise ImportFileError('The file is empty.')
+    columns = [_column_name(name) for name in header]
+    missing = [name for name in REQUIRED if name not in columns]
+    if missing:
+        raise ImportFileError(f"Missing column(s): {', '.join(missing)}.")
+    wanted = [(index, name) for index, name in enumerate(columns) if name in COLUMNS]
+    for number, values in rows:
+        if not any(value not in (None, '') for value in values):
+            continue
+        yield number, {name: values[index] if index < len(values) else None for index, name in wanted}
+
+
+def parse_date(value):
+    if value in (None, ''):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, (int, float)):
+        # Excel stores dates as days since 1899-12-30.
+        return EXCEL_EPOCH + timedelta(days=int(value))
+    value = str(value).strip()
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, '%d/%m/%Y').date()
+    except ValueError:
+        return None
+
+
+def validate_row(values, user_id):
+    """Return (row for the booking table, None) or (None, [problems])."""
+    errors = []
+    row = {'user_id': user_id}
+    for name, length in TEXT_COLUMNS.items():
+        value = values.get(name)
+        value = '' if value is None else str(value).strip()
+        if len(value) > length:
+            errors.append(f'{name} is longer than {length} characters')
+        row[name] = value or None
+    for name in ('client_name', 'email', 'mobile_number'):
+        if not row[name]:
+            errors.append(f'{name} is required')
+    if row['email'] and not EMAIL.match(row['email']):
+        errors.append(f"email {row['email']!r} is not an email address")
+
+    booking_date = parse_date(values.get('booking_date'))
+    if booking_date is None:
+        errors.append('booking_date is missing or not a date (YYYY-MM-DD or DD/MM/YYYY)')
+    training_date = parse_date(values.get('training_date'))
+    if training_date is None and values.get('training_date') not in (None, ''):
+        errors.append('training_date is not a date (YYYY-MM-DD or DD/MM/YYYY)')
+    elif training_date is None and booking_date is not None:
+        training_date = booking_date + timedelta(days=30)
+    row['booking_date'], row['training_date'] = booking_date, training_date
+
+    status = str(values.get('status') or 'pending').strip().lower()
+    if status not in STATUSES:
+        errors.append(f"status must be one of {', '.join(STATUSES)}")
+    row['status'] = status
+    row['attachment_filename'] = row['attachment_sha256'] = None
+    return (None, errors) if errors else (row, None)
+
+
+def _insert(batch):
+    ReferenceSequence.number_rows(db.session.connection(), batch)
+    db.session.execute(Booking.__table__.insert(), batch)
+    db.session.commit()
+
+
+def import_bookings(stream, filename, user_id, dry_run=False, batch_size=None, max_errors=None, progress=None):
+    """Validate and insert the bookings in a .csv or .xlsx file.
+
+    The file is read one row at a time. Valid rows are inserted with one
+    executemany per batch and committed batch by batch, so a failure
+    part-way keeps the batches already written; invalid rows are skipped
+    and reported with their row number (the header is row 1). Raises
+    ImportFileError if the file cannot be read at all.
+    """
+    batch_size = batch_size or current_app.config['BOOKING_IMPORT_BATCH_SIZE']
+    max_errors = max_errors if max_errors is not None else current_app.config['BOOKING_IMPORT_MAX_ERRORS']
+    result = ImportResult(dry_run)
+    started = time.perf_counter()
+    batch = []
+    for number, values in read_rows(stream, filename):
+        result.rows += 1
+        row, errors = validate_row(values, user_id)
+        if errors:
+            result.failed += 1
+            if len(result.errors) < max_errors:
+                result.errors.append((number, errors))
+            continue
+        result.imported += 1
+        if not dry_run:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                _insert(batch)
+                batch = []
+        if progress and result.rows % batch_size == 0:
+            progress(result)
+    if batch:
+        _insert(batch)
+    if result.imported and not dry_run:
+        invalidate_snapshot()
+        invalidate_fragments('booking')
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,238 @@
+import multiprocessing
+import os
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from io import BytesIO
+
+from PyPDF2 import PdfReader, PdfWriter
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import landscape, letter
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from sqlalchemy import insert
+from werkzeug.utils import secure_filename
+
+from app import db
+from app.dashboard import invalidate_snapshot
+from app.template_cache import invalidate_fragments
+from app.models import Booking, Certificate
+
+PAGE_SIZE = landscape(letter)
+IMAGE_NAMES = ('logo_left.png', 'logo_right.png', 'watermark.png', 'stamp.png')
+
+_background_lock = threading.Lock()
+_background = {'key': None, 'pdf': None}
+
+
+def draw_background(p, image_dir):
+    # Everything on the certificate that does not depend on the booking.
+    p.setFillColor(colors.white)
+    p.rect(0, 0, 11*inch, 8.5*inch, fill=True)
+
+    logo_left_path = os.path.join(image_dir, 'logo_left.png')
+    logo_right_path = os.path.join(image_dir, 'logo_right.png')
+    logo_size = 1.5*inch  # 1.5 inches is approximately 15% of the page width
+
+    if os.path.exists(logo_left_path):
+        p.drawImage(logo_left_path, 0.5*inch, 7*inch, width=logo_size, height=logo_size, mask='auto')
+    if os.path.exists(logo_right_path):
+        p.drawImage(logo_right_path, 9*inch, 7*inch, width=logo_size, height=logo_size, mask='auto')
+
+    # Add watermark with very low opacity (barely showing)
+    watermark_path = os.path.join(image_dir, 'watermark.png')
+    if os.path.exists(watermark_path):
+        p.saveState()
+        p.setFillAlpha(0.05)  # Set fill opacity to 5%
+        p.drawImage(watermark_path, 1.5*inch, 2*inch, width=8*inch, height=4.5*inch, mask='auto')
+        p.restoreState()
+
+    p.setFont("Helvetica-Bold", 30)
+    p.setFillColor(colors.navy)
+    p.drawCentredString(5.5*inch, 6*inch, "Certificate of Completion")
+
+    p.setFont("Helvetica", 20)
+    p.setFillColor(colors.black)
+    p.drawCentredString(5.5*inch, 5*inch, "This is to certify that")
+    p.drawCentredString(5.5*inch, 3*inch, "has successfully completed the training on")
+
+    stamp_path = os.path.join(image_dir, 'stamp.png')
+    if os.path.exists(stamp_path):
+        p.drawImage(stamp_path, 1*inch, 1*inch, width=2*inch, height=2*inch, mask='auto')
+
+    p.setStrokeColor(colors.black)
+    p.line(7*inch, 1.5*inch, 10*inch, 1.5*inch)
+    p.setFont("Helvetica", 12)
+    p.setFillColor(colors.black)
+    p.drawCentredString(8.5*inch, 1*inch, "Authorized Signature")
+
+
+def draw_details(p, client_name, training_date):
+    p.setFont("Helvetica-Bold", 24)
+    p.setFillColor(colors.darkgreen)
+    p.drawCentredString(5.5*inch, 4*inch, client_name)
+
+    p.setFont("Helvetica-Bold", 22)
+    p.setFillColor(colors.darkred)
+    p.drawCentredString(5.5*inch, 2*inch, str(training_date))
+
+
+def _single_page(draw, *args):
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=PAGE_SIZE)
+    draw(p, *args)
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def _images_signature(image_dir):
+    signature = []
+    for name in IMAGE_NAMES:
+        try:
+            stat = os.stat(os.path.join(image_dir, name))
+            signature.append((name, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((name, None, None))
+    return (image_dir, tuple(signature))
+
+
+def background_pdf(image_dir):
+    """The static certificate layer as PDF bytes, rendered once per process.
+
+    Decoding the PNGs and re-compressing them into the PDF dominates the
+    cost of a certificate, so the layer is rebuilt only when one of the
+    image files changes on disk.
+    """
+    key = _images_signature(image_dir)
+    with _background_lock:
+        if _background['key'] != key:
+            _background['pdf'] = _single_page(draw_background, image_dir)
+            _background['key'] = key
+        return _background['pdf']
+
+
+def render_certificate(client_name, training_date, image_dir):
+    background = PdfReader(BytesIO(background_pdf(image_dir))).pages[0]
+    details = PdfReader(BytesIO(_single_page(draw_details, client_name, training_date))).pages[0]
+
+    writer = PdfWriter()
+    page = writer.add_page(background)
+    page.merge_page(details)
+    buffer = BytesIO()
+    writer.write(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def _render_job(job):
+    booking_id, client_name, training_date, image_dir = job
+    return job, render_certificate(client_name, training_date, image_dir).getvalue()
+
+
+def render_in_pool(jobs, workers=None):
+    """Render (booking_id, client_name, training_date, image_dir) jobs across
+    a process pool, yielding (job, pdf bytes) in submission order.
+
+    Only a bounded window of jobs is in flight, so finished PDFs never pile
+    up in memory while an earlier one is still rendering. Workers are
+    spawned rather than forked so it is safe to call from a web worker.
+    """
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = deque()
+        for job in jobs:
+            pending.append(executor.submit(_render_job, job))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def bulk_certificate_query(training_from=None, training_to=None, organization=None, status='completed'):
+    query = db.session.query(Booking.id, Booking.client_name, Booking.training_date)
+    if status:
+        query = query.filter(Booking.status == status)
+    if training_from:
+        query = query.filter(Booking.training_date >= training_from)
+    if training_to:
+        query = query.filter(Booking.training_date <= training_to)
+    if organization:
+        query = query.filter(Booking.organization_name == organization)
+    return query.order_by(Booking.training_date, Booking.id)
+
+
+class CertificateRecorder:
+    """Collects generated certificates and inserts them in batches."""
+
+    def __init__(self, user_id, achievement, batch_size=500):
+        self.user_id = user_id
+        self.achievement = achievement
+        self.batch_size = batch_size
+        self.count = 0
+        self._rows = []
+
+    def add(self, client_name, training_date):
+        self._rows.append({
+            'client_name': client_name,
+            'achievement': self.achievement,
+            'date': training_date or date.today(),
+            'user_id': self.user_id,
+        })
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            db.session.execute(insert(Certificate), self._rows)
+            db.session.commit()
+            invalidate_snapshot()
+            invalidate_fragments('certificate')
+            self.count += len(self._rows)
+            self._rows = []
+
+
+class _ChunkSink:
+    # Write-only file object for ZipFile; the caller drains it after each entry.
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _archive_name(booking_id, client_name):
+    return f'certificate_{booking_id}_{secure_filename(client_name) or "client"}.pdf'
+
+
+def write_certificate_zip(rows, fileobj, image_dir, recorder, workers=None):
+    """Render every (id, client_name, training_date) row into a ZIP written to
+    ``fileobj``, yielding after each entry so callers can stream or report
+    progress. PDFs are already compressed, so entries are stored as-is.
+    """
+    jobs = ((row.id, row.client_name, row.training_date, image_dir) for row in rows)
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_STORED) as archive:
+        for (booking_id, client_name, training_date, _), pdf in render_in_pool(jobs, workers):
+            archive.writestr(_archive_name(booking_id, client_name), pdf)
+            recorder.add(client_name, training_date)
+            yield booking_id
+    recorder.flush()
+
+
+def stream_certificate_zip(rows, image_dir, recorder, workers=None):
+    sink = _ChunkSink()
+    for _ in write_certificate_zip(rows, sink, image_dir, recorder, workers):
+        yield sink.drain()
+    yield sink.drain()
@@ -1,3 +1,5 @@
+import os
+
 import click
 from flask.cli import with_appcontext
 from .models import User, db
@@ -17,4 +19,174 @@ def create_admin(username, password):
     new_user.password_hash = generate_password_hash(password)
     db.session.add(new_user)
     db.session.commit()
-    click.echo(f'Admin user {username} created successfully.')
\ No newline at end of file
+    click.echo(f'Admin user {username} created successfully.')
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index():
+    from .search import rebuild_search_index as rebuild
+    count = rebuild()
+    click.echo(f'Search index rebuilt for {count} bookings.')
+
+@click.command('rebuild-booking-stats')
+@with_appcontext
+def rebuild_booking_stats():
+    """Recount booking_daily_stats from the booking table."""
+    from .stats import rebuild_daily_stats
+    count = rebuild_daily_stats()
+    click.echo(f'Daily booking statistics rebuilt for {count} bookings.')
+
+@click.command('seed')
+@click.option('--scale', type=click.Choice(['1k', '100k', '1m']), default='1k', show_default=True,
+              help='Number of bookings to generate')
+@click.option('--bookings', type=int, help='Exact number of bookings (overrides --scale)')
+@click.option('--seed', 'random_seed', type=int, default=0, show_default=True, help='Random seed')
+@with_appcontext
+def seed(scale, bookings, random_seed):
+    """Fill the database with synthetic users, bookings, certificates, posts and logs."""
+    from flask import current_app
+    from .seed import SCALES, SEED_PASSWORD, seed_database
+    count = bookings if bookings is not None else SCALES[scale]
+    with click.progressbar(length=count, label='Seeding bookings') as progress:
+        added = seed_database(count, seed=random_seed, achievement=current_app.config['CERTIFICATE_ACHIEVEMENT'],
+                              progress=progress.update)
+    click.echo(', '.join(f'{n} {table}' for table, n in added.items()) + f" added; seeded users sign in with '{SEED_PASSWORD}'.")
+
+@click.command('bulk-certificates')
+@click.option('--from', 'training_from', type=click.DateTime(formats=['%Y-%m-%d']), help='First training date to include')
+@click.option('--to', 'training_to', type=click.DateTime(formats=['%Y-%m-%d']), help='Last training date to include')
+@click.option('--organization', help='Only bookings for this organization')
+@click.option('--status', default='completed', show_default=True, help="Booking status to include ('' for any)")
+@click.option('--output', required=True, type=click.Path(dir_okay=False, writable=True), help='ZIP file to write')
+@click.option('--workers', type=int, default=0, help='Renderer processes (default: one per core)')
+@click.option('--username', required=True, help='User the certificates are recorded against')
+@with_appcontext
+def bulk_certificates(training_from, training_to, organization, status, output, workers, username):
+    from flask import current_app
+    from .certificates import bulk_certificate_query, write_certificate_zip, CertificateRecorder
+
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        click.echo(f'No user named {username}.')
+        return
+
+    rows = bulk_certificate_query(
+        training_from=training_from.date() if training_from else None,
+        training_to=training_to.date() if training_to else None,
+        organization=organization,
+        status=status or None
+    ).all()
+    image_dir = os.path.join(current_app.root_path, 'static', 'images')
+    recorder = CertificateRecorder(user.id, current_app.config['CERTIFICATE_ACHIEVEMENT'])
+    with open(output, 'wb') as fileobj, click.progressbar(length=len(rows), label='Rendering certificates') as progress:
+        for _ in write_certificate_zip(rows, fileobj, image_dir, recorder, workers or None):
+            progress.update(1)
+    click.echo(f'{recorder.count} certificates written to {output}.')
+
+@click.command('worker')
+@click.option('--burst', is_flag=True, help='Exit once the queue is empty')
+@click.option('--max-jobs', type=int, help='Exit after running this many jobs')
+@click.option('--poll-interval', type=float, help='Seconds to wait between polls of an empty queue')
+@with_appcontext
+def worker(burst, max_jobs, poll_interval):
+    from .jobs import work, default_worker_id
+    worker_id = default_worker_id()
+    click.echo(f'Worker {worker_id} started.')
+    processed = work(worker_id, poll_interval=poll_interval, burst=burst, max_jobs=max_jobs)
+    click.echo(f'Worker {worker_id} ran {processed} jobs.')
+
+@click.command('restore-backup')
+@click.argument('snapshot', required=False)
+@click.option('--output', type=click.Path(dir_okay=False, writable=True), help='Database file to write')
+@with_appcontext
+def restore_backup(snapshot, output):
+    """Rebuild SNAPSHOT from the backup store, or list the snapshots."""
+    from .backups import BackupError
+    from .tasks import backup_store
+    store = backup_store()
+    if not snapshot or not output:
+        for snapshot_id in store.list_snapshots():
+            click.echo(snapshot_id)
+        return
+    try:
+        restored = store.restore(snapshot, output)
+    except BackupError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Restored {snapshot} ({restored['size']} bytes) to {output}.")
+
+@click.command('import-attachments')
+@click.option('--delete', is_flag=True, help='Remove each upload once it is in the store')
+@with_appcontext
+def import_attachments(delete):
+    """Move attachments saved by name in UPLOAD_FOLDER into the content-addressed store."""
+    from flask import current_app
+    from .attachments import attachment_store
+    from .models import Booking
+    store = attachment_store()
+    uploads_dir = current_app.config['UPLOAD_FOLDER']
+    imported = missing = 0
+    paths = set()
+    for booking in Booking.query.filter(Booking.attachment_filename.isnot(None), Booking.attachment_sha256.is_(None)):
+        path = os.path.join(uploads_dir, booking.attachment_filename)
+        if not os.path.isfile(path):
+            missing += 1
+            continue
+        with open(path, 'rb') as f:
+            booking.attachment_sha256, _ = store.save(f)
+        paths.add(path)
+        imported += 1
+    db.session.commit()
+    if delete:
+        for path in paths:
+            os.remove(path)
+    click.echo(f'{imported} attachments imported, {missing} files missing.')
+
+@click.command('import-bookings')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--username', required=True, help='User the bookings are created for')
+@click.option('--dry-run', is_flag=True, help='Validate the file without importing anything')
+@click.option('--batch-size', type=int, help='Rows per INSERT and commit (default BOOKING_IMPORT_BATCH_SIZE)')
+@with_appcontext
+def import_bookings(path, username, dry_run, batch_size):
+    """Import bookings from a .csv or .xlsx file with a header row."""
+    from .booking_import import ImportFileError, import_bookings as run_import
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.ClickException(f'No user named {username}.')
+    try:
+        with open(path, 'rb') as f:
+            result = run_import(f, path, user.id, dry_run=dry_run, batch_size=batch_size,
+                                progress=lambda r: click.echo(f'{r.rows} rows read...', err=True))
+    except ImportFileError as e:
+        raise click.ClickException(str(e))
+    for number, errors in result.errors:
+        click.echo(f"Row {number}: {'; '.join(errors)}")
+    if result.failed > len(result.errors):
+        click.echo(f'... and {result.failed - len(result.errors)} more rejected rows.')
+    click.echo(result.summary())
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets():
+    """Fingerprint and precompress the static files for /assets."""
+    from flask import current_app
+    from .assets import build_assets as run_build
+    manifest, written = run_build(current_app.static_folder, current_app.config['ASSET_BUILD_FOLDER'])
+    click.echo(f"{len(manifest)} assets in {current_app.config['ASSET_BUILD_FOLDER']}, {written} new bytes written. "
+               f"Restart the workers to pick up the new manifest.")
+
+@click.command('export')
+@click.argument('dataset', type=click.Choice(['bookings', 'certificates', 'user_logs']))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'xlsx']), default='csv', show_default=True)
+@click.option('--from', 'start', type=click.DateTime(formats=['%Y-%m-%d']), help='First date to include')
+@click.option('--to', 'end', type=click.DateTime(formats=['%Y-%m-%d']), help='Last date to include')
+@click.option('--output', required=True, type=click.Path(dir_okay=False, writable=True), help="File to write ('-' for stdout)")
+@with_appcontext
+def export(dataset, fmt, start, end, output):
+    """Write bookings, certificates or user logs to a CSV or XLSX file."""
+    from .exports import stream_export
+    with click.open_file(output, 'wb') as f:
+        for chunk in stream_export(dataset, fmt, start.date() if start else None, end.date() if end else None):
+            f.write(chunk)
+    if output != '-':
+        click.echo(f'{dataset} exported to {output}.', err=True)
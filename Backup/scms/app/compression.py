@@ -0,0 +1,65 @@
+import gzip
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip covers every browser.
+    brotli = None
+
+COMPRESSIBLE = {
+    'text/html', 'text/css', 'text/plain', 'text/javascript', 'application/javascript',
+    'application/json', 'image/svg+xml',
+}
+
+
+def encodings():
+    """Content codings this process can produce, best first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(data, encoding, level=None):
+    """``data`` in ``encoding``; level is the gzip level or the brotli quality (default: the smallest output)."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if level is None else level)
+    return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+
+
+def choose_encoding(accepted):
+    for encoding in encodings():
+        if accepted[encoding]:
+            return encoding
+    return None
+
+
+def compress_response(response):
+    """Compress buffered HTML, JSON and text bodies for clients that accept it.
+
+    Streamed bodies (exports, backups, certificate ZIPs) and files are
+    left alone, as are bodies under COMPRESS_MIN_SIZE, where the framing
+    costs more than it saves.
+    """
+    if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+            or response.status_code in (204, 206, 304) or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE):
+        return response
+    if (response.content_length or 0) < current_app.config.get('COMPRESS_MIN_SIZE', 500):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    level = current_app.config.get('COMPRESS_BROTLI_QUALITY', 4) if encoding == 'br' \
+        else current_app.config.get('COMPRESS_GZIP_LEVEL', 6)
+    response.set_data(compress(response.get_data(), encoding, level))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The bytes differ from the identity encoding; a weak tag still revalidates it.
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    if app.config.get('COMPRESS_RESPONSES', True):
+        app.after_request(compress_response)
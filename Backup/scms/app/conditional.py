@@ -0,0 +1,170 @@
+import hashlib
+import os
+from datetime import timezone
+from functools import wraps
+
+from flask import current_app, has_request_context, request, session
+from flask.globals import request_ctx
+from flask_login import current_user
+from sqlalchemy import DDL, event, text
+from werkzeug.http import is_resource_modified
+
+from app import db
+from app.models import Booking, Certificate, Post, TableVersion, User
+
+# Tables whose writes are counted in table_version.
+TRACKED = (Booking, Certificate, Post, User)
+
+
+def _bump(table):
+    return (
+        f"INSERT INTO table_version(table_name, version, changed_at) VALUES ('{table}', 1, CURRENT_TIMESTAMP) "
+        f"ON CONFLICT(table_name) DO UPDATE SET version = version + 1, changed_at = excluded.changed_at; "
+    )
+
+
+def _trigger(table, action):
+    return f'{table}_version_a{action[0].lower()}'
+
+
+def version_ddl(table):
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {_trigger(table, action)} AFTER {action} ON "{table}" '
+        f'BEGIN {_bump(table)}END'
+        for action in ('INSERT', 'UPDATE', 'DELETE')
+    ]
+
+
+for _model in TRACKED:
+    for _statement in version_ddl(_model.__tablename__):
+        event.listen(_model.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+
+def _triggers_installed():
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    wanted = {_trigger(model.__tablename__, action) for model in TRACKED for action in ('INSERT', 'UPDATE', 'DELETE')}
+    found = {name for (name,) in db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))}
+    return wanted <= found
+
+
+def versions_tracked():
+    """Whether writes move table_version, checked once per worker.
+
+    Only SQLite gets the triggers; elsewhere the versions would never
+    change and every page would stay 304 forever, so pages tagged from
+    them are served in full instead.
+    """
+    tracked = current_app.extensions.get('conditional_tracked')
+    if tracked is None:
+        tracked = current_app.extensions['conditional_tracked'] = _triggers_installed()
+        if not tracked:
+            current_app.logger.warning('table_version triggers are missing; conditional GET is off for pages '
+                                       'tagged from table versions')
+    return tracked
+
+
+def table_versions(*tables):
+    """{table: (version, changed_at)} for ``tables``, read once per request."""
+    known = request.environ.setdefault('scms.table_versions', {}) if has_request_context() else {}
+    missing = [table for table in tables if table not in known]
+    if missing:
+        rows = db.session.query(TableVersion.table_name, TableVersion.version, TableVersion.changed_at) \
+            .filter(TableVersion.table_name.in_(missing)).all()
+        known.update({table: (0, None) for table in missing})
+        known.update({name: (version, changed_at) for name, version, changed_at in rows})
+    return {table: known[table] for table in tables}
+
+
+def request_versions(tables):
+    """Versions of ``tables`` already read by this request, or None."""
+    known = request.environ.get('scms.table_versions') if has_request_context() else None
+    if not known or not all(table in known for table in tables):
+        return None
+    return tuple(known[table][0] for table in sorted(tables))
+
+
+def build_id(app):
+    """Changes whenever the code or templates do, so a deploy retires every ETag."""
+    if app.config.get('ETAG_BUILD_ID'):
+        return app.config['ETAG_BUILD_ID']
+    digest = hashlib.sha1()
+    for root, dirs, files in sorted(os.walk(app.root_path)):
+        dirs[:] = sorted(d for d in dirs if d not in ('__pycache__', 'uploads'))
+        for name in sorted(files):
+            if name.endswith(('.py', '.html')):
+                stat = os.stat(os.path.join(root, name))
+                digest.update(f'{root}/{name}:{stat.st_mtime_ns}:{stat.st_size};'.encode())
+    return digest.hexdigest()[:12]
+
+
+def _last_modified(versions):
+    stamps = [changed_at for _, changed_at in versions.values() if changed_at is not None]
+    return max(stamps).replace(tzinfo=timezone.utc) if stamps else None
+
+
+def _flashing():
+    # Pending in the session, or taken out of it to render this response.
+    return bool(session.get('_flashes') or request_ctx.flashes)
+
+
+def _cache_headers(response, immutable):
+    # Pages differ per signed-in user, so only the browser keeps them, and revalidates every time.
+    response.cache_control.public = False
+    response.cache_control.private = True
+    if immutable:
+        response.cache_control.max_age = 365 * 24 * 3600
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+
+
+def conditional(*tables, key=None, etag=None, immutable=False):
+    """Answer GETs with ``304 Not Modified`` before the view runs when the client is current.
+
+    The weak ETag hashes the versions of ``tables``, the URL, the signed-in
+    user and their role, the build, and ``key(**view_args)`` for anything
+    else the page depends on (today's date, for sliding windows). Only
+    200 responses are tagged, and never while flashed messages are
+    pending, since they are rendered once. ``etag(**view_args)`` instead
+    gives the view's own strong ETag, for content that never changes
+    under its URL. Without the table_version triggers only those views
+    are answered; the rest always render.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            if (not current_app.config.get('CONDITIONAL_GET', True) or request.method not in ('GET', 'HEAD')
+                    or _flashing() or (etag is None and not versions_tracked())):
+                return view(**kwargs)
+            last_modified = None
+            if etag is not None:
+                tag, weak = etag(**kwargs), False
+            else:
+                versions = table_versions(*tables)
+                parts = [current_app.extensions['conditional_build'], request.full_path,
+                         current_user.get_id(), getattr(current_user, 'is_admin', False),
+                         sorted((table, version) for table, (version, _) in versions.items())]
+                if key is not None:
+                    parts.append(key(**kwargs))
+                else:
+                    last_modified = _last_modified(versions)
+                tag, weak = hashlib.sha1(repr(parts).encode()).hexdigest()[:20], True
+            if not is_resource_modified(request.environ, etag=tag, last_modified=last_modified):
+                response = current_app.response_class(status=304)
+                response.set_etag(tag, weak=weak)
+                response.last_modified = last_modified
+                _cache_headers(response, immutable)
+                return response
+            response = current_app.make_response(view(**kwargs))
+            if response.status_code == 200 and not response.get_etag()[0] and not _flashing():
+                response.set_etag(tag, weak=weak)
+                response.last_modified = last_modified
+                _cache_headers(response, immutable)
+            return response
+        return wrapper
+    return decorator
+
+
+def init_app(app):
+    app.extensions['conditional_build'] = build_id(app)
@@ -0,0 +1,196 @@
+import copy
+import threading
+import time
+from datetime import date, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models import Booking, Certificate, Post, User
+
+RECENT_DAYS = 30
+LIST_LIMIT = 5
+
+
+def _booking_row(booking):
+    return {
+        'id': booking.id,
+        'client_name': booking.client_name,
+        'booking_date': booking.booking_date,
+        'status': booking.status,
+    }
+
+
+def _post_row(post):
+    return {'id': post.id, 'title': post.title, 'created': post.created}
+
+
+class DashboardSnapshot:
+    """Precomputed aggregates for the dashboard page.
+
+    Commits made by this process are folded in incrementally from ORM
+    events; the TTL bounds how stale the snapshot can get with respect to
+    writes from other workers and to the sliding 30-day window.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = None
+        self._built_at = 0.0
+
+    def get(self):
+        with self._lock:
+            if self._data is None or time.monotonic() - self._built_at > self.ttl:
+                self._data = self._compute()
+                self._built_at = time.monotonic()
+            return copy.deepcopy(self._data)
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
+
+    def _compute(self):
+        today = date.today()
+        thirty_days_ago = today - timedelta(days=RECENT_DAYS)
+        status_counts = dict(db.session.query(Booking.status, func.count(Booking.id)).group_by(Booking.status).all())
+        upcoming = Booking.query.filter(Booking.booking_date >= today).order_by(Booking.booking_date).limit(LIST_LIMIT).all()
+        recent_posts = Post.query.order_by(Post.created.desc()).limit(LIST_LIMIT).all()
+        return {
+            'total_bookings': sum(status_counts.values()),
+            'recent_bookings': Booking.query.filter(Booking.booking_date >= thirty_days_ago).count(),
+            'status_counts': status_counts,
+            'total_certificates': Certificate.query.count(),
+            'total_users': User.query.count(),
+            'upcoming_bookings': [_booking_row(b) for b in upcoming],
+            'recent_posts': [_post_row(p) for p in recent_posts],
+        }
+
+    def apply(self, changes):
+        with self._lock:
+            if self._data is None:
+                return
+            for change in changes:
+                if not self._apply_one(*change):
+                    self._data = None
+                    return
+
+    def _apply_one(self, model, action, old, new):
+        # Returns False when the change cannot be folded in and the next
+        # read has to recompute from scratch.
+        data = self._data
+        if model is Certificate:
+            data['total_certificates'] += 1 if action == 'insert' else -1 if action == 'delete' else 0
+        elif model is User:
+            data['total_users'] += 1 if action == 'insert' else -1 if action == 'delete' else 0
+        elif model is Post:
+            if action != 'insert':
+                return not any(p['id'] == old['id'] for p in data['recent_posts'])
+            data['recent_posts'].insert(0, new)
+            del data['recent_posts'][LIST_LIMIT:]
+        elif model is Booking:
+            if old is not None:
+                self._count_booking(old, -1)
+            if new is not None:
+                self._count_booking(new, 1)
+            return self._place_upcoming(old, new)
+        return True
+
+    def _count_booking(self, row, sign):
+        data = self._data
+        data['total_bookings'] += sign
+        counts = data['status_counts']
+        counts[row['status']] = counts.get(row['status'], 0) + sign
+        if not counts[row['status']]:
+            del counts[row['status']]
+        booking_date = row['booking_date']
+        if booking_date and booking_date >= date.today() - timedelta(days=RECENT_DAYS):
+            data['recent_bookings'] += sign
+
+    def _place_upcoming(self, old, new):
+        upcoming = self._data['upcoming_bookings']
+        if old is not None and any(b['id'] == old['id'] for b in upcoming):
+            if new is None or new['booking_date'] != old['booking_date']:
+                # Moving an entry out would need the next candidate from the table.
+                return False
+            upcoming[:] = [new if b['id'] == new['id'] else b for b in upcoming]
+            return True
+        booking_date = new['booking_date'] if new else None
+        if booking_date is None or booking_date < date.today():
+            return True
+        if len(upcoming) < LIST_LIMIT or booking_date < upcoming[-1]['booking_date']:
+            upcoming.append(new)
+            upcoming.sort(key=lambda b: b['booking_date'])
+            del upcoming[LIST_LIMIT:]
+        return True
+
+
+def get_snapshot():
+    return current_app.extensions['dashboard_snapshot'].get()
+
+
+def invalidate_snapshot():
+    # For writes that bypass the ORM unit of work (Core inserts, bulk updates).
+    snapshot = current_app.extensions.get('dashboard_snapshot')
+    if snapshot is not None:
+        snapshot.invalidate()
+
+
+def _row_for(model, target):
+    if model is Booking:
+        return _booking_row(target)
+    if model is Post:
+        return _post_row(target)
+    return {'id': target.id}
+
+
+def _previous_booking_row(target):
+    row = _booking_row(target)
+    state = inspect(target)
+    for field in ('booking_date', 'status'):
+        history = state.attrs[field].history
+        if history.deleted:
+            row[field] = history.deleted[0]
+    return row
+
+
+def _record(model, action):
+    def listener(mapper, connection, target):
+        session = object_session(target)
+        if session is None:
+            return
+        if action == 'insert':
+            change = (model, action, None, _row_for(model, target))
+        elif action == 'delete':
+            change = (model, action, _row_for(model, target), None)
+        elif model is Booking:
+            change = (model, action, _previous_booking_row(target), _booking_row(target))
+        else:
+            change = (model, action, _row_for(model, target), _row_for(model, target))
+        session.info.setdefault('dashboard_changes', []).append(change)
+    return listener
+
+
+def _after_commit(session):
+    changes = session.info.pop('dashboard_changes', None)
+    if changes and has_app_context():
+        snapshot = current_app.extensions.get('dashboard_snapshot')
+        if snapshot is not None:
+            snapshot.apply(changes)
+
+
+def _after_rollback(session):
+    session.info.pop('dashboard_changes', None)
+
+
+def init_app(app):
+    app.extensions['dashboard_snapshot'] = DashboardSnapshot(ttl=app.config.get('DASHBOARD_SNAPSHOT_TTL', 300))
+    if event.contains(Session, 'after_commit', _after_commit):
+        return
+    for model in (Booking, Certificate, Post, User):
+        for action in ('insert', 'update', 'delete'):
+            event.listen(model, f'after_{action}', _record(model, action))
+    event.listen(Session, 'after_commit', _after_commit)
+    event.listen(Session, 'after_rollback', _after_rollback)
@@ -1,5 +1,5 @@
 from flask_wtf import FlaskForm
-from flask_wtf.file import FileField, FileAllowed
+from flask_wtf.file import FileField, FileAllowed, FileRequired
 from wtforms import StringField, PasswordField, BooleanField, SubmitField, TextAreaField, DateField, SelectField
 from wtforms.validators import DataRequired, Email, EqualTo, Length, Optional, ValidationError
 from datetime import datetime
@@ -96,4 +96,20 @@ class EditUserForm(FlaskForm):
 
 class BackupForm(FlaskForm):
     backup_type = SelectField('Backup Type', choices=[('full', 'Full Backup'), ('incremental', 'Incremental Backup')])
-    submit = SubmitField('Create Backup')
\ No newline at end of file
+    submit = SubmitField('Create Backup')
+
+class BulkCertificateForm(FlaskForm):
+    training_from = DateField('Training From', validators=[Optional()])
+    training_to = DateField('Training To', validators=[Optional()])
+    organization_name = StringField('Organization Name', validators=[Optional()])
+    status = SelectField('Status', choices=[
+        ('completed', 'Completed'),
+        ('approved', 'Approved'),
+        ('', 'Any')
+    ], default='completed')
+    submit = SubmitField('Generate Certificates')
+
+class BookingImportForm(FlaskForm):
+    file = FileField('Bookings File', validators=[FileRequired(), FileAllowed(['csv', 'xlsx'], 'Only CSV and Excel (.xlsx) files are allowed.')])
+    dry_run = BooleanField('Check only (import nothing)')
+    submit = SubmitField('Import Bookings')
@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from app import db
+from app.models import User
+
+
+class IdentityCache:
+    """Column values of recently seen users, so the user loader can skip the database.
+
+    Bounded to ``maxsize`` entries (least recently used go first) and each
+    entry lives at most ``ttl`` seconds. Commits that touch a user drop it
+    here straight away; other workers learn about it through the optional
+    ``signal`` file, whose mtime is bumped on every invalidation and
+    checked on every lookup. Without a signal file the TTL is the bound on
+    how long another worker keeps serving a revoked user.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, signal=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.signal = signal
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._signal_seen = self._signal_mtime()
+        # Bumped by every invalidation, so a row read from the database
+        # before one is not stored after it.
+        self.generation = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def _signal_mtime(self):
+        if not self.signal:
+            return None
+        try:
+            return os.stat(self.signal).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _check_signal(self):
+        mtime = self._signal_mtime()
+        if mtime != self._signal_seen:
+            self._signal_seen = mtime
+            self._entries.clear()
+            self.generation += 1
+
+    def get(self, user_id):
+        with self._lock:
+            self._check_signal()
+            entry = self._entries.get(user_id)
+            if entry is None or time.monotonic() - entry[1] > self.ttl:
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, user_id, row, generation):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[user_id] = (row, time.monotonic())
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_ids=None, notify=True):
+        """Forget ``user_ids`` (every user if None) and tell the other workers."""
+        with self._lock:
+            if user_ids is None:
+                self._entries.clear()
+            else:
+                for user_id in user_ids:
+                    self._entries.pop(user_id, None)
+            self.generation += 1
+            self.invalidations += 1
+            if notify and self.signal:
+                self._bump_signal()
+
+    def _bump_signal(self):
+        # Never reuse an mtime a reader may already have seen, even when two
+        # invalidations land within the filesystem's timestamp granularity.
+        previous = self._signal_mtime() or 0
+        mtime = max(time.time_ns(), previous + 1)
+        with open(self.signal, 'a'):
+            pass
+        os.utime(self.signal, ns=(mtime, mtime))
+        self._signal_seen = mtime
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+def _columns(user):
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+
+def load_user(user_id):
+    """Flask-Login user loader: the cached row attached to the session, or a query."""
+    cache = current_app.extensions.get('identity_cache')
+    if cache is None:
+        return db.session.get(User, user_id)
+    generation = cache.generation
+    row = cache.get(user_id)
+    if row is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            cache.put(user_id, _columns(user), generation)
+        return user
+    user = User(**row)
+    # Present it to the session as a clean, already-loaded row: no SELECT,
+    # and relationships such as user.bookings still load lazily as usual.
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def identity_cache_stats():
+    cache = current_app.extensions.get('identity_cache')
+    return cache.stats() if cache is not None else None
+
+
+def invalidate_identity(user_ids=None):
+    # For writes that bypass the ORM unit of work (Core updates, raw SQL).
+    cache = current_app.extensions.get('identity_cache')
+    if cache is not None:
+        cache.invalidate(user_ids)
+
+
+def _record(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('identity_changes', set()).add(target.id)
+
+
+def _after_commit(session):
+    user_ids = session.info.pop('identity_changes', None)
+    if user_ids and has_app_context():
+        invalidate_identity(user_ids)
+
+
+def _after_rollback(session):
+    session.info.pop('identity_changes', None)
+
+
+def init_app(app):
+    if app.config.get('IDENTITY_CACHE_SIZE', 1024) > 0:
+        app.extensions['identity_cache'] = IdentityCache(
+            maxsize=app.config.get('IDENTITY_CACHE_SIZE', 1024),
+            ttl=app.config.get('IDENTITY_CACHE_TTL', 60),
+            signal=app.config.get('IDENTITY_CACHE_SIGNAL'),
+        )
+    if event.contains(Session, 'after_commit', _after_commit):
+        return
+    for action in ('update', 'delete'):
+        event.listen(User, f'after_{action}', _record)
+    event.listen(Session, 'after_commit', _after_commit)
+    event.listen(Session, 'after_rollback', _after_rollback)
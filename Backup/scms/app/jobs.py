@@ -0,0 +1,234 @@
+import os
+import socket
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import Job, TaskLock
+
+_registry = {}
+_schedule = {}
+
+
+def task(name=None, every=None):
+    """Register a function as the handler for jobs called ``name``.
+
+    Handlers are called as ``func(job, **payload)`` where ``job`` is a
+    JobContext; whatever they return is stored as the job result. ``every``
+    names a config setting holding an interval in seconds; workers then
+    enqueue the job on that schedule (0 turns it off).
+    """
+    def decorator(func):
+        _registry[name or func.__name__] = func
+        if every:
+            _schedule[name or func.__name__] = every
+        return func
+    return decorator
+
+
+def _load_tasks():
+    from app import tasks  # noqa: F401 -- importing registers the handlers
+
+
+def get_task(name):
+    _load_tasks()
+    return _registry.get(name)
+
+
+def acquire_lock(name, owner, ttl):
+    """Take the named lock for ``ttl`` seconds unless someone else holds it.
+
+    Works across processes and hosts sharing the database: an expired lock
+    is taken over with a conditional UPDATE, a missing one is created and
+    the primary key decides between racing inserts.
+    """
+    now = datetime.utcnow()
+    values = {'owner': owner, 'expires_at': now + timedelta(seconds=ttl)}
+    taken = db.session.execute(
+        update(TaskLock).where(TaskLock.name == name, TaskLock.expires_at <= now).values(**values)
+    ).rowcount
+    db.session.commit()
+    if taken:
+        return True
+    try:
+        db.session.execute(insert(TaskLock).values(name=name, **values))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    return True
+
+
+def release_lock(name, owner):
+    db.session.execute(delete(TaskLock).where(TaskLock.name == name, TaskLock.owner == owner))
+    db.session.commit()
+
+
+def enqueue_due(owner):
+    """Enqueue scheduled jobs whose interval has come round; returns the jobs added.
+
+    Every worker calls this, and the schedule lock (held for one interval)
+    makes sure only one of them enqueues each run.
+    """
+    _load_tasks()
+    queued = []
+    for name, setting in _schedule.items():
+        interval = current_app.config.get(setting)
+        if interval and acquire_lock(f'schedule:{name}', owner, interval):
+            queued.append(enqueue(name))
+    return queued
+
+
+def enqueue(name, payload=None, user_id=None, max_attempts=None, delay=0):
+    if get_task(name) is None:
+        raise ValueError(f'Unknown job {name!r}')
+    job = Job(
+        name=name,
+        payload=payload or {},
+        created_by=user_id,
+        max_attempts=max_attempts or current_app.config.get('JOB_MAX_ATTEMPTS', 3),
+        run_at=datetime.utcnow() + timedelta(seconds=delay)
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+class JobContext:
+    def __init__(self, job):
+        self.id = job.id
+        self.attempt = job.attempts
+        self.user_id = job.created_by
+
+    def progress(self, percent, message=None):
+        """Record progress and refresh the job's lock.
+
+        This commits the session, so call it between units of work rather
+        than in the middle of one.
+        """
+        values = {'progress': max(0, min(int(percent), 100)), 'locked_at': datetime.utcnow()}
+        if message is not None:
+            values['message'] = message[:255]
+        db.session.execute(update(Job).where(Job.id == self.id).values(**values))
+        db.session.commit()
+
+
+def claim_next(worker_id):
+    """Lock the next due job for ``worker_id`` and return it, or None.
+
+    PostgreSQL skips rows another worker holds. SQLite has no row locks, so
+    the claim is a conditional UPDATE: if another worker got there first it
+    matches nothing and the next candidate is tried.
+    """
+    while True:
+        now = datetime.utcnow()
+        job_id = db.session.query(Job.id).filter(
+            Job.status == 'queued', Job.run_at <= now
+        ).order_by(Job.run_at, Job.id).limit(1).with_for_update(skip_locked=True).scalar()
+        if job_id is None:
+            db.session.rollback()
+            return None
+        claimed = db.session.execute(
+            update(Job).where(Job.id == job_id, Job.status == 'queued').values(
+                status='running', locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(Job, job_id)
+
+
+def retry_delay(attempts):
+    base = current_app.config.get('JOB_RETRY_BACKOFF', 30)
+    ceiling = current_app.config.get('JOB_RETRY_MAX_DELAY', 3600)
+    return min(base * 2 ** (attempts - 1), ceiling)
+
+
+def _release(job, error):
+    now = datetime.utcnow()
+    job.error = error
+    job.locked_by = None
+    job.locked_at = None
+    if job.attempts < job.max_attempts:
+        delay = retry_delay(job.attempts)
+        job.status = 'queued'
+        job.run_at = now + timedelta(seconds=delay)
+        job.message = f'Attempt {job.attempts} of {job.max_attempts} failed, retrying in {delay}s'
+    else:
+        job.status = 'failed'
+        job.finished_at = now
+        job.message = f'Failed after {job.attempts} attempts'
+
+
+def run_job(job):
+    handler = get_task(job.name)
+    try:
+        if handler is None:
+            raise LookupError(f'No task registered as {job.name!r}')
+        result = handler(JobContext(job), **(job.payload or {}))
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Job {job.id} ({job.name}) failed on attempt {job.attempts}: {str(e)}")
+        _release(job, traceback.format_exc())
+        db.session.commit()
+        return False
+
+    job.status = 'succeeded'
+    job.progress = 100
+    job.result = result
+    job.error = None
+    job.locked_by = None
+    job.locked_at = None
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    current_app.logger.info(f"Job {job.id} ({job.name}) succeeded")
+    return True
+
+
+def requeue_stale():
+    """Release jobs whose worker stopped refreshing the lock (crashed or killed)."""
+    timeout = current_app.config.get('JOB_LOCK_TIMEOUT', 600)
+    cutoff = datetime.utcnow() - timedelta(seconds=timeout)
+    stale = Job.query.filter(Job.status == 'running', Job.locked_at < cutoff).all()
+    for job in stale:
+        current_app.logger.warning(f"Job {job.id} ({job.name}) lost its worker {job.locked_by}")
+        _release(job, f'Worker {job.locked_by} stopped responding')
+    db.session.commit()
+    return len(stale)
+
+
+def default_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def work(worker_id=None, poll_interval=None, burst=False, max_jobs=None):
+    """Run jobs until interrupted.
+
+    With ``burst`` the worker only drains what is already queued and stops;
+    it does not enqueue scheduled jobs.
+    """
+    worker_id = worker_id or default_worker_id()
+    if poll_interval is None:
+        poll_interval = current_app.config.get('JOB_POLL_INTERVAL', 2)
+    processed = 0
+    requeue_stale()
+    next_schedule_check = 0
+    while max_jobs is None or processed < max_jobs:
+        if not burst and time.monotonic() >= next_schedule_check:
+            enqueue_due(worker_id)
+            next_schedule_check = time.monotonic() + poll_interval
+        job = claim_next(worker_id)
+        if job is None:
+            if burst:
+                break
+            requeue_stale()
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+    return processed
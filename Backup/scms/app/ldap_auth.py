@@ -0,0 +1,281 @@
+import queue
+import threading
+import time
+
+import ldap3
+from flask import current_app
+from ldap3.core.exceptions import LDAPException
+from ldap3.utils.conv import escape_filter_chars
+
+
+class LDAPUnavailable(LDAPException):
+    pass
+
+
+class ConnectionPool:
+    """Up to ``size`` open directory connections, shared by the logins of one worker.
+
+    Connections are made on demand and handed back after use, so a burst
+    of logins pays the TCP/TLS setup once per pooled connection instead
+    of once per login. One idle for longer than ``health_interval`` is
+    checked with a root DSE read before it is reused; one that fails the
+    check, or fails while in use, is dropped and replaced.
+    """
+
+    def __init__(self, factory, size=10, timeout=5, health_interval=30):
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.open = 0
+        self.created = self.reused = self.discarded = 0
+
+    def run(self, operation):
+        """Return ``operation(conn)`` on a pooled connection.
+
+        If a reused connection fails (the directory restarted, a firewall
+        dropped the idle socket) it is replaced and the call made once more.
+        """
+        while True:
+            conn, reused = self._acquire()
+            try:
+                result = operation(conn)
+            except Exception as e:
+                self._discard(conn)
+                if reused and isinstance(e, LDAPException):
+                    continue
+                raise
+            if conn.closed:
+                self._discard(conn)
+            else:
+                self._idle.put((conn, time.monotonic()))
+            return result
+
+    def _acquire(self):
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._create()
+                if conn is not None:
+                    return conn, False
+                try:
+                    conn, last_used = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise LDAPUnavailable(f'No LDAP connection free after {self.timeout}s')
+            if self._healthy(conn, last_used):
+                self.reused += 1
+                return conn, True
+            self._discard(conn)
+
+    def _create(self):
+        with self._lock:
+            if self.open >= self.size:
+                return None
+            self.open += 1
+        try:
+            conn = self.factory()
+        except LDAPException:
+            with self._lock:
+                self.open -= 1
+            raise
+        self.created += 1
+        return conn
+
+    def _healthy(self, conn, last_used):
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.health_interval:
+            return True
+        try:
+            conn.search('', '(objectClass=*)', search_scope=ldap3.BASE, attributes=['1.1'])
+        except LDAPException:
+            return False
+        return bool(conn.result) and conn.result['result'] == 0
+
+    def _discard(self, conn):
+        with self._lock:
+            self.open -= 1
+        self.discarded += 1
+        try:
+            conn.unbind()
+        except LDAPException:
+            pass
+
+    def stats(self):
+        return {'size': self.size, 'open': self.open, 'idle': self._idle.qsize(),
+                'created': self.created, 'reused': self.reused, 'discarded': self.discarded}
+
+
+class TTLCache:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        if self.ttl > 0:
+            self._entries[key] = (value, time.monotonic())
+
+    def pop(self, key):
+        self._entries.pop(key, None)
+
+
+class LDAPDirectory:
+    """Checks staff credentials against the directory.
+
+    A pool of connections bound as LDAP_BIND_USER_DN finds user entries
+    and group memberships; a second pool of anonymous connections re-binds
+    as each user to check the password. Entries and groups are cached for
+    LDAP_CACHE_TTL seconds; passwords are always checked by the directory.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.server = ldap3.Server(config['LDAP_HOST'], get_info=ldap3.NONE,
+                                   connect_timeout=config['LDAP_TIMEOUT'])
+        pool_options = dict(size=config['LDAP_POOL_SIZE'], timeout=config['LDAP_POOL_TIMEOUT'],
+                            health_interval=config['LDAP_HEALTH_CHECK_INTERVAL'])
+        self.search_pool = ConnectionPool(self._service_connection, **pool_options)
+        self.bind_pool = ConnectionPool(self._bind_connection, **pool_options)
+        self.cache = TTLCache(config['LDAP_CACHE_TTL'])
+
+    def _connection(self, **kwargs):
+        return ldap3.Connection(self.server, receive_timeout=self.config['LDAP_TIMEOUT'], **kwargs)
+
+    def _service_connection(self):
+        return self._connection(user=self.config['LDAP_BIND_USER_DN'], password=self.config['LDAP_BIND_USER_PASSWORD'],
+                                auto_bind=ldap3.AUTO_BIND_NO_TLS)
+
+    def _bind_connection(self):
+        conn = self._connection()
+        conn.open()
+        return conn
+
+    def _base(self, relative_dn):
+        base_dn = self.config['LDAP_BASE_DN']
+        return f'{relative_dn},{base_dn}' if relative_dn else base_dn
+
+    def find_user(self, username):
+        key = ('user', username.lower())
+        entry = self.cache.get(key)
+        if entry is None:
+            login_attr = self.config['LDAP_USER_LOGIN_ATTR']
+            search_filter = f"(&{self.config['LDAP_USER_OBJECT_FILTER']}({login_attr}={escape_filter_chars(username)}))"
+            entries = self.search_pool.run(
+                lambda conn: _search(conn, self._base(self.config['LDAP_USER_DN']), search_filter, [login_attr, 'mail']))
+            if len(entries) != 1:
+                return None
+            dn, attributes = entries[0]
+            entry = {'dn': dn, 'email': _first(attributes.get('mail'))}
+            self.cache.put(key, entry)
+        return entry
+
+    def groups(self, dn):
+        key = ('groups', dn.lower())
+        groups = self.cache.get(key)
+        if groups is None:
+            members_attr = self.config['LDAP_GROUP_MEMBERS_ATTR']
+            search_filter = f"(&{self.config['LDAP_GROUP_OBJECT_FILTER']}({members_attr}={escape_filter_chars(dn)}))"
+            entries = self.search_pool.run(
+                lambda conn: _search(conn, self._base(self.config['LDAP_GROUP_DN']), search_filter, ['cn']))
+            groups = sorted(_first(attributes.get('cn')) for _, attributes in entries)
+            self.cache.put(key, groups)
+        return groups
+
+    def authenticate(self, username, password):
+        """Return the user's dn, email and group names, or None if the credentials are wrong."""
+        # An empty password would be an anonymous bind, which "succeeds".
+        if not username or not password:
+            return None
+        entry = self.find_user(username)
+        if entry is None:
+            return None
+        if not self.bind_pool.run(lambda conn: conn.rebind(user=entry['dn'], password=password)):
+            # The entry may have moved; look it up afresh next time.
+            self.cache.pop(('user', username.lower()))
+            return None
+        return {'username': username, 'dn': entry['dn'], 'email': entry['email'], 'groups': self.groups(entry['dn'])}
+
+    def stats(self):
+        return {'search_pool': self.search_pool.stats(), 'bind_pool': self.bind_pool.stats(),
+                'cache_hits': self.cache.hits, 'cache_misses': self.cache.misses}
+
+
+def _search(conn, base, search_filter, attributes):
+    conn.search(base, search_filter, attributes=attributes)
+    if not conn.result or conn.result['result'] not in (0, 32):
+        # Anything but success or "no such object" means the lookup itself failed.
+        raise LDAPUnavailable(f'LDAP search failed: {conn.result}')
+    return [(e['dn'], e['attributes']) for e in conn.response if e['type'] == 'searchResEntry']
+
+
+def _first(value):
+    if isinstance(value, (list, tuple)):
+        return value[0] if value else None
+    return value
+
+
+def ldap_enabled():
+    return 'ldap_directory' in current_app.extensions
+
+
+def authenticate(username, password):
+    """Check credentials against the directory; raises LDAPUnavailable if it cannot be reached."""
+    try:
+        return current_app.extensions['ldap_directory'].authenticate(username, password)
+    except LDAPUnavailable:
+        raise
+    except LDAPException as e:
+        raise LDAPUnavailable(str(e)) from e
+
+
+def directory_user(username, password):
+    """The local User for a successful directory login, created or updated to match; else None.
+
+    Accounts with a local password are never returned or updated.
+    """
+    from app import db
+    from app.models import User
+
+    if not ldap_enabled():
+        return None
+    try:
+        identity = authenticate(username, password)
+    except LDAPUnavailable as e:
+        current_app.logger.error(f"LDAP login for {username} failed: {e}")
+        return None
+    if identity is None:
+        return None
+    user = User.query.filter_by(username=username).first()
+    if user is not None and user.password_hash:
+        # A local account that shares the name is not the directory user; never sign in as it or sync onto it.
+        current_app.logger.warning(f"Directory login for {username} refused: a local account has that name")
+        return None
+    if user is None:
+        user = User(username=username, email=identity['email'], is_admin=False)
+        db.session.add(user)
+        current_app.logger.info(f"Created local account for directory user {username}")
+    if identity['email'] and user.email != identity['email']:
+        user.email = identity['email']
+    admin_group = current_app.config.get('LDAP_ADMIN_GROUP')
+    if admin_group and user.is_admin != (admin_group in identity['groups']):
+        user.is_admin = admin_group in identity['groups']
+    db.session.commit()
+    return user
+
+
+def init_app(app):
+    if app.config.get('LDAP_ENABLED'):
+        app.extensions['ldap_directory'] = LDAPDirectory(app.config)
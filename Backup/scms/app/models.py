@@ -1,25 +1,48 @@
 from app import db
 from flask_login import UserMixin
+from sqlalchemy.orm import validates
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, date, timezone, timedelta
 import uuid
 
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def format_reference_number(day, sequence):
+    return f"{day.strftime('%Y%m%d')}-{sequence:04d}"
+
+
+def _next_reference_number(context):
+    day = Booking.sanitize_date(context.get_current_parameters().get('booking_date')) or date.today()
+    return format_reference_number(day, ReferenceSequence.allocate(context.connection, day))
+
+
 class Booking(db.Model):
+    __table_args__ = (
+        db.Index('ix_booking_user_id_booking_date', 'user_id', 'booking_date'),
+        db.Index('ix_booking_status_training_date', 'status', 'training_date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     client_name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), nullable=False)
     mobile_number = db.Column(db.String(20), nullable=False)
-    booking_date = db.Column(db.String(10), nullable=True)
-    training_date = db.Column(db.String(10), nullable=True)
+    booking_date = db.Column(db.Date, nullable=True, index=True)
+    training_date = db.Column(db.Date, nullable=True, index=True)
     status = db.Column(db.String(20), nullable=False, default='pending')
     organization_name = db.Column(db.String(100))
     address = db.Column(db.String(255))
     attachment_filename = db.Column(db.String(255))
+    attachment_sha256 = db.Column(db.String(64), index=True)
+    reference_number = db.Column(db.String(20), nullable=False, unique=True, index=True,
+                                 default=_next_reference_number)
 
     @staticmethod
     def sanitize_date(date_value):
-        if isinstance(date_value, date):
+        if isinstance(date_value, datetime):
+            return date_value.date()
+        elif isinstance(date_value, date):
             return date_value
         elif isinstance(date_value, str):
             try:
@@ -37,19 +60,11 @@ class Booking(db.Model):
     def generate_reference_number(cls, date=None):
         if date is None:
             date = datetime.now().date()
-        date_str = date.strftime("%Y%m%d")
-        last_booking = cls.query.filter(cls.reference_number.like(f"{date_str}-%")).order_by(cls.reference_number.desc()).first()
-        if last_booking:
-            last_sequence = int(last_booking.reference_number.split('-')[1])
-            new_sequence = last_sequence + 1
-        else:
-            new_sequence = 1
-        return f"{date_str}-{new_sequence:04d}"
-
-    def __init__(self, **kwargs):
-        super(Booking, self).__init__(**kwargs)
-        self.booking_date = self.sanitize_date(kwargs.get('booking_date'))
-        self.training_date = self.sanitize_date(kwargs.get('training_date'))
+        return format_reference_number(date, ReferenceSequence.allocate(db.session.connection(), date))
+
+    @validates('booking_date', 'training_date')
+    def validate_date(self, key, value):
+        return self.sanitize_date(value)
 
     def to_dict(self):
         return {
@@ -62,7 +77,8 @@ class Booking(db.Model):
             'status': self.status,
             'attachment_filename': self.attachment_filename,
             'address': self.address,
-            'organization_name': self.organization_name
+            'organization_name': self.organization_name,
+            'reference_number': self.reference_number,
         }
 
     @staticmethod
@@ -107,7 +123,7 @@ class Certificate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     client_name = db.Column(db.String(100), nullable=False)
     achievement = db.Column(db.String(200), nullable=False)
-    date = db.Column(db.Date, nullable=False)
+    date = db.Column(db.Date, nullable=False, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     user = db.relationship('User', backref=db.backref('certificates', lazy='dynamic'))
@@ -120,7 +136,7 @@ class UserLog(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     action = db.Column(db.String(100), nullable=False)
     details = db.Column(db.String(200))
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     user = db.relationship('User', backref=db.backref('logs', lazy='dynamic'))
 
     def __repr__(self):
@@ -136,4 +152,143 @@ class Post(db.Model):
     # Remove the duplicate relationship definition here
 
     def __repr__(self):
-        return f'<Post {self.id}: {self.title}>'
\ No newline at end of file
+        return f'<Post {self.id}: {self.title}>'
+
+class Job(db.Model):
+    __table_args__ = (
+        db.Index('ix_job_status_run_at', 'status', 'run_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    message = db.Column(db.String(255))
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'result': self.result,
+            'error': self.error,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': self.run_at.isoformat() if self.run_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f'<Job {self.id}: {self.name} {self.status}>'
+
+
+class TaskLock(db.Model):
+    name = db.Column(db.String(100), primary_key=True)
+    owner = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<TaskLock {self.name} {self.owner}>'
+
+
+class ReferenceSequence(db.Model):
+    """Last booking reference number handed out for each day."""
+    day = db.Column(db.Date, primary_key=True)
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def allocate(cls, connection, day, count=1):
+        """Reserve ``count`` numbers for ``day`` and return the highest.
+
+        One upsert bumps the day's counter and reads it back, so the cost
+        does not grow with the number of bookings and concurrent callers
+        are serialised by the row write instead of racing and retrying.
+        The upsert runs in the caller's transaction: a rollback undoes it
+        with the booking, and the next booking gets the same number again,
+        so the numbers on committed bookings stay unique and gap-free.
+        """
+        insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+        stmt = insert(cls).values(day=day, last_value=count)
+        stmt = stmt.on_conflict_do_update(index_elements=[cls.day],
+                                          set_={'last_value': cls.last_value + count})
+        return connection.execute(stmt.returning(cls.last_value)).scalar_one()
+
+    @classmethod
+    def number_rows(cls, connection, rows):
+        """Set ``reference_number`` on booking row dicts.
+
+        Like allocate, but one multi-row upsert reserves the numbers for
+        every booking date in ``rows`` (up to 500 dates per statement), so
+        a bulk insert spread over years costs a statement, not one per day.
+        """
+        per_day = {}
+        for row in rows:
+            per_day.setdefault(row['booking_date'] or date.today(), []).append(row)
+        insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+        days = list(per_day)
+        for start in range(0, len(days), 500):
+            stmt = insert(cls).values([{'day': day, 'last_value': len(per_day[day])} for day in days[start:start + 500]])
+            stmt = stmt.on_conflict_do_update(index_elements=[cls.day],
+                                              set_={'last_value': cls.last_value + stmt.excluded.last_value})
+            for day, last in connection.execute(stmt.returning(cls.day, cls.last_value)):
+                day_rows = per_day[day]
+                for sequence, row in enumerate(day_rows, start=last - len(day_rows) + 1):
+                    row['reference_number'] = format_reference_number(day, sequence)
+
+    def __repr__(self):
+        return f'<ReferenceSequence {self.day} {self.last_value}>'
+
+
+class BookingDailyStats(db.Model):
+    """Number of bookings per booking date, status and user.
+
+    Maintained by triggers on the booking table (see app.stats), so the
+    statistics pages can sum a few rows per day instead of counting bookings.
+    """
+    __tablename__ = 'booking_daily_stats'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'status', 'user_id', name='uq_booking_daily_stats_day_status_user'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=True)
+    status = db.Column(db.String(20), nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    bookings = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<BookingDailyStats {self.day} {self.status} {self.user_id}: {self.bookings}>'
+
+
+class TableVersion(db.Model):
+    """Write counter per table, for cheap "has anything changed" checks.
+
+    Bumped by triggers (see app.conditional) in the writing transaction,
+    so commits from every worker and Core statements count too.
+    """
+    __tablename__ = 'table_version'
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    changed_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<TableVersion {self.table_name} {self.version}>'
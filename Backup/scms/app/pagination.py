@@ -0,0 +1,131 @@
+import base64
+import binascii
+import json
+from datetime import date
+
+from flask import current_app, request
+from sqlalchemy import tuple_
+
+from app.models import Booking
+
+
+def encode_cursor(booking_date, booking_id):
+    if booking_date is not None:
+        booking_date = booking_date.isoformat()
+    raw = json.dumps([booking_date, booking_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        booking_date, booking_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+    if not isinstance(booking_id, int):
+        return None
+    if booking_date is not None:
+        try:
+            booking_date = date.fromisoformat(booking_date)
+        except (TypeError, ValueError):
+            return None
+    return booking_date, booking_id
+
+
+def get_page_size():
+    default = current_app.config.get('BOOKINGS_PER_PAGE', 50)
+    maximum = current_app.config.get('BOOKINGS_MAX_PER_PAGE', 200)
+    per_page = request.args.get('per_page', default, type=int)
+    return max(1, min(per_page, maximum))
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def _newest_first(query):
+    return query.order_by(Booking.booking_date.desc(), Booking.id.desc())
+
+
+def _oldest_first(query):
+    return query.order_by(Booking.booking_date.asc(), Booking.id.asc())
+
+
+def _rows_after(query, key, limit):
+    # Walks the listing in display order (newest first). SQLite sorts NULL
+    # dates last in a descending scan, so undated bookings form the tail.
+    if key is None:
+        return _newest_first(query).limit(limit).all()
+    booking_date, booking_id = key
+    if booking_date is None:
+        return _newest_first(query.filter(
+            Booking.booking_date.is_(None), Booking.id < booking_id
+        )).limit(limit).all()
+    # A row-value comparison never matches NULL, so the undated tail has to
+    # be fetched separately once the dated rows run out.
+    rows = _newest_first(query.filter(
+        tuple_(Booking.booking_date, Booking.id) < (booking_date, booking_id)
+    )).limit(limit).all()
+    if len(rows) < limit:
+        rows += _newest_first(query.filter(Booking.booking_date.is_(None))).limit(limit - len(rows)).all()
+    return rows
+
+
+def _rows_before(query, key, limit):
+    # Mirror of _rows_after: scans towards the head of the listing and
+    # returns rows in reverse display order.
+    booking_date, booking_id = key
+    if booking_date is not None:
+        return _oldest_first(query.filter(
+            tuple_(Booking.booking_date, Booking.id) > (booking_date, booking_id)
+        )).limit(limit).all()
+    rows = _oldest_first(query.filter(
+        Booking.booking_date.is_(None), Booking.id > booking_id
+    )).limit(limit).all()
+    if len(rows) < limit:
+        rows += _oldest_first(query.filter(Booking.booking_date.isnot(None))).limit(limit - len(rows)).all()
+    return rows
+
+
+def _cursor_for(booking):
+    return encode_cursor(booking.booking_date, booking.id)
+
+
+def paginate_bookings(query, per_page, after=None, before=None):
+    """Seek-paginate a Booking query on (booking_date, id), newest first.
+
+    The query may also select columns (see read_models.booking_rows) as
+    long as booking_date and id are among them.
+
+    Each page costs one index range scan regardless of how deep into the
+    table it is. ``after``/``before`` are opaque cursor tokens.
+    """
+    before_key = decode_cursor(before)
+    if before_key is not None:
+        rows = _rows_before(query, before_key, per_page + 1)
+        has_prev = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        prev_cursor = _cursor_for(rows[0]) if rows and has_prev else None
+        next_cursor = _cursor_for(rows[-1]) if rows else None
+        return KeysetPage(rows, next_cursor=next_cursor, prev_cursor=prev_cursor)
+
+    after_key = decode_cursor(after)
+    rows = _rows_after(query, after_key, per_page + 1)
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = _cursor_for(rows[-1]) if rows and has_next else None
+    prev_cursor = _cursor_for(rows[0]) if rows and after_key is not None else None
+    return KeysetPage(rows, next_cursor=next_cursor, prev_cursor=prev_cursor)
@@ -0,0 +1,47 @@
+from collections import namedtuple
+
+from app import db
+from app.models import Booking
+
+# What the booking list pages show; loading these columns alone skips
+# building a Booking, its identity-map entry and its change tracking per row.
+LIST_COLUMNS = (Booking.id, Booking.reference_number, Booking.client_name, Booking.email, Booking.mobile_number,
+                Booking.booking_date, Booking.training_date, Booking.status, Booking.organization_name,
+                Booking.attachment_filename)
+CALENDAR_COLUMNS = (Booking.id, Booking.client_name, Booking.status, Booking.training_date)
+
+BookingRow = namedtuple('BookingRow', [column.key for column in LIST_COLUMNS])
+_DATE_FIELDS = (BookingRow._fields.index('booking_date'), BookingRow._fields.index('training_date'))
+
+
+def booking_rows(*criteria):
+    """Query for LIST_COLUMNS of the bookings matching ``criteria``; it pages like a Booking query."""
+    return db.session.query(*LIST_COLUMNS).filter(*criteria)
+
+
+def format_booking_rows(rows, missing=None):
+    """BookingRows with the dates as YYYY-MM-DD strings (``missing`` where unset).
+
+    Listings repeat the same few dates, so each distinct date is
+    formatted once for the whole list rather than once per row.
+    """
+    formatted = {None: missing}
+    result = []
+    for row in rows:
+        values = list(row)
+        for index in _DATE_FIELDS:
+            value = values[index]
+            text = formatted.get(value)
+            if text is None and value is not None:
+                text = formatted[value] = value.isoformat()
+            values[index] = text
+        result.append(BookingRow._make(values))
+    return result
+
+
+def calendar_rows(start, end):
+    """Bookings with a training date in [start, end), in calendar order."""
+    return db.session.query(*CALENDAR_COLUMNS).filter(
+        Booking.training_date >= start,
+        Booking.training_date < end
+    ).order_by(Booking.training_date, Booking.id).all()
@@ -1,50 +1,23 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, send_file
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, send_file, Response, stream_with_context
 from flask_login import login_required, current_user
 from app.models import Booking
-from app.forms import BookingForm
+from app.forms import BookingForm, BulkCertificateForm, BookingImportForm
+from app.pagination import paginate_bookings, get_page_size
+from app.read_models import booking_rows, format_booking_rows
+from app.certificates import render_certificate, bulk_certificate_query, stream_certificate_zip, CertificateRecorder
+from app import search as booking_search
+from app.jobs import enqueue
+from app.attachments import save_attachment, send_attachment
+from app.booking_import import ImportFileError, import_bookings as run_booking_import
+from app.conditional import conditional
 from app import db
 from datetime import datetime, date, timedelta
 from flask import send_from_directory, abort, current_app
 import os
 from werkzeug.utils import secure_filename
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import landscape, letter
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from io import BytesIO
-from reportlab.lib.utils import ImageReader
-from PIL import Image
-import io
-from sqlalchemy import or_
-import sqlalchemy as sa
 
 bp = Blueprint('bookings', __name__)
 
-def parse_date(date_value):
-    if isinstance(date_value, (datetime, date)):
-        return date_value
-    elif isinstance(date_value, str):
-        try:
-            return datetime.strptime(date_value, '%Y-%m-%d').date()
-        except ValueError:
-            try:
-                return datetime.strptime(date_value, '%d-%m-%Y').date()
-            except ValueError:
-                current_app.logger.warning(f"Unable to parse date string: {date_value}")
-                return date_value  # Return the original string if parsing fails
-    elif isinstance(date_value, int):
-        try:
-            if 1900 <= date_value <= 9999:  # Assuming it's a year
-                return date(date_value, 1, 1)
-            else:
-                return datetime.fromtimestamp(date_value).date()
-        except ValueError:
-            current_app.logger.warning(f"Unable to parse integer as date: {date_value}")
-            return date_value  # Return the original integer if parsing fails
-    else:
-        current_app.logger.warning(f"Unexpected date type: {type(date_value)}")
-        return date_value  # Return the original value if it's an unexpected type
-
 @bp.route('/create', methods=['GET', 'POST'])
 @login_required
 def create_booking():
@@ -64,10 +37,7 @@ def create_booking():
             )
             
             if form.attachment.data:
-                attachment = form.attachment.data
-                filename = secure_filename(attachment.filename)
-                attachment.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
-                booking.attachment_filename = filename
+                save_attachment(booking, form.attachment.data)
             
             db.session.add(booking)
             db.session.commit()
@@ -110,136 +80,112 @@ def view_bookings():
     if query:
         return search_bookings()
     
-    bookings = Booking.query.filter_by(user_id=current_user.id).all()
-    formatted_bookings = []
-    for booking in bookings:
-        formatted_booking = booking.to_dict()
-        formatted_booking['booking_date'] = booking.booking_date if booking.booking_date else 'N/A'
-        formatted_booking['training_date'] = booking.training_date if booking.training_date else 'N/A'
-        formatted_bookings.append(formatted_booking)
-    
-    return render_template('bookings/bookings.html', bookings=formatted_bookings, search_query='')
+    page = paginate_bookings(
+        booking_rows(Booking.user_id == current_user.id),
+        get_page_size(),
+        after=request.args.get('after'),
+        before=request.args.get('before')
+    )
+    return render_template('bookings/bookings.html', bookings=format_booking_rows(page.items, missing='N/A'),
+                           page=page, search_query='')
 
 @bp.route('/search', methods=['GET'])
 @login_required
 def search_bookings():
     query = request.args.get('query', '')
-    bookings = Booking.query.filter(
-        or_(
-            Booking.id.cast(sa.String).like(f'%{query}%'),
-            Booking.client_name.ilike(f'%{query}%'),
-            Booking.email.ilike(f'%{query}%'),
-            Booking.mobile_number.ilike(f'%{query}%'),
-            Booking.status.ilike(f'%{query}%')
-        )
-    ).all()
-    
-    formatted_bookings = []
-    for booking in bookings:
-        formatted_booking = booking.to_dict()
-        formatted_booking['booking_date'] = booking.booking_date if booking.booking_date else 'N/A'
-        formatted_booking['training_date'] = booking.training_date if booking.training_date else 'N/A'
-        formatted_bookings.append(formatted_booking)
-    
-    return render_template('bookings/bookings.html', bookings=formatted_bookings, search_query=query)
+    bookings = booking_search.search_booking_rows(query)
+    return render_template('bookings/bookings.html', bookings=format_booking_rows(bookings, missing='N/A'),
+                           search_query=query)
 
 @bp.route('/generate_certificate/<int:booking_id>')
 @login_required
 def generate_certificate(booking_id):
     booking = Booking.query.get_or_404(booking_id)
-    
-    # Create a BytesIO buffer for the PDF
-    buffer = BytesIO()
-
-    # Create the PDF object, using the BytesIO object as its "file."
-    p = canvas.Canvas(buffer, pagesize=landscape(letter))
-
-    # Set white background
-    p.setFillColor(colors.white)
-    p.rect(0, 0, 11*inch, 8.5*inch, fill=True)
-
-    # Add logos
-    logo_left_path = os.path.join(current_app.root_path, 'static', 'images', 'logo_left.png')
-    logo_right_path = os.path.join(current_app.root_path, 'static', 'images', 'logo_right.png')
-    logo_size = 1.5*inch  # 1.5 inches is approximately 15% of the page width
-
-    if os.path.exists(logo_left_path):
-        p.drawImage(logo_left_path, 0.5*inch, 7*inch, width=logo_size, height=logo_size, mask='auto')
-    if os.path.exists(logo_right_path):
-        p.drawImage(logo_right_path, 9*inch, 7*inch, width=logo_size, height=logo_size, mask='auto')
-
-    # Add watermark with very low opacity (barely showing)
-    watermark_path = os.path.join(current_app.root_path, 'static', 'images', 'watermark.png')
-    if os.path.exists(watermark_path):
-        p.saveState()
-        p.setFillAlpha(0.05)  # Set fill opacity to 5%
-        p.drawImage(watermark_path, 1.5*inch, 2*inch, width=8*inch, height=4.5*inch, mask='auto')
-        p.restoreState()
-
-    # Certificate content
-    p.setFont("Helvetica-Bold", 30)
-    p.setFillColor(colors.navy)
-    p.drawCentredString(5.5*inch, 6*inch, "Certificate of Completion")
-    
-    p.setFont("Helvetica", 20)
-    p.setFillColor(colors.black)
-    p.drawCentredString(5.5*inch, 5*inch, "This is to certify that")
-    
-    p.setFont("Helvetica-Bold", 24)
-    p.setFillColor(colors.darkgreen)
-    p.drawCentredString(5.5*inch, 4*inch, booking.client_name)
-    
-    p.setFont("Helvetica", 20)
-    p.setFillColor(colors.black)
-    p.drawCentredString(5.5*inch, 3*inch, "has successfully completed the training on")
-    
-    p.setFont("Helvetica-Bold", 22)
-    p.setFillColor(colors.darkred)
-    p.drawCentredString(5.5*inch, 2*inch, str(booking.training_date))
-
-    # Add stamp
-    stamp_path = os.path.join(current_app.root_path, 'static', 'images', 'stamp.png')
-    if os.path.exists(stamp_path):
-        p.drawImage(stamp_path, 1*inch, 1*inch, width=2*inch, height=2*inch, mask='auto')
-
-    # Add signature line
-    p.setStrokeColor(colors.black)
-    p.line(7*inch, 1.5*inch, 10*inch, 1.5*inch)
-    p.setFont("Helvetica", 12)
-    p.setFillColor(colors.black)
-    p.drawCentredString(8.5*inch, 1*inch, "Authorized Signature")
-
-    # Close the PDF object cleanly, and we're done.
-    p.showPage()
-    p.save()
+    image_dir = os.path.join(current_app.root_path, 'static', 'images')
+    buffer = render_certificate(booking.client_name, booking.training_date, image_dir)
 
     # FileResponse sets the Content-Disposition header so that browsers
     # present the option to save the file.
-    buffer.seek(0)
     return send_file(buffer, as_attachment=True, download_name=f'certificate_{booking.client_name}.pdf', mimetype='application/pdf')
 
+@bp.route('/bulk_certificates', methods=['GET', 'POST'])
+@login_required
+def bulk_certificates():
+    if not current_user.is_admin:
+        abort(403)
+    form = BulkCertificateForm()
+    if form.validate_on_submit():
+        rows = bulk_certificate_query(
+            training_from=form.training_from.data,
+            training_to=form.training_to.data,
+            organization=form.organization_name.data or None,
+            status=form.status.data or None
+        ).all()
+        if not rows:
+            flash('No bookings match those filters.', 'info')
+            return redirect(url_for('bookings.bulk_certificates'))
+
+        image_dir = os.path.join(current_app.root_path, 'static', 'images')
+        recorder = CertificateRecorder(current_user.id, current_app.config['CERTIFICATE_ACHIEVEMENT'])
+        current_app.logger.info(f"Generating {len(rows)} certificates for {current_user.username}")
+        filename = f"certificates_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        return Response(
+            stream_with_context(stream_certificate_zip(rows, image_dir, recorder, current_app.config['CERTIFICATE_WORKERS'])),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+    return render_template('bookings/bulk_certificates.html', form=form)
+
+@bp.route('/import', methods=['GET', 'POST'])
+@login_required
+def import_bookings():
+    if not current_user.is_admin:
+        abort(403)
+    form = BookingImportForm()
+    result = None
+    if form.validate_on_submit():
+        upload = form.file.data
+        try:
+            result = run_booking_import(upload.stream, upload.filename, current_user.id, dry_run=form.dry_run.data)
+        except ImportFileError as e:
+            flash(str(e), 'error')
+        else:
+            current_app.logger.info(f"Booking import of {upload.filename} by {current_user.username}: {result.summary()}")
+            flash(result.summary(), 'success' if not result.failed else 'warning')
+    return render_template('bookings/import_bookings.html', form=form, result=result)
+
 @bp.route('/view_attachment/<int:booking_id>')
 @login_required
 def view_attachment(booking_id):
     booking = Booking.query.get_or_404(booking_id)
+    if booking.attachment_sha256:
+        # The stored object never changes, so send the browser to its cacheable URL.
+        return redirect(url_for('bookings.attachment', digest=booking.attachment_sha256,
+                                filename=booking.attachment_filename))
     if booking.attachment_filename:
         uploads_dir = current_app.config['UPLOAD_FOLDER']
         return send_from_directory(uploads_dir, booking.attachment_filename)
     else:
         abort(404)  # Return a 404 error if no attachment is found
 
+def _attachment_etag(digest, filename):
+    # Checked before any 304, so a made-up digest is a 404 rather than "not modified".
+    if not db.session.query(Booking.query.filter_by(attachment_sha256=digest).exists()).scalar():
+        abort(404)
+    return digest
+
+@bp.route('/attachments/<digest>/<filename>')
+@login_required
+@conditional(etag=_attachment_etag, immutable=True)
+def attachment(digest, filename):
+    _attachment_etag(digest, filename)
+    response = send_attachment(digest, secure_filename(filename))
+    if response is None:
+        abort(404)
+    return response
+
 @bp.route('/update_booking_statuses')
 @login_required
 def update_booking_statuses():
-    today = datetime.now().date()
-    bookings_to_update = Booking.query.filter(
-        Booking.training_date < today,
-        Booking.status.in_(['pending', 'approved'])
-    ).all()
-
-    for booking in bookings_to_update:
-        booking.status = 'completed'
-
-    db.session.commit()
-    
-    return f"Updated {len(bookings_to_update)} bookings to completed status."
\ No newline at end of file
+    job = enqueue('update_booking_statuses', user_id=current_user.id)
+    return f"Queued booking status update as job {job.id}.", 202
\ No newline at end of file
@@ -1,17 +1,28 @@
-from flask import current_app, render_template, redirect, url_for, flash, request, send_from_directory, abort
+from flask import current_app, render_template, redirect, url_for, flash, request, send_from_directory, abort, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user, logout_user, login_user
 from . import bp
-from app.models import User, Booking, Post, Certificate
+from app.models import User, Booking, Post, Certificate, Job
 from app.forms import LoginForm, PostForm, CreateUserForm, EditUserForm, BookingForm, BackupForm
+from app.pagination import paginate_bookings, get_page_size
+from app.read_models import booking_rows, format_booking_rows, calendar_rows
+from app.dashboard import get_snapshot
+from app.jobs import enqueue
+from app.tasks import backup_store, stream_full_backup
+from app.backups import read_manifest
+from app.attachments import save_attachment
+from app.identity import identity_cache_stats
+from app.template_cache import template_cache_stats
+from app.conditional import conditional
+from app.sql_profile import endpoint_stats
+from app.exports import DATASETS, FORMATS, stream_export, export_filename
+from app.ldap_auth import directory_user
+from app import stats
 from app import db
+from sqlalchemy.orm import joinedload
 from urllib.parse import urlparse
-from sqlalchemy import func
 from datetime import datetime, timedelta, date
-import os
-from werkzeug.utils import secure_filename
 from flask_wtf import FlaskForm
 from wtforms import SelectField, SubmitField
-import shutil
 from functools import wraps
 
 # Routes
@@ -19,54 +30,30 @@ from functools import wraps
 @bp.route('/')
 @login_required
 def index():
-    total_bookings = Booking.query.count()
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    recent_bookings = Booking.query.filter(Booking.booking_date >= thirty_days_ago).count()
-    pending_bookings = Booking.query.filter_by(status='pending').count()
-    total_certificates = Certificate.query.count()
-    recent_posts = Post.query.order_by(Post.created.desc()).limit(5).all()
-    upcoming_bookings = Booking.query.filter(Booking.booking_date >= datetime.now().date()).order_by(Booking.booking_date).limit(5).all()
-    
-    for booking in upcoming_bookings:
-        if isinstance(booking.booking_date, datetime):
-            booking.booking_date = booking.booking_date.strftime('%Y-%m-%d')
-
-    status_distribution = db.session.query(Booking.status, func.count(Booking.id)).group_by(Booking.status).all()
-    status_distribution = [{'status': status, 'count': count} for status, count in status_distribution]
-    total_users = User.query.count()
+    snapshot = get_snapshot()
+    status_distribution = [{'status': status, 'count': count} for status, count in snapshot['status_counts'].items()]
 
     return render_template('index.html', 
-                           total_bookings=total_bookings,
-                           recent_bookings=recent_bookings,
-                           pending_bookings=pending_bookings,
-                           total_certificates=total_certificates,
-                           recent_posts=recent_posts,
-                           upcoming_bookings=upcoming_bookings,
+                           total_bookings=snapshot['total_bookings'],
+                           recent_bookings=snapshot['recent_bookings'],
+                           pending_bookings=snapshot['status_counts'].get('pending', 0),
+                           total_certificates=snapshot['total_certificates'],
+                           recent_posts=snapshot['recent_posts'],
+                           upcoming_bookings=snapshot['upcoming_bookings'],
                            status_distribution=status_distribution,
-                           total_users=total_users)
+                           total_users=snapshot['total_users'])
 
 @bp.route('/view_bookings')
 @login_required
 def view_bookings():
     try:
-        bookings_query = Booking.query.filter_by(user_id=current_user.id)
-        bookings_data = []
-        for booking in bookings_query:
-            booking_dict = booking.to_dict()
-            for date_field in ['booking_date', 'training_date']:
-                date_value = getattr(booking, date_field)
-                if isinstance(date_value, date):
-                    booking_dict[date_field] = date_value.strftime('%Y-%m-%d')
-                elif isinstance(date_value, str):
-                    try:
-                        parsed_date = datetime.strptime(date_value, '%Y-%m-%d').date()
-                        booking_dict[date_field] = parsed_date.strftime('%Y-%m-%d')
-                    except ValueError:
-                        booking_dict[date_field] = None
-                else:
-                    booking_dict[date_field] = None
-            bookings_data.append(booking_dict)
-        return render_template('view_bookings.html', bookings=bookings_data)
+        page = paginate_bookings(
+            booking_rows(Booking.user_id == current_user.id),
+            get_page_size(),
+            after=request.args.get('after'),
+            before=request.args.get('before')
+        )
+        return render_template('view_bookings.html', bookings=format_booking_rows(page.items), page=page)
     except Exception as e:
         current_app.logger.error(f"Error retrieving bookings: {str(e)}")
         error_message = "An error occurred while retrieving bookings. Please try again later."
@@ -74,20 +61,34 @@ def view_bookings():
 
 @bp.route('/booking_calendar')
 @login_required
+@conditional()
 def booking_calendar():
-    bookings = Booking.query.all()
-    calendar_events = []
-    for booking in bookings:
-        parsed_training_date = booking.training_date
-        if isinstance(parsed_training_date, str):
-            parsed_training_date = datetime.strptime(parsed_training_date, '%Y-%m-%d')
-        calendar_events.append({
-            'title': f"{booking.client_name} - {booking.status}",
-            'start': parsed_training_date.isoformat() if parsed_training_date else None,
-            'url': url_for('main.edit_booking', id=booking.id),
-            'color': '#28a745' if booking.status == 'approved' else '#ffc107'
-        })
-    return render_template('bookings/booking_calendar.html', calendar_events=calendar_events)
+    return render_template('bookings/booking_calendar.html')
+
+def parse_calendar_date(value):
+    # FullCalendar sends ISO 8601 datetimes with an offset; only the day matters here.
+    try:
+        return date.fromisoformat((value or '')[:10])
+    except ValueError:
+        return None
+
+@bp.route('/booking_calendar/events')
+@login_required
+@conditional('booking')
+def booking_calendar_events():
+    start = parse_calendar_date(request.args.get('start'))
+    end = parse_calendar_date(request.args.get('end'))
+    if start is None or end is None or end <= start:
+        abort(400)
+    end = min(end, start + timedelta(days=current_app.config['CALENDAR_MAX_DAYS']))
+
+    calendar_events = [{
+        'title': f"{row.client_name} - {row.status}",
+        'start': row.training_date.isoformat(),
+        'url': url_for('main.edit_booking', id=row.id),
+        'color': '#28a745' if row.status == 'approved' else '#ffc107'
+    } for row in calendar_rows(start, end)]
+    return jsonify(calendar_events)
 
 @bp.route('/logout')
 @login_required
@@ -103,7 +104,13 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(username=form.username.data).first()
-        if user is None or not user.check_password(form.password.data):
+        if user is not None and user.password_hash:
+            # Local accounts only ever sign in with their local password.
+            if not user.check_password(form.password.data):
+                user = None
+        else:
+            user = directory_user(form.username.data, form.password.data)
+        if user is None:
             flash('Invalid username or password', 'danger')
             return redirect(url_for('main.login'))
         login_user(user, remember=form.remember_me.data)
@@ -160,7 +167,7 @@ def edit_user(id):
         flash('You do not have permission to edit users.', 'danger')
         return redirect(url_for('main.index'))
     user = User.query.get_or_404(id)
-    form = EditUserForm(obj=user)
+    form = EditUserForm(user.username, obj=user)
     if form.validate_on_submit():
         user.username = form.username.data
         user.email = form.email.data
@@ -186,41 +193,25 @@ def delete_user(id):
 
 @bp.route('/statistics')
 @login_required
+@conditional('booking', 'user', key=date.today)
 def statistics():
     if not current_user.is_admin:
         flash('You do not have permission to view statistics.', 'danger')
         return redirect(url_for('main.index'))
 
-    total_bookings = Booking.query.count()
-    current_month = datetime.now().replace(day=1)
-    monthly_bookings = Booking.query.filter(Booking.booking_date >= current_month).count()
-    completed_bookings = Booking.query.filter_by(status='completed').count()
-    completion_rate = (completed_bookings / total_bookings) * 100 if total_bookings > 0 else 0
-
-    last_30_days = datetime.now() - timedelta(days=30)
-    daily_bookings = db.session.query(
-        func.date(Booking.booking_date).label('date'),
-        func.count(Booking.id).label('count')
-    ).filter(Booking.booking_date >= last_30_days).group_by(func.date(Booking.booking_date)).all()
-
-    status_distribution = db.session.query(
-        Booking.status, func.count(Booking.id)
-    ).group_by(Booking.status).all()
-
-    top_clients = db.session.query(
-        Booking.client_name, func.count(Booking.id).label('booking_count')
-    ).group_by(Booking.client_name).order_by(func.count(Booking.id).desc()).limit(5).all()
-
-    new_users_last_30_days = User.query.filter(User.created_at >= last_30_days).count()
-
-    return render_template('statistics.html',
-                           total_bookings=total_bookings,
-                           monthly_bookings=monthly_bookings,
-                           completion_rate=completion_rate,
-                           daily_bookings=daily_bookings,
-                           status_distribution=status_distribution,
-                           top_clients=top_clients,
-                           new_users=new_users_last_30_days)
+    summary = stats.statistics_summary()
+    new_users_last_30_days = User.query.filter(User.created_at >= datetime.now() - timedelta(days=30)).count()
+    return render_template('statistics.html', new_users=new_users_last_30_days, **summary)
+
+@bp.route('/booking_trends')
+@login_required
+def booking_trends():
+    if not current_user.is_admin:
+        flash('You do not have permission to view statistics.', 'danger')
+        return redirect(url_for('main.index'))
+
+    months = min(max(request.args.get('months', 12, type=int), 1), 60)
+    return render_template('booking_trends.html', months=months, **stats.booking_trends(months))
 
 @bp.route('/manual_backup', methods=['GET', 'POST'])
 @login_required
@@ -232,25 +223,83 @@ def manual_backup():
     form = BackupForm()
     if form.validate_on_submit():
         backup_type = form.backup_type.data
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_dir = os.path.join(current_app.root_path, '..', 'backups')
-        os.makedirs(backup_dir, exist_ok=True)
-
-        if backup_type == 'full':
-            backup_filename = f'full_backup_{timestamp}.zip'
-            backup_path = os.path.join(backup_dir, backup_filename)
-            shutil.make_archive(backup_path[:-4], 'zip', current_app.root_path)
-        else:  # incremental
-            backup_filename = f'incremental_backup_{timestamp}.zip'
-            backup_path = os.path.join(backup_dir, backup_filename)
-            db_file = current_app.config['SQLALCHEMY_DATABASE_URI'].replace('sqlite:///', '')
-            shutil.copy2(db_file, backup_path)
-
-        flash(f'{backup_type.capitalize()} backup created successfully: {backup_filename}', 'success')
-        return redirect(url_for('main.manual_backup'))
+        job = enqueue('backup_database', {'backup_type': backup_type}, user_id=current_user.id)
+        flash(f'{backup_type.capitalize()} backup queued as job #{job.id}.', 'success')
+        return redirect(url_for('main.backup_status'))
 
     return render_template('manual_backup.html', form=form)
 
+@bp.route('/manual_backup/download')
+@login_required
+def download_backup():
+    if not current_user.is_admin:
+        abort(403)
+    filename = f"full_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.tar.gz"
+    return Response(stream_with_context(stream_full_backup()), mimetype='application/gzip',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@bp.route('/backup_status')
+@login_required
+def backup_status():
+    if not current_user.is_admin:
+        flash('You do not have permission to view backups.', 'danger')
+        return redirect(url_for('main.index'))
+    jobs = Job.query.order_by(Job.id.desc()).limit(20).all()
+    active = any(not job.is_finished for job in jobs)
+    manifest = read_manifest(backup_store().root)
+    return render_template('backup_status.html', jobs=jobs, active=active, snapshots=manifest[-10:][::-1],
+                           store_size=sum(entry['new_bytes'] for entry in manifest))
+
+@bp.route('/jobs/<int:job_id>')
+@login_required
+def job_status(job_id):
+    job = Job.query.get_or_404(job_id)
+    if not current_user.is_admin and job.created_by != current_user.id:
+        abort(403)
+    return jsonify(job.to_dict())
+
+@bp.route('/identity_cache')
+@login_required
+def identity_cache():
+    if not current_user.is_admin:
+        abort(403)
+    return jsonify(identity_cache_stats())
+
+@bp.route('/template_cache')
+@login_required
+def template_cache():
+    if not current_user.is_admin:
+        abort(403)
+    return jsonify(template_cache_stats())
+
+@bp.route('/sql_profile', methods=['GET', 'POST'])
+@login_required
+def sql_profile():
+    if not current_user.is_admin:
+        abort(403)
+    if 'sql_profile' not in current_app.extensions:
+        flash('SQL profiling is turned off (SQL_PROFILING).', 'info')
+        return redirect(url_for('main.index'))
+    if request.method == 'POST':
+        current_app.extensions['sql_profile'].reset()
+        return redirect(url_for('main.sql_profile'))
+    return render_template('admin/sql_profile.html', endpoints=endpoint_stats(),
+                           threshold=current_app.config['SQL_N_PLUS_ONE_THRESHOLD'])
+
+@bp.route('/export/<dataset>')
+@login_required
+def export(dataset):
+    if not current_user.is_admin:
+        abort(403)
+    fmt = request.args.get('format', 'csv')
+    if dataset not in DATASETS or fmt not in FORMATS:
+        abort(404)
+    start = parse_calendar_date(request.args.get('from', ''))
+    end = parse_calendar_date(request.args.get('to', ''))
+    current_app.logger.info(f"{current_user.username} exported {dataset} as {fmt}")
+    return Response(stream_with_context(stream_export(dataset, fmt, start, end)), mimetype=FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename={export_filename(dataset, fmt)}'})
+
 @bp.route('/create_booking', methods=['GET', 'POST'])
 @login_required
 def create_booking():
@@ -259,13 +308,6 @@ def create_booking():
         booking_date = form.booking_date.data
         training_date = booking_date + timedelta(days=30) if booking_date else None
         
-        attachment_filename = None
-        if form.attachment.data:
-            attachment = form.attachment.data
-            attachment_filename = secure_filename(attachment.filename)
-            attachment_path = os.path.join(current_app.config['UPLOAD_FOLDER'], attachment_filename)
-            attachment.save(attachment_path)
-        
         booking = Booking(
             user_id=current_user.id,
             client_name=form.client_name.data,
@@ -275,9 +317,10 @@ def create_booking():
             training_date=training_date,
             status=form.status.data,
             organization_name=form.organization_name.data,
-            address=form.address.data,
-            attachment_filename=attachment_filename
+            address=form.address.data
         )
+        if form.attachment.data:
+            save_attachment(booking, form.attachment.data)
         db.session.add(booking)
         db.session.commit()
         flash('Booking created successfully!', 'success')
@@ -300,11 +343,7 @@ def edit_booking(id):
         booking.status = form.status.data
         booking.organization_name = form.organization_name.data
         if form.attachment.data:
-            attachment = form.attachment.data
-            attachment_filename = secure_filename(attachment.filename)
-            attachment_path = os.path.join(current_app.config['UPLOAD_FOLDER'], attachment_filename)
-            attachment.save(attachment_path)
-            booking.attachment_filename = attachment_filename
+            save_attachment(booking, form.attachment.data)
         db.session.commit()
         flash('Booking updated successfully', 'success')
         return redirect(url_for('main.view_bookings'))
@@ -312,9 +351,32 @@ def edit_booking(id):
 
 @bp.route('/posts')
 @login_required
+@conditional('post', 'user')
 def view_posts():
-    posts = Post.query.order_by(Post.created.desc()).all()
-    return render_template('posts/view_posts.html', posts=posts)
+    posts = Post.query.options(joinedload(Post.author)).order_by(Post.created.desc()).all()
+    return render_template('posts/posts.html', posts=posts)
+
+@bp.route('/post/<int:id>')
+@login_required
+@conditional('post', 'user')
+def view_post(id):
+    post = Post.query.get_or_404(id)
+    return render_template('posts/view_post.html', post=post)
+
+@bp.route('/post/<int:id>/edit', methods=['GET', 'POST'])
+@login_required
+def edit_post(id):
+    post = Post.query.get_or_404(id)
+    if post.author_id != current_user.id and not current_user.is_admin:
+        abort(403)
+    form = PostForm(obj=post)
+    if form.validate_on_submit():
+        post.title = form.title.data
+        post.content = form.content.data
+        db.session.commit()
+        flash('Your post has been updated!', 'success')
+        return redirect(url_for('main.view_post', id=post.id))
+    return render_template('posts/edit_post.html', form=form, post=post)
 
 @bp.route('/create_post', methods=['GET', 'POST'])
 @login_required
@@ -0,0 +1,137 @@
+from flask import current_app
+from sqlalchemy import DDL, event, or_, text
+from sqlalchemy.exc import OperationalError
+import sqlalchemy as sa
+
+from app import db
+from app.models import Booking
+from app.read_models import LIST_COLUMNS
+
+SEARCH_COLUMNS = ('reference_number', 'client_name', 'email', 'mobile_number', 'organization_name', 'status')
+MIN_QUERY_LENGTH = 3  # the trigram tokenizer cannot match anything shorter
+
+_columns = ', '.join(SEARCH_COLUMNS)
+_new_values = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+_old_values = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+
+# External-content FTS5 table over booking, kept in sync by triggers so that
+# bulk UPDATEs issued outside the ORM are indexed as well.
+SEARCH_INDEX_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS booking_fts USING fts5("
+    f"{_columns}, content='booking', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS booking_fts_ai AFTER INSERT ON booking BEGIN "
+    f"INSERT INTO booking_fts(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS booking_fts_ad AFTER DELETE ON booking BEGIN "
+    f"INSERT INTO booking_fts(booking_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS booking_fts_au AFTER UPDATE OF {_columns} ON booking BEGIN "
+    f"INSERT INTO booking_fts(booking_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); "
+    f"INSERT INTO booking_fts(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+]
+
+for _statement in SEARCH_INDEX_DDL:
+    event.listen(Booking.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+
+SEARCH_INDEX_DROP = [
+    'DROP TRIGGER IF EXISTS booking_fts_au',
+    'DROP TRIGGER IF EXISTS booking_fts_ad',
+    'DROP TRIGGER IF EXISTS booking_fts_ai',
+    'DROP TABLE IF EXISTS booking_fts',
+]
+
+
+def rebuild_search_index():
+    # Recreated rather than only repopulated, so an index over an older column set is replaced.
+    with db.engine.begin() as connection:
+        for statement in SEARCH_INDEX_DROP + SEARCH_INDEX_DDL:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("INSERT INTO booking_fts(booking_fts) VALUES ('rebuild')")
+        return connection.exec_driver_sql('SELECT count(*) FROM booking').scalar()
+
+
+def _fallback_search(query, limit, entities=(Booking,)):
+    # A fragment shorter than MIN_QUERY_LENGTH would match most reference numbers.
+    reference = [Booking.reference_number.ilike(f'%{query}%')] if len(query) >= MIN_QUERY_LENGTH else []
+    return db.session.query(*entities).filter(
+        or_(
+            *reference,
+            Booking.id.cast(sa.String).like(f'%{query}%'),
+            Booking.client_name.ilike(f'%{query}%'),
+            Booking.email.ilike(f'%{query}%'),
+            Booking.mobile_number.ilike(f'%{query}%'),
+            Booking.status.ilike(f'%{query}%')
+        )
+    ).limit(limit).all()
+
+
+FIELD_WEIGHTS = {
+    'reference_number': 8,
+    'client_name': 8,
+    'email': 4,
+    'mobile_number': 4,
+    'organization_name': 2,
+    'status': 1,
+}
+
+
+def _score(booking, needle):
+    score = 0
+    for field, weight in FIELD_WEIGHTS.items():
+        value = (getattr(booking, field) or '').lower()
+        if value == needle:
+            score += weight * 4
+        elif value.startswith(needle) or f' {needle}' in value:
+            score += weight * 2
+        elif needle in value:
+            score += weight
+    return score
+
+
+def _search(query, limit, entities):
+    """Rows of ``entities`` for bookings matching ``query``, best matches first.
+
+    Substring matches come from the booking_fts trigram index. Scoring
+    every match with bm25 grows with the table, so only the newest
+    SEARCH_RANK_WINDOW matches are ranked, by field weight and by whether
+    the query hits a whole value, a word start or just a substring. A
+    numeric query also matches the booking id exactly.
+    """
+    query = query.strip()
+    if limit is None:
+        limit = current_app.config.get('SEARCH_RESULTS_LIMIT', 50)
+    if not query:
+        return []
+    if len(query) < MIN_QUERY_LENGTH or db.engine.dialect.name != 'sqlite':
+        return _fallback_search(query, limit, entities)
+
+    window = max(limit, current_app.config.get('SEARCH_RANK_WINDOW', 200))
+    phrase = '"' + query.replace('"', '""') + '"'
+    try:
+        ids = db.session.execute(
+            text('SELECT rowid FROM booking_fts WHERE booking_fts MATCH :phrase ORDER BY rowid DESC LIMIT :window'),
+            {'phrase': phrase, 'window': window}
+        ).scalars().all()
+    except OperationalError as e:
+        current_app.logger.warning(f"Booking search index unavailable, run 'flask rebuild-search-index': {str(e)}")
+        db.session.rollback()
+        return _fallback_search(query, limit, entities)
+    exact_id = int(query) if query.isdigit() else None
+    if exact_id is not None and exact_id not in ids:
+        ids.append(exact_id)
+    if not ids:
+        return []
+
+    needle = query.lower()
+    bookings = db.session.query(*entities).filter(Booking.id.in_(ids)).all()
+    bookings.sort(key=lambda b: (b.id != exact_id, -_score(b, needle), -b.id))
+    return bookings[:limit]
+
+
+def search_bookings(query, limit=None):
+    """Return the Bookings matching ``query``, best matches first (see _search)."""
+    return _search(query, limit, (Booking,))
+
+
+def search_booking_rows(query, limit=None):
+    """Like search_bookings, but as read_models.LIST_COLUMNS rows for the list pages."""
+    return _search(query, limit, LIST_COLUMNS)
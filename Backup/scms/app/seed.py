@@ -0,0 +1,138 @@
+import random
+from datetime import date, datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.dashboard import invalidate_snapshot
+from app.template_cache import invalidate_fragments
+from app.models import Booking, Certificate, Post, ReferenceSequence, User, UserLog
+
+# Bookings generated for each named scale; everything else is sized from that.
+SCALES = {'1k': 1000, '100k': 100000, '1m': 1000000}
+SEED_PASSWORD = 'password'
+BATCH_SIZE = 10000
+
+FIRST_NAMES = ['Amara', 'Ben', 'Chen', 'Dara', 'Elif', 'Femi', 'Grace', 'Hiro', 'Ines', 'Jonas', 'Kavya',
+               'Liam', 'Maya', 'Noah', 'Olga', 'Priya', 'Quinn', 'Rosa', 'Sami', 'Tariq', 'Uma', 'Vera']
+LAST_NAMES = ['Adeyemi', 'Baker', 'Costa', 'Dubois', 'Evans', 'Fischer', 'Garcia', 'Haddad', 'Ito', 'Jensen',
+              'Khan', 'Larsen', 'Moreau', 'Nakamura', 'Okafor', 'Patel', 'Rossi', 'Silva', 'Tanaka', 'Weber']
+ORGANIZATIONS = ['Northwind Logistics', 'Harbour Health', 'Summit Engineering', 'Cedar Schools', 'Blue Fin Foods',
+                 'Atlas Construction', 'Riverbank Council', 'Kestrel Airways', None]
+STREETS = ['High Street', 'Station Road', 'Mill Lane', 'Church Street', 'Park Avenue', 'Queens Road']
+LOG_ACTIONS = ['login', 'logout', 'create_booking', 'edit_booking', 'generate_certificate', 'view_statistics']
+HISTORY_DAYS = 3 * 365
+AHEAD_DAYS = 90
+
+
+def scale_sizes(bookings):
+    return {
+        'users': max(10, bookings // 100),
+        'bookings': bookings,
+        'posts': max(5, bookings // 20),
+        'logs': bookings,
+    }
+
+
+def _batches(total):
+    for offset in range(0, total, BATCH_SIZE):
+        yield offset, min(BATCH_SIZE, total - offset)
+
+
+def _status(rng, booking_date, today):
+    if booking_date < today - timedelta(days=30):
+        return rng.choices(['completed', 'cancelled', 'pending'], weights=[80, 15, 5])[0]
+    return rng.choices(['pending', 'approved', 'cancelled'], weights=[55, 40, 5])[0]
+
+
+def _seed_users(rng, count, offset, now):
+    # One hash for every seeded account: hashing each would dominate a large seed. The password is
+    # shared and public, so seeded accounts are never admins; create those with `flask create-admin`.
+    password_hash = generate_password_hash(SEED_PASSWORD)
+    rows = [{
+        'username': f'seed{offset + i}',
+        'email': f'seed{offset + i}@example.com',
+        'password_hash': password_hash,
+        'is_admin': False,
+        'created_at': now - timedelta(days=rng.randrange(HISTORY_DAYS)),
+    } for i in range(count)]
+    db.session.execute(User.__table__.insert(), rows)
+    return [user_id for (user_id,) in db.session.query(User.id).filter(
+        User.username.in_([row['username'] for row in rows]))]
+
+
+def _seed_bookings(rng, count, user_ids, today, achievement, progress):
+    certificates = 0
+    for offset, size in _batches(count):
+        rows = []
+        for _ in range(size):
+            booking_date = today + timedelta(days=rng.randrange(-HISTORY_DAYS, AHEAD_DAYS))
+            client_name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+            rows.append({
+                'user_id': rng.choice(user_ids),
+                'client_name': client_name,
+                'email': f"{client_name.lower().replace(' ', '.')}{rng.randrange(1000)}@example.com",
+                'mobile_number': f'07{rng.randrange(10 ** 9):09d}',
+                'booking_date': booking_date,
+                'training_date': booking_date + timedelta(days=30),
+                'status': _status(rng, booking_date, today),
+                'organization_name': rng.choice(ORGANIZATIONS),
+                'address': f'{rng.randrange(1, 200)} {rng.choice(STREETS)}',
+            })
+        ReferenceSequence.number_rows(db.session.connection(), rows)
+        db.session.execute(Booking.__table__.insert(), rows)
+
+        issued = [{'client_name': row['client_name'], 'achievement': achievement, 'date': row['training_date'],
+                   'user_id': row['user_id'], 'created_at': datetime.combine(row['training_date'], datetime.min.time())}
+                  for row in rows if row['status'] == 'completed' and row['training_date'] < today and rng.random() < 0.5]
+        if issued:
+            db.session.execute(Certificate.__table__.insert(), issued)
+        certificates += len(issued)
+        db.session.commit()
+        if progress:
+            progress(size)
+    return certificates
+
+
+def _seed_posts(rng, count, user_ids, now):
+    for offset, size in _batches(count):
+        db.session.execute(Post.__table__.insert(), [{
+            'title': f'Training update {offset + i + 1}',
+            'content': f'Sessions with {rng.choice(ORGANIZATIONS) or "new clients"} are scheduled for next month.',
+            'created': now - timedelta(minutes=rng.randrange(HISTORY_DAYS * 24 * 60)),
+            'author_id': rng.choice(user_ids),
+        } for i in range(size)])
+        db.session.commit()
+
+
+def _seed_logs(rng, count, user_ids, now):
+    for offset, size in _batches(count):
+        db.session.execute(UserLog.__table__.insert(), [{
+            'user_id': rng.choice(user_ids),
+            'action': rng.choice(LOG_ACTIONS),
+            'details': 'seeded',
+            'timestamp': now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400)),
+        } for _ in range(size)])
+        db.session.commit()
+
+
+def seed_database(bookings, seed=0, achievement='Certificate of Completion', progress=None):
+    """Add synthetic users, bookings, certificates, posts and logs sized for ``bookings`` bookings.
+
+    The data is random but repeatable for a given ``seed``: bookings span
+    the last three years and the next three months, older ones mostly
+    completed, and about half of the completed ones have a certificate.
+    Seeded users are not admins and sign in with SEED_PASSWORD. Returns the rows added per table.
+    """
+    rng = random.Random(seed)
+    sizes = scale_sizes(bookings)
+    today = date.today()
+    now = datetime.utcnow()
+    user_ids = _seed_users(rng, sizes['users'], db.session.query(User.id).count(), now)
+    db.session.commit()
+    certificates = _seed_bookings(rng, sizes['bookings'], user_ids, today, achievement, progress)
+    _seed_posts(rng, sizes['posts'], user_ids, now)
+    _seed_logs(rng, sizes['logs'], user_ids, now)
+    invalidate_snapshot()
+    invalidate_fragments()
+    return dict(sizes, certificates=certificates)
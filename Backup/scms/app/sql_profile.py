@@ -0,0 +1,147 @@
+import re
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_login import current_user
+from sqlalchemy import event
+
+from app import db
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETER_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """``statement`` with literals and IN-lists folded, so repeats of one query compare equal."""
+    shape = _LITERALS.sub('?', statement)
+    shape = _PARAMETER_LISTS.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes = {}
+
+    def record(self, statement, elapsed):
+        self.queries += 1
+        self.db_time += elapsed
+        shape = statement_shape(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self, threshold):
+        """Shapes of SELECTs run at least ``threshold`` times, most repeated first."""
+        repeats = [(count, shape) for shape, count in self.shapes.items()
+                   if count >= threshold and shape.upper().startswith('SELECT')]
+        return sorted(repeats, reverse=True)
+
+
+class EndpointStats:
+    """Per-endpoint request counts, query counts and DB time for this worker since it started."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def add(self, endpoint, profile, elapsed, repeated):
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'endpoint': endpoint, 'requests': 0, 'queries': 0, 'max_queries': 0,
+                'db_time': 0.0, 'max_db_time': 0.0, 'total_time': 0.0, 'n_plus_one': 0, 'repeated': {},
+            })
+            stats['requests'] += 1
+            stats['queries'] += profile.queries
+            stats['max_queries'] = max(stats['max_queries'], profile.queries)
+            stats['db_time'] += profile.db_time
+            stats['max_db_time'] = max(stats['max_db_time'], profile.db_time)
+            stats['total_time'] += elapsed
+            if repeated:
+                stats['n_plus_one'] += 1
+            for count, shape in repeated:
+                stats['repeated'][shape] = max(stats['repeated'].get(shape, 0), count)
+
+    def ranked(self):
+        """Endpoints by total DB time, with per-request averages in milliseconds."""
+        with self._lock:
+            rows = []
+            for stats in self._endpoints.values():
+                requests = stats['requests']
+                rows.append({
+                    'endpoint': stats['endpoint'],
+                    'requests': requests,
+                    'db_time_ms': stats['db_time'] * 1000,
+                    'avg_db_time_ms': stats['db_time'] / requests * 1000,
+                    'max_db_time_ms': stats['max_db_time'] * 1000,
+                    'avg_time_ms': stats['total_time'] / requests * 1000,
+                    'avg_queries': stats['queries'] / requests,
+                    'max_queries': stats['max_queries'],
+                    'n_plus_one': stats['n_plus_one'],
+                    'repeated': sorted(((count, shape) for shape, count in stats['repeated'].items()), reverse=True),
+                })
+        return sorted(rows, key=lambda row: row['db_time_ms'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('sql_profile_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['sql_profile_started'].pop()
+    if has_request_context():
+        profile = g.get('sql_profile')
+        if profile is not None:
+            profile.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute.
+    stack = exception_context.connection.info.get('sql_profile_started') if exception_context.connection else None
+    if stack:
+        stack.pop()
+
+
+def _start_profile():
+    g.sql_profile = RequestProfile()
+
+
+def _finish_profile(response):
+    profile = g.pop('sql_profile', None)
+    if profile is None:
+        return response
+    elapsed = time.perf_counter() - profile.started
+    endpoint = request.endpoint or '(unmatched)'
+    repeated = profile.repeated(current_app.config['SQL_N_PLUS_ONE_THRESHOLD'])
+    for count, shape in repeated:
+        current_app.logger.warning(f"Possible N+1 in {endpoint}: {count} runs of {shape[:200]}")
+    current_app.extensions['sql_profile'].add(endpoint, profile, elapsed, repeated)
+    # Timings describe the schema and the server's load; keep them from anonymous clients.
+    if not (current_app.debug or (current_user.is_authenticated and current_user.is_admin)):
+        return response
+    response.headers.add('Server-Timing', f'db;dur={profile.db_time * 1000:.1f};desc="{profile.queries} queries"')
+    response.headers.add('Server-Timing', f'app;dur={elapsed * 1000:.1f}')
+    return response
+
+
+def endpoint_stats():
+    return current_app.extensions['sql_profile'].ranked()
+
+
+def init_app(app):
+    if not app.config.get('SQL_PROFILING'):
+        return
+    app.extensions['sql_profile'] = EndpointStats()
+    engine = db.engine
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
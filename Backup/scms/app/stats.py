@@ -0,0 +1,136 @@
+from datetime import date, timedelta
+
+from sqlalchemy import DDL, event, func
+
+from app import db
+from app.models import Booking, BookingDailyStats
+
+TOP_CLIENTS = 5
+CERTIFICATE_CLIENTS = 50
+
+
+def _match(row):
+    # IS, not =, so bookings without a date share one NULL-day row per status and user.
+    return f"day IS {row}.booking_date AND status = {row}.status AND user_id = {row}.user_id"
+
+
+def _count(row):
+    return (
+        f"UPDATE booking_daily_stats SET bookings = bookings + 1 WHERE {_match(row)}; "
+        f"INSERT INTO booking_daily_stats(day, status, user_id, bookings) "
+        f"SELECT {row}.booking_date, {row}.status, {row}.user_id, 1 "
+        f"WHERE NOT EXISTS (SELECT 1 FROM booking_daily_stats WHERE {_match(row)}); "
+    )
+
+
+def _uncount(row):
+    return (
+        f"UPDATE booking_daily_stats SET bookings = bookings - 1 WHERE {_match(row)}; "
+        f"DELETE FROM booking_daily_stats WHERE {_match(row)} AND bookings <= 0; "
+    )
+
+
+# Kept in step with booking by triggers, like booking_fts, so that the
+# set-based status sweep and archiving deletes are counted as well.
+DAILY_STATS_DDL = [
+    f"CREATE TRIGGER IF NOT EXISTS booking_daily_stats_ai AFTER INSERT ON booking BEGIN {_count('new')}END",
+    f"CREATE TRIGGER IF NOT EXISTS booking_daily_stats_ad AFTER DELETE ON booking BEGIN {_uncount('old')}END",
+    f"CREATE TRIGGER IF NOT EXISTS booking_daily_stats_au AFTER UPDATE OF booking_date, status, user_id ON booking "
+    f"WHEN old.booking_date IS NOT new.booking_date OR old.status IS NOT new.status OR old.user_id IS NOT new.user_id "
+    f"BEGIN {_uncount('old')}{_count('new')}END",
+]
+
+for _statement in DAILY_STATS_DDL:
+    event.listen(Booking.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+
+def rebuild_daily_stats():
+    """Recount booking_daily_stats from the booking table; returns the number of bookings."""
+    with db.engine.begin() as connection:
+        for statement in DAILY_STATS_DDL:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql('DELETE FROM booking_daily_stats')
+        connection.exec_driver_sql(
+            'INSERT INTO booking_daily_stats(day, status, user_id, bookings) '
+            'SELECT booking_date, status, user_id, count(*) FROM booking GROUP BY booking_date, status, user_id'
+        )
+        return connection.exec_driver_sql('SELECT coalesce(sum(bookings), 0) FROM booking_daily_stats').scalar()
+
+
+def _in_range(query, start, end):
+    if start is not None:
+        query = query.filter(BookingDailyStats.day >= start)
+    if end is not None:
+        query = query.filter(BookingDailyStats.day <= end)
+    return query
+
+
+def status_counts(start=None, end=None):
+    """[{'status', 'count'}] for bookings dated between start and end, largest first."""
+    total = func.sum(BookingDailyStats.bookings)
+    rows = _in_range(db.session.query(BookingDailyStats.status, total), start, end) \
+        .group_by(BookingDailyStats.status).order_by(total.desc(), BookingDailyStats.status).all()
+    return [{'status': status, 'count': count} for status, count in rows]
+
+
+def daily_counts(start, end=None):
+    """[(day, count)] for each day between start and end that has bookings."""
+    return _in_range(
+        db.session.query(BookingDailyStats.day, func.sum(BookingDailyStats.bookings)), start, end
+    ).group_by(BookingDailyStats.day).order_by(BookingDailyStats.day).all()
+
+
+def booking_count(start=None, end=None):
+    return _in_range(db.session.query(func.coalesce(func.sum(BookingDailyStats.bookings), 0)), start, end).scalar()
+
+
+def top_clients(start, limit=TOP_CLIENTS):
+    # Client names are not in the rollup; the booking_date index bounds this to the range shown.
+    return db.session.query(
+        Booking.client_name, func.count(Booking.id).label('booking_count')
+    ).filter(Booking.booking_date >= start).group_by(Booking.client_name) \
+        .order_by(func.count(Booking.id).desc()).limit(limit).all()
+
+
+def statistics_summary(today=None, days=30):
+    today = today or date.today()
+    start = today - timedelta(days=days)
+    statuses = status_counts()
+    total_bookings = sum(row['count'] for row in statuses)
+    completed = next((row['count'] for row in statuses if row['status'] == 'completed'), 0)
+    return {
+        'total_bookings': total_bookings,
+        'monthly_bookings': booking_count(today.replace(day=1)),
+        'completion_rate': completed / total_bookings * 100 if total_bookings else 0,
+        'daily_bookings': [{'date': day.isoformat(), 'count': count} for day, count in daily_counts(start)],
+        'status_distribution': statuses,
+        'top_clients': top_clients(start),
+    }
+
+
+def _month_start(day, months_back):
+    month = day.year * 12 + day.month - 1 - months_back
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def booking_trends(months=12, today=None):
+    """Monthly totals, status mix, weekday popularity and certificate candidates for the last ``months`` months."""
+    today = today or date.today()
+    start = _month_start(today, months - 1)
+    end = _month_start(today, -1) - timedelta(days=1)
+    monthly, weekdays = {}, {}
+    for day, count in daily_counts(start, end):
+        monthly[day.strftime('%Y-%m')] = monthly.get(day.strftime('%Y-%m'), 0) + count
+        weekdays[day.weekday()] = weekdays.get(day.weekday(), 0) + count
+    clients = Booking.query.with_entities(Booking.client_name, Booking.training_date).filter(
+        Booking.status == 'completed', Booking.training_date.between(start, end)
+    ).order_by(Booking.training_date.desc()).limit(CERTIFICATE_CLIENTS).all()
+    return {
+        'start': start,
+        'end': end,
+        'monthly_bookings': [{'month': month, 'count': count} for month, count in sorted(monthly.items())],
+        'status_distribution': status_counts(start, end),
+        'day_of_week_popularity': [{'day': date(2024, 1, 1 + weekday).strftime('%A'), 'count': weekdays[weekday]}
+                                   for weekday in sorted(weekdays)],
+        'clients': [{'name': name, 'training_date': training_date.isoformat()} for name, training_date in clients],
+    }
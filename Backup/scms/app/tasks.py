@@ -0,0 +1,166 @@
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, date
+from itertools import chain
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from app import db
+from app.archive import ArchiveRules, DEFAULT_EXCLUDE, iter_files, stream_archive, write_archive
+from app.backup_store import BackupStore
+from app.backups import online_backup
+from app.dashboard import invalidate_snapshot
+from app.template_cache import invalidate_fragments
+from app.jobs import acquire_lock, release_lock, task
+from app.models import Booking, User, UserLog
+
+
+def backup_dir():
+    path = current_app.config['BACKUP_FOLDER']
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def backup_store():
+    return BackupStore(os.path.join(backup_dir(), 'store'), avg_pages=current_app.config['BACKUP_CHUNK_PAGES'])
+
+
+def database_path():
+    # Flask-SQLAlchemy resolves relative SQLite paths against the instance folder.
+    return db.engine.url.database
+
+
+def backup_online_options():
+    return {
+        'pages': current_app.config['BACKUP_PAGES_PER_STEP'],
+        'pause': current_app.config['BACKUP_STEP_PAUSE'],
+        'max_restarts': current_app.config['BACKUP_MAX_RESTARTS'],
+    }
+
+
+@contextmanager
+def database_snapshot():
+    """A consistent copy of the database in the backup folder, removed afterwards."""
+    source = database_path()
+    if not source:  # in-memory database
+        yield None
+        return
+    fd, path = tempfile.mkstemp(suffix='.db', dir=backup_dir())
+    os.close(fd)
+    try:
+        online_backup(source, path, **backup_online_options())
+        yield path
+    finally:
+        os.remove(path)
+
+
+def full_backup_files(snapshot_path=None):
+    """(archive name, path) pairs for a full backup of the application package."""
+    root = current_app.root_path
+    rules = ArchiveRules(
+        include=current_app.config['BACKUP_ARCHIVE_INCLUDE'],
+        exclude=DEFAULT_EXCLUDE + tuple(current_app.config['BACKUP_ARCHIVE_EXCLUDE']),
+        skip_paths=[backup_dir(), current_app.config.get('UPLOAD_FOLDER') or os.path.join(root, 'uploads')]
+    )
+    # Returned as an iterator that needs no app context: the archiver walks it on its own thread.
+    database = [(f'database/{os.path.basename(database_path())}', snapshot_path)] if snapshot_path else []
+    return chain(database, iter_files(root, rules))
+
+
+def stream_full_backup():
+    with database_snapshot() as snapshot_path:
+        yield from stream_archive(full_backup_files(snapshot_path),
+                                  workers=current_app.config['BACKUP_ARCHIVE_WORKERS'] or None)
+
+
+@task()
+def backup_database(job, backup_type='incremental'):
+    if backup_type == 'full':
+        job.progress(5, 'Copying database')
+        with database_snapshot() as snapshot_path:
+            total = sum(os.path.getsize(path) for _, path in full_backup_files(snapshot_path)) or 1
+            done = [0, 5]
+
+            def progress(name, size):
+                done[0] += size
+                percent = 5 + int(90 * done[0] / total)
+                if percent > done[1]:
+                    done[1] = percent
+                    job.progress(percent, f'Archived {name}')
+
+            filename = f"full_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.tar.gz"
+            size = write_archive(full_backup_files(snapshot_path), os.path.join(backup_dir(), filename),
+                                 workers=current_app.config['BACKUP_ARCHIVE_WORKERS'] or None, progress=progress)
+        current_app.logger.info(f"Full backup created: {filename} ({size} bytes)")
+        return {'filename': filename, 'size': size}
+
+    # No progress updates while copying: they write to the database being
+    # copied, and any such write makes SQLite restart the backup.
+    job.progress(10, 'Copying database')
+    entry = backup_store().snapshot(database_path(), backup_type, **backup_online_options())
+    current_app.logger.info(f"{backup_type.capitalize()} backup created: {entry['snapshot']} "
+                            f"({entry['new_bytes']} new bytes of {entry['size']} in {entry['duration']}s)")
+    return entry
+
+
+SWEPT_STATUSES = ('pending', 'approved')
+
+
+def sweep_booking_statuses(today=None, chunk_size=None):
+    """Mark bookings whose training date has passed as completed.
+
+    Runs as set-based UPDATEs of at most ``chunk_size`` rows (all at once
+    when it is 0), each committed on its own so no write lock is held for
+    long. The UPDATE bypasses the ORM, so the dashboard snapshot is
+    invalidated explicitly. Returns (rows updated, chunks).
+    """
+    today = today or date.today()
+    if chunk_size is None:
+        chunk_size = current_app.config['STATUS_SWEEP_CHUNK']
+    overdue = (Booking.status.in_(SWEPT_STATUSES), Booking.training_date < today)
+    updated = chunks = 0
+    while True:
+        if chunk_size:
+            batch = select(Booking.id).where(*overdue).limit(chunk_size).scalar_subquery()
+            statement = update(Booking).where(Booking.id.in_(batch))
+        else:
+            statement = update(Booking).where(*overdue)
+        count = db.session.execute(
+            statement.values(status='completed').execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        updated += count
+        chunks += 1
+        if not chunk_size or count < chunk_size:
+            break
+    if updated:
+        invalidate_snapshot()
+        invalidate_fragments('booking')
+    return updated, chunks
+
+
+@task(every='STATUS_SWEEP_INTERVAL')
+def update_booking_statuses(job):
+    owner = f'job:{job.id}'
+    if not acquire_lock('update_booking_statuses', owner, current_app.config['JOB_LOCK_TIMEOUT']):
+        current_app.logger.info("Booking status sweep already running, skipping")
+        return {'skipped': True}
+    try:
+        started = time.perf_counter()
+        updated, chunks = sweep_booking_statuses()
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    finally:
+        release_lock('update_booking_statuses', owner)
+
+    current_app.logger.info(f"metric=booking_status_sweep updated={updated} chunks={chunks} duration_ms={duration_ms}")
+    log_username = current_app.config.get('STATUS_SWEEP_LOG_USER')
+    if updated and log_username:
+        log_user = User.query.filter_by(username=log_username).first()
+        if log_user is not None:
+            db.session.add(UserLog(user_id=log_user.id, action='booking_status_sweep',
+                                   details=f'Marked {updated} overdue bookings as completed'))
+            db.session.commit()
+    return {'updated': updated, 'chunks': chunks, 'duration_ms': duration_ms}
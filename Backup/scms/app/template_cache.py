@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.conditional import request_versions
+from app.models import Booking, Certificate, Post, User
+
+
+class CountingBytecodeCache(FileSystemBytecodeCache):
+    """Compiled templates on disk, shared by every worker that points at the same directory.
+
+    Jinja checks the template source checksum on load, so an edited
+    template is recompiled and rewritten rather than served stale.
+    """
+
+    def __init__(self, directory=None):
+        super().__init__(directory)
+        self.hits = self.misses = 0
+
+    def load_bytecode(self, bucket):
+        super().load_bytecode(bucket)
+        if bucket.code is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+
+class FragmentCache:
+    """Rendered template fragments, kept per worker.
+
+    Entries are keyed on the fragment name and its ``vary`` value, hold
+    for ``ttl`` seconds and are dropped as soon as a commit in this worker
+    touches one of the tables the fragment ``depends`` on. As with the
+    dashboard snapshot, the TTL bounds how long writes made by other
+    workers go unseen, except on pages behind @conditional: there the
+    table versions the request already read are stored with the entry,
+    and a fragment from older versions is rendered again, so a page
+    tagged with new versions never carries a stale fragment.
+    """
+
+    def __init__(self, maxsize=512, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # Bumped by every invalidation, so a fragment rendered from data read
+        # before one is not stored after it.
+        self.generation = 0
+        self.invalidations = self.evictions = 0
+        self._fragments = {}
+
+    def _counters(self, name):
+        return self._fragments.setdefault(name, {'hits': 0, 'misses': 0, 'render_seconds': 0.0, 'saved_seconds': 0.0})
+
+    def fetch(self, name, ttl, depends, vary, render):
+        key = (name, tuple(vary) if isinstance(vary, list) else vary)
+        tables = frozenset([depends] if isinstance(depends, str) else depends or ())
+        versions = request_versions(tables) if tables else None
+        with self._lock:
+            entry = self._entries.get(key)
+            counters = self._counters(name)
+            if entry is not None and entry[1] > time.monotonic() and (versions is None or versions == entry[4]):
+                self._entries.move_to_end(key)
+                counters['hits'] += 1
+                counters['saved_seconds'] += entry[3]
+                return entry[0]
+            generation = self.generation
+        started = time.perf_counter()
+        html = render()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            counters['misses'] += 1
+            counters['render_seconds'] += elapsed
+            if generation == self.generation:
+                self._entries[key] = (html, time.monotonic() + (self.ttl if ttl is None else ttl), tables, elapsed, versions)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return html
+
+    def invalidate(self, tables=None):
+        """Drop the fragments depending on any of ``tables`` (every fragment if None)."""
+        with self._lock:
+            if tables is None:
+                self._entries.clear()
+            else:
+                tables = set(tables)
+                for key in [key for key, entry in self._entries.items() if entry[2] & tables]:
+                    del self._entries[key]
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            fragments = {}
+            for name, c in sorted(self._fragments.items()):
+                lookups = c['hits'] + c['misses']
+                fragments[name] = {
+                    'hits': c['hits'],
+                    'misses': c['misses'],
+                    'hit_rate': round(c['hits'] / lookups, 3) if lookups else None,
+                    'render_ms': round(c['render_seconds'] / c['misses'] * 1000, 3) if c['misses'] else None,
+                    'saved_ms': round(c['saved_seconds'] * 1000, 1),
+                }
+            hits = sum(c['hits'] for c in self._fragments.values())
+            lookups = hits + sum(c['misses'] for c in self._fragments.values())
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hit_rate': round(hits / lookups, 3) if lookups else None,
+                'saved_ms': round(sum(c['saved_seconds'] for c in self._fragments.values()) * 1000, 1),
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'fragments': fragments,
+            }
+
+
+class FragmentCacheExtension(Extension):
+    """``{% cache name[, ttl][, depends=tables][, vary=value] %}...{% endcache %}``.
+
+    ``depends`` is a table name or a list of them, ``vary`` anything
+    hashable the fragment's output differs by (the signed-in user's role,
+    say). Without a fragment cache configured the body just renders.
+    """
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        name = parser.parse_expression()
+        ttl = depends = vary = nodes.Const(None)
+        while parser.stream.skip_if('comma'):
+            if parser.stream.current.type == 'name' and parser.stream.look().type == 'assign':
+                keyword = next(parser.stream).value
+                next(parser.stream)
+                if keyword == 'depends':
+                    depends = parser.parse_expression()
+                elif keyword == 'vary':
+                    vary = parser.parse_expression()
+                else:
+                    parser.fail(f"Unknown cache option '{keyword}'", lineno)
+            else:
+                ttl = parser.parse_expression()
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [name, ttl, depends, vary]), [], [], body).set_lineno(lineno)
+
+    def _render(self, name, ttl, depends, vary, caller):
+        cache = current_app.extensions.get('fragment_cache') if has_app_context() else None
+        if cache is None:
+            return caller()
+        return Markup(cache.fetch(name, ttl, depends, vary, caller))
+
+
+def template_cache_stats():
+    cache = current_app.extensions.get('fragment_cache')
+    bytecode = current_app.jinja_env.bytecode_cache
+    return {
+        'fragments': cache.stats() if cache is not None else None,
+        'bytecode': {'directory': bytecode.directory, 'hits': bytecode.hits, 'misses': bytecode.misses}
+        if isinstance(bytecode, CountingBytecodeCache) else None,
+    }
+
+
+def invalidate_fragments(*tables):
+    # For writes that bypass the ORM unit of work (Core inserts, bulk updates).
+    cache = current_app.extensions.get('fragment_cache')
+    if cache is not None:
+        cache.invalidate(tables or None)
+
+
+def _record(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('fragment_changes', set()).add(mapper.local_table.name)
+
+
+def _after_commit(session):
+    tables = session.info.pop('fragment_changes', None)
+    if tables and has_app_context():
+        invalidate_fragments(*tables)
+
+
+def _after_rollback(session):
+    session.info.pop('fragment_changes', None)
+
+
+def init_app(app):
+    if app.config.get('JINJA_BYTECODE_CACHE', True):
+        app.jinja_env.bytecode_cache = CountingBytecodeCache(app.config.get('JINJA_BYTECODE_CACHE_DIR'))
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    if app.config.get('FRAGMENT_CACHE_SIZE', 512) > 0:
+        app.extensions['fragment_cache'] = FragmentCache(
+            maxsize=app.config.get('FRAGMENT_CACHE_SIZE', 512),
+            ttl=app.config.get('FRAGMENT_CACHE_TTL', 300),
+        )
+    if event.contains(Session, 'after_commit', _after_commit):
+        return
+    for model in (Booking, Certificate, Post, User):
+        for action in ('insert', 'update', 'delete'):
+            event.listen(model, f'after_{action}', _record)
+    event.listen(Session, 'after_commit', _after_commit)
+    event.listen(Session, 'after_rollback', _after_rollback)
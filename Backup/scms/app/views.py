@@ -3,6 +3,7 @@ from flask_login import login_required, current_user, logout_user, login_user
 from app.models import User, Booking, Post, Certificate
 from app.forms import LoginForm, PostForm, CreateUserForm, EditUserForm, BookingForm, BackupForm
 from app import db
+from app.backups import online_backup
 from urllib.parse import urlparse
 from sqlalchemy import func
 from datetime import datetime, timedelta, date
@@ -10,7 +11,6 @@ import os
 from werkzeug.utils import secure_filename
 from flask_wtf import FlaskForm
 from wtforms import SelectField, SubmitField
-import shutil
 from functools import wraps
 
 # Create a Blueprint
@@ -210,11 +210,11 @@ def manual_backup():
         try:
             if backup_type == 'full':
                 # Perform full backup
-                shutil.copy2('app.db', 'backup_full.db')
+                online_backup('app.db', 'backup_full.db')
                 flash('Full backup created successfully.', 'success')
             elif backup_type == 'incremental':
                 # Perform incremental backup (simplified example)
-                shutil.copy2('app.db', f'backup_incremental_{datetime.now().strftime("%Y%m%d%H%M%S")}.db')
+                online_backup('app.db', f'backup_incremental_{datetime.now().strftime("%Y%m%d%H%M%S")}.db')
                 flash('Incremental backup created successfully.', 'success')
             return redirect(url_for('main.index'))
         except Exception as e:
@@ -1,23 +1,15 @@
-import sqlite3
-import os
-import shutil
 import schedule
 import time
 from datetime import datetime
 
+from app.backup_store import BackupStore
+
 BACKUP_DIR = 'database_backups'
 
 def create_backup(database_path, backup_type):
-    if not os.path.exists(BACKUP_DIR):
-        os.makedirs(BACKUP_DIR)
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"{backup_type}_backup_{timestamp}.db"
-    backup_path = os.path.join(BACKUP_DIR, backup_filename)
-    
-    # Create a copy of the database
-    shutil.copy2(database_path, backup_path)
-    print(f"{backup_type.capitalize()} backup created: {backup_filename}")
+    entry = BackupStore(BACKUP_DIR).snapshot(database_path, backup_type)
+    print(f"{backup_type.capitalize()} backup created: {entry['snapshot']} "
+          f"({entry['new_bytes']} new bytes of {entry['size']} in {entry['duration']}s)")
 
 def weekly_backup(database_path):
     create_backup(database_path, 'weekly')
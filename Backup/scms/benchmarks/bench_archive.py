@@ -0,0 +1,80 @@
+"""Full-backup archive time and peak memory against shutil.make_archive.
+
+Usage: python benchmarks/bench_archive.py [--sizes 50,200] [--workers 1,4]
+
+Each size builds a throwaway tree of half text-like, half random files
+(plus one file as large as a fifth of the tree) and archives it with
+shutil.make_archive and with the streaming archiver at each worker count.
+Time is measured on its own; peak Python memory comes from a second run
+under tracemalloc.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.archive import ArchiveRules, iter_files, write_archive
+
+FILE_BYTES = 256 * 1024
+
+
+def build_tree(root, size_mb):
+    total = size_mb * 1024 * 1024
+    big = total // 5
+    with open(os.path.join(root, 'big.bin'), 'wb') as f:
+        for _ in range(big // FILE_BYTES):
+            f.write(os.urandom(FILE_BYTES))
+    words = b' '.join(b'booking%d' % i for i in range(40000))
+    for i in range((total - big) // FILE_BYTES):
+        directory = os.path.join(root, f'dir{i % 20}')
+        os.makedirs(directory, exist_ok=True)
+        data = words[:FILE_BYTES] if i % 2 else os.urandom(FILE_BYTES)
+        with open(os.path.join(directory, f'file{i}.dat'), 'wb') as f:
+            f.write(data)
+
+
+def make_archive(root, out):
+    shutil.make_archive(os.path.join(out, 'make_archive'), 'zip', root)
+
+
+def streaming(workers):
+    def run(root, out):
+        write_archive(iter_files(root, ArchiveRules()), os.path.join(out, f'stream_{workers}.tar.gz'), workers=workers)
+    return run
+
+
+def measure(run, root, out):
+    started = time.perf_counter()
+    run(root, out)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    run(root, out)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='50,200')
+    parser.add_argument('--workers', default=f'1,{os.cpu_count() or 1}')
+    args = parser.parse_args()
+
+    print(f"{'tree MiB':>8} {'method':>16} {'seconds':>8} {'peak MiB':>9}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as out:
+            build_tree(root, size)
+            methods = [('make_archive', make_archive)]
+            methods += [(f'stream x{w}', streaming(int(w))) for w in args.workers.split(',')]
+            for label, run in methods:
+                elapsed, peak = measure(run, root, out)
+                print(f"{size:>8} {label:>16} {elapsed:>8.2f} {peak / 1048576:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Backup duration and writer stall time while the database is being written.
+
+Usage: python benchmarks/bench_backup.py [--size-mb 200] [--write-interval 0.02]
+
+A writer thread commits one small row every --write-interval seconds while
+each backup method runs; the script reports how long the backup took, how
+often the online backup restarted, and the writer's commit latencies. Any
+commit that takes longer than usual is time the writer spent stalled behind
+the backup. Both rollback-journal and WAL databases are measured.
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.backups import online_backup, integrity_check
+
+ROW_BYTES = 1000
+
+
+def seed(path, size_mb, journal_mode):
+    connection = sqlite3.connect(path)
+    connection.execute(f'PRAGMA journal_mode={journal_mode}')
+    connection.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, body TEXT)')
+    rows = size_mb * 1024 * 1024 // ROW_BYTES
+    for offset in range(0, rows, 10000):
+        connection.executemany('INSERT INTO item (body) VALUES (?)',
+                               [('x' * ROW_BYTES,) for _ in range(min(10000, rows - offset))])
+    connection.commit()
+    connection.close()
+
+
+class Writer(threading.Thread):
+    def __init__(self, path, interval):
+        super().__init__(daemon=True)
+        self.path = path
+        self.interval = interval
+        self.latencies = []
+        self.errors = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        while not self.stopped.is_set():
+            started = time.perf_counter()
+            try:
+                connection.execute("INSERT INTO item (body) VALUES ('write')")
+                connection.commit()
+            except sqlite3.OperationalError:
+                connection.rollback()
+                self.errors += 1
+            self.latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(self.interval)
+        connection.close()
+
+
+def measure(path, target, method, interval):
+    writer = Writer(path, interval)
+    writer.start()
+    time.sleep(0.2)
+    started = time.perf_counter()
+    restarts = '-'
+    if method == 'copy2':
+        shutil.copy2(path, target)
+    elif method == 'online':
+        restarts = online_backup(path, target)['restarts']
+    else:
+        restarts = online_backup(path, target, pages=-1)['restarts']
+    duration = time.perf_counter() - started
+    time.sleep(0.2)
+    writer.stopped.set()
+    writer.join()
+    latencies = sorted(writer.latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+    return {
+        'duration': duration,
+        'restarts': restarts,
+        'integrity': integrity_check(target),
+        'writes': len(latencies),
+        'p50': statistics.median(latencies) if latencies else 0,
+        'p99': p99,
+        'max': latencies[-1] if latencies else 0,
+        'errors': writer.errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=200)
+    parser.add_argument('--write-interval', type=float, default=0.02)
+    args = parser.parse_args()
+
+    print(f"{'journal':>8} {'method':>12} {'backup s':>9} {'restarts':>8} {'integrity':>10} "
+          f"{'writes':>7} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>8} {'errors':>6}")
+    for journal_mode in ('delete', 'wal'):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            seed(path, args.size_mb, journal_mode)
+            for method in ('copy2', 'online', 'single-step'):
+                target = os.path.join(tmp, f'{method}.db')
+                r = measure(path, target, method, args.write_interval)
+                print(f"{journal_mode:>8} {method:>12} {r['duration']:>9.2f} {r['restarts']:>8} "
+                      f"{r['integrity'][:10]:>10} {r['writes']:>7} {r['p50']:>7.2f} {r['p99']:>7.2f} "
+                      f"{r['max']:>8.2f} {r['errors']:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Space and time of incremental snapshots in the deduplicated backup store.
+
+Usage: python benchmarks/bench_backup_store.py [--sizes 50,200] [--changes 10,100,1000]
+
+For each database size the script takes a base snapshot, then for each
+change count updates that many random rows and takes another snapshot. It
+reports what each snapshot added to the store next to the size of a plain
+copy, and how long a restore of the last snapshot takes.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.backup_store import BackupStore
+
+ROW_BYTES = 1000
+
+
+def seed(path, size_mb):
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=wal')
+    connection.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, body TEXT)')
+    rows = size_mb * 1024 * 1024 // ROW_BYTES
+    for offset in range(0, rows, 10000):
+        connection.executemany('INSERT INTO item (body) VALUES (?)',
+                               [(os.urandom(ROW_BYTES // 2).hex(),) for _ in range(min(10000, rows - offset))])
+    connection.commit()
+    connection.close()
+    return rows
+
+
+def change(path, rows, count):
+    connection = sqlite3.connect(path)
+    connection.executemany('UPDATE item SET body = ? WHERE id = ?',
+                           [(os.urandom(ROW_BYTES // 2).hex(), random.randint(1, rows)) for _ in range(count)])
+    connection.commit()
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='50,200')
+    parser.add_argument('--changes', default='10,100,1000')
+    args = parser.parse_args()
+
+    print(f"{'db MiB':>7} {'changed rows':>12} {'snapshot s':>10} {'new chunks':>10} {'new KiB':>10} "
+          f"{'copy KiB':>10} {'store MiB':>9}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            rows = seed(path, size)
+            store = BackupStore(os.path.join(tmp, 'store'))
+            for changes in [0] + [int(c) for c in args.changes.split(',')]:
+                if changes:
+                    change(path, rows, changes)
+                entry = store.snapshot(path, 'bench', pause=0)
+                print(f"{size:>7} {changes if changes else 'base':>12} {entry['duration']:>10.2f} "
+                      f"{entry['new_chunks']:>10} {entry['new_bytes'] / 1024:>10.0f} "
+                      f"{entry['size'] / 1024:>10.0f} {store.disk_usage() / 1048576:>9.1f}")
+            started = time.perf_counter()
+            store.restore(entry['snapshot'], os.path.join(tmp, 'restored.db'))
+            print(f"{size:>7} restore of last snapshot: {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Calendar payload size and server time as booking history grows.
+
+Usage: python benchmarks/bench_calendar.py [--sizes 1000,10000,100000]
+
+Bookings are spread over ten years of training dates. The script compares
+the old approach (every booking serialised into the page) with one month
+of the JSON feed, which should stay flat as the history grows.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from app import create_app, db
+from app.models import Booking, User
+
+REPEAT = 10
+
+
+def seed(size, user_id):
+    start = date(2016, 1, 1)
+    rows = [{
+        'user_id': user_id,
+        'client_name': f'Client {i}',
+        'email': f'client{i}@example.com',
+        'mobile_number': '12345678',
+        'training_date': start + timedelta(days=random.randrange(3650)),
+        'status': random.choice(['pending', 'approved', 'completed']),
+    } for i in range(size)]
+    for offset in range(0, size, 50000):
+        db.session.execute(Booking.__table__.insert(), rows[offset:offset + 50000])
+    db.session.commit()
+
+
+def embed_everything():
+    events = [{
+        'title': f"{b.client_name} - {b.status}",
+        'start': b.training_date.isoformat() if b.training_date else None,
+        'url': f'/edit_booking/{b.id}',
+        'color': '#28a745' if b.status == 'approved' else '#ffc107'
+    } for b in Booking.query.all()]
+    return json.dumps(events).encode()
+
+
+def timed(func):
+    samples, body = [], b''
+    for _ in range(REPEAT):
+        db.session.expire_all()
+        started = time.perf_counter()
+        body = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), len(body)
+
+
+def run(size):
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            WTF_CSRF_ENABLED = False
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            user = User(username='bench', email='bench@example.com')
+            user.set_password('bench')
+            db.session.add(user)
+            db.session.commit()
+            seed(size, user.id)
+
+            client = app.test_client()
+            client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+            client.post('/login', data={'username': 'bench', 'password': 'bench'})
+            feed = lambda: client.get('/booking_calendar/events?start=2020-03-01&end=2020-04-12').data
+
+            old = timed(embed_everything)
+            new = timed(feed)
+            db.session.remove()
+            db.engine.dispose()
+    return old, new
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    args = parser.parse_args()
+
+    print(f"{'bookings':>9} {'embed ms':>9} {'embed KiB':>10} {'feed ms':>8} {'feed KiB':>9}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        (old_ms, old_bytes), (new_ms, new_bytes) = run(size)
+        print(f"{size:>9} {old_ms:>9.1f} {old_bytes / 1024:>10.1f} {new_ms:>8.2f} {new_bytes / 1024:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
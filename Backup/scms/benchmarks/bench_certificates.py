@@ -0,0 +1,59 @@
+"""Per-certificate CPU time and allocations: full render vs. cached background.
+
+Usage: python benchmarks/bench_certificates.py [--count 50]
+
+"before" draws the whole page with reportlab for every certificate, as
+generate_certificate used to; "after" overlays the booking text on the
+cached static layer.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.certificates import _single_page, background_pdf, draw_background, draw_details, render_certificate
+
+IMAGE_DIR = os.path.join(os.path.dirname(__file__), '..', 'app', 'static', 'images')
+
+
+def full_page(client_name, training_date):
+    def draw(p):
+        draw_background(p, IMAGE_DIR)
+        draw_details(p, client_name, training_date)
+    return _single_page(draw)
+
+
+def cached(client_name, training_date):
+    return render_certificate(client_name, training_date, IMAGE_DIR).getvalue()
+
+
+def measure(render, count):
+    cpu_started = time.process_time()
+    for i in range(count):
+        render(f'Client {i}', '2024-10-01')
+    cpu_ms = (time.process_time() - cpu_started) * 1000 / count
+
+    tracemalloc.start()
+    render('Client', '2024-10-01')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_ms, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=50)
+    args = parser.parse_args()
+
+    background_pdf(IMAGE_DIR)  # the one-off build is not part of the steady state
+    print(f"{'path':>8} {'cpu ms/cert':>12} {'peak alloc KiB':>15}")
+    for name, render in (('before', full_page), ('after', cached)):
+        cpu_ms, peak = measure(render, args.count)
+        print(f'{name:>8} {cpu_ms:>12.2f} {peak / 1024:>15.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Bytes on the wire: dynamic pages with and without compression, and built static assets.
+
+Usage: python benchmarks/bench_compression.py [--scale 1k] [--requests 50]
+
+Seeds a database and fetches the main HTML and JSON pages plainly and
+with ``Accept-Encoding`` set to each coding this process can produce,
+reporting the body size and the median time per request, so the CPU the
+compression costs is visible next to the bytes it saves. Then builds the
+app's static files and compares their sizes as served under /static with
+the precompressed /assets copies; on a repeat visit an immutable asset
+is not requested at all.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from app import create_app, db
+from app.assets import SUFFIXES, build_assets
+from app.compression import encodings
+from app.models import User
+from app.seed import SCALES, SEED_PASSWORD, seed_database
+
+ADMIN = 'bench-admin'
+
+
+def pages():
+    month = date.today().replace(day=1)
+    return ['/', '/posts', '/statistics', '/booking_trends', '/bookings/view', '/view_bookings?per_page=200',
+            f'/booking_calendar/events?start={month}&end={month.replace(day=28)}']
+
+
+def fetch(client, path, encoding, requests):
+    headers = {'Accept-Encoding': encoding} if encoding else {}
+    times = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        body = response.get_data()
+        times.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, (path, response.status_code)
+    return len(body), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            ASSET_BUILD_FOLDER = os.path.join(tmp, 'assets')
+            WTF_CSRF_ENABLED = False
+            SQL_PROFILING = False
+            # Every request renders in full, as on a first visit.
+            CONDITIONAL_GET = False
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            seed_database(SCALES[args.scale])
+            admin = User(username=ADMIN, email=f'{ADMIN}@example.com', is_admin=True)
+            admin.set_password(SEED_PASSWORD)
+            db.session.add(admin)
+            db.session.commit()
+
+        client = app.test_client()
+        client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+        client.post('/login', data={'username': ADMIN, 'password': SEED_PASSWORD})
+        codings = [None] + list(encodings())
+        print(f"{'page':<32}" + ''.join(f" {coding or 'identity':>10} {'ms':>6}" for coding in codings))
+        totals = dict.fromkeys(codings, 0)
+        for path in pages():
+            row = f'{path[:32]:<32}'
+            for coding in codings:
+                size, elapsed = fetch(client, path, coding, args.requests)
+                totals[coding] += size
+                row += f' {size:>10} {elapsed:>6.2f}'
+            print(row)
+        print(f"{'total':<32}" + ''.join(f' {totals[coding]:>10} {"":>6}' for coding in codings))
+
+        manifest, written = build_assets(app.static_folder, BenchConfig.ASSET_BUILD_FOLDER)
+        print(f'\nBuilt {len(manifest)} assets ({written} bytes written)')
+        print(f"{'asset':<24} {'/static':>9}" + ''.join(f' {coding:>9}' for coding in encodings()))
+        for name, built in sorted(manifest.items()):
+            path = os.path.join(BenchConfig.ASSET_BUILD_FOLDER, built)
+            # Without a precompressed copy the asset is sent as it is.
+            sizes = [os.path.getsize(path + SUFFIXES[coding] if os.path.exists(path + SUFFIXES[coding]) else path)
+                     for coding in encodings()]
+            print(f'{name:<24} {os.path.getsize(path):>9}' + ''.join(f' {size:>9}' for size in sizes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Conditional GET: full responses against 304 revalidations, and what the version triggers cost writers.
+
+Usage: python benchmarks/bench_conditional.py [--scale 1k] [--requests 100] [--import-rows 20000]
+
+Seeds a database, then for each page behind @conditional times a plain
+GET against one carrying the ETag the page just returned, with the
+number of queries each sends. Then imports ``--import-rows`` bookings
+with the table_version triggers in place and again with them dropped, to
+show the write-side cost of keeping the watermark.
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import event
+
+from config import Config
+from app import create_app, db
+from app.attachments import attachment_store
+from app.booking_import import COLUMNS, import_bookings
+from app.conditional import version_ddl
+from app.models import Booking, Post, User
+from app.seed import SCALES, SEED_PASSWORD, seed_database
+
+ADMIN = 'bench-admin'
+
+
+def fixtures():
+    admin = User(username=ADMIN, email=f'{ADMIN}@example.com', is_admin=True)
+    admin.set_password(SEED_PASSWORD)
+    db.session.add(admin)
+    db.session.flush()
+    booking = Booking(user_id=admin.id, client_name='Bench Client', email='bench@example.com',
+                      mobile_number='07000000000', booking_date=date.today(), attachment_filename='brief.pdf')
+    booking.attachment_sha256, _ = attachment_store().save(io.BytesIO(b'%PDF-1.4 bench attachment\n' * 512))
+    post = Post.query.first()
+    db.session.add(booking)
+    db.session.commit()
+    month = date.today().replace(day=1)
+    return ['/posts', f'/post/{post.id}', '/statistics', '/booking_calendar',
+            f'/booking_calendar/events?start={month}&end={month.replace(day=28)}',
+            f'/bookings/attachments/{booking.attachment_sha256}/brief.pdf']
+
+
+def timed(client, path, headers, requests, queries):
+    times, counts = [], []
+    for _ in range(requests):
+        queries.clear()
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        response.get_data()
+        times.append((time.perf_counter() - started) * 1000)
+        counts.append(len(queries))
+    return response.status_code, statistics.median(times), max(counts)
+
+
+def import_rate(rows):
+    csv = ','.join(COLUMNS) + '\n' + ''.join(
+        f'Bench {i},bench{i}@example.com,07000000000,{date.today()},,pending,Bench Ltd,1 Bench Street\n'
+        for i in range(rows))
+    result = import_bookings(io.BytesIO(csv.encode()), 'bench.csv', User.query.first().id)
+    assert result.imported == rows, result.summary()
+    return result.rows_per_second
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--import-rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            UPLOAD_FOLDER = os.path.join(tmp, 'uploads')
+            WTF_CSRF_ENABLED = False
+            SQL_PROFILING = False
+
+        os.makedirs(BenchConfig.UPLOAD_FOLDER)
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            seed_database(SCALES[args.scale])
+            paths = fixtures()
+            engine = db.engine
+
+        queries = []
+        event.listen(engine, 'before_cursor_execute', lambda *a: queries.append(a[2]))
+        client = app.test_client()
+        client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+        client.post('/login', data={'username': ADMIN, 'password': SEED_PASSWORD})
+        print(f"{'page':<44} {'200 ms':>8} {'queries':>7} {'304 ms':>8} {'queries':>7}")
+        for path in paths:
+            etag = client.get(path).headers['ETag']
+            _, full, full_queries = timed(client, path, {}, args.requests, queries)
+            status, revalidated, revalidated_queries = timed(client, path, {'If-None-Match': etag}, args.requests, queries)
+            assert status == 304, (path, status)
+            print(f'{path[:44]:<44} {full:>8.2f} {full_queries:>7} {revalidated:>8.2f} {revalidated_queries:>7}')
+
+        with app.app_context():
+            with_triggers = import_rate(args.import_rows)
+            with db.engine.begin() as connection:
+                for statement in version_ddl('booking'):
+                    connection.exec_driver_sql(f"DROP TRIGGER {statement.split()[5]}")
+            without_triggers = import_rate(args.import_rows)
+        print(f'\nImporting {args.import_rows} bookings: {with_triggers:.0f} rows/s with the version trigger, '
+              f'{without_triggers:.0f} rows/s without')
+
+
+if __name__ == '__main__':
+    main()
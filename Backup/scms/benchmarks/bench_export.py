@@ -0,0 +1,112 @@
+"""Streaming exports: first-byte latency, throughput and memory against table size.
+
+Usage: python benchmarks/bench_export.py [--sizes 10000,100000,1000000]
+
+Each size fills a fresh SQLite file with that many bookings, then streams
+the bookings export as CSV and as XLSX, each in its own forked process so
+the peak RSS reported is that export's alone. The 'to_dict' row is the
+old way of getting the table out: every Booking loaded as an object and
+turned into a dict, as the raw bookings pages did.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from app import create_app, db
+from app.exports import stream_export
+from app.models import Booking, User
+
+
+def fill(count):
+    rng = random.Random(0)
+    today = date.today()
+    user = User(username='exporter', email='exporter@example.com')
+    db.session.add(user)
+    db.session.commit()
+    # Exports do not read the search index or the rollup, so skip their triggers.
+    with db.engine.begin() as connection:
+        for (name,) in list(connection.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'booking'")):
+            connection.exec_driver_sql(f'DROP TRIGGER {name}')
+    for start in range(0, count, 50000):
+        db.session.execute(Booking.__table__.insert(), [{
+            'user_id': user.id,
+            'client_name': f'Client {i}',
+            'email': f'client{i}@example.com',
+            'mobile_number': f'07{rng.randrange(10 ** 9):09d}',
+            'booking_date': today - timedelta(days=rng.randrange(3 * 365)),
+            'status': 'completed',
+            'organization_name': 'Northwind Logistics',
+            'address': f'{rng.randrange(1, 200)} High Street',
+            'reference_number': f'BENCH-{i}',
+        } for i in range(start, min(count, start + 50000))])
+        db.session.commit()
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(app, kind, results):
+    with app.app_context():
+        before = max_rss_mb()
+        started = time.perf_counter()
+        first = None
+        size = 0
+        if kind == 'to_dict':
+            size = len([booking.to_dict() for booking in Booking.query.all()])
+            first = time.perf_counter() - started
+        else:
+            for chunk in stream_export('bookings', kind):
+                if first is None:
+                    first = time.perf_counter() - started
+                size += len(chunk)
+        results.put((kind, first, time.perf_counter() - started, size, max_rss_mb() - before))
+
+
+def run(size):
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            SQL_PROFILING = False
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            fill(size)
+            db.session.remove()
+            db.engine.dispose()
+        rows = []
+        for kind in ('csv', 'xlsx', 'to_dict'):
+            results = multiprocessing.get_context('fork').Queue()
+            process = multiprocessing.get_context('fork').Process(target=measure, args=(app, kind, results))
+            process.start()
+            rows.append(results.get())
+            process.join()
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    args = parser.parse_args()
+
+    print(f"{'bookings':>9} {'export':>8} {'first byte ms':>14} {'total s':>8} {'rows/s':>8} {'MB out':>7} "
+          f"{'peak RSS +MB':>13}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        for kind, first, total, out, rss in run(size):
+            print(f"{size:>9} {kind:>8} {first * 1000:>14.1f} {total:>8.2f} {size / total:>8.0f} "
+                  f"{out / 1e6 if kind != 'to_dict' else 0:>7.1f} {rss:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Bulk booking import: rows per second for CSV and XLSX files.
+
+Usage: python benchmarks/bench_import.py [--rows 100000] [--batch-sizes 1000,5000,20000] [--orm-rows 5000]
+
+Writes a CSV and an XLSX file of ``--rows`` bookings (one row in fifty
+invalid), then imports each into a fresh SQLite file: once as a dry run
+(read and validate only) and once per batch size. For comparison, the
+first ``--orm-rows`` rows are also added one Booking object at a time
+with a commit each, the way the booking form creates them.
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import xlsxwriter
+
+from config import Config
+from app import create_app, db
+from app.booking_import import COLUMNS, import_bookings
+from app.models import Booking, User
+
+HEADER = ['client_name', 'email', 'mobile_number', 'booking_date', 'training_date', 'status', 'organization_name',
+          'address']
+
+
+def booking_rows(count):
+    rng = random.Random(0)
+    today = date.today()
+    for i in range(count):
+        booking_date = today - timedelta(days=rng.randrange(3 * 365))
+        yield [
+            f'Client {i}',
+            f'client{i}@example.com' if i % 50 else 'not-an-email',
+            f'07{rng.randrange(10 ** 9):09d}',
+            booking_date.isoformat(),
+            (booking_date + timedelta(days=30)).isoformat(),
+            rng.choice(['pending', 'approved', 'completed', 'cancelled']),
+            rng.choice(['Northwind Logistics', 'Harbour Health', '']),
+            f'{rng.randrange(1, 200)} High Street',
+        ]
+
+
+def write_csv(path, count):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(booking_rows(count))
+
+
+def write_xlsx(path, count):
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    sheet = workbook.add_worksheet()
+    sheet.write_row(0, 0, HEADER)
+    for r, row in enumerate(booking_rows(count), start=1):
+        sheet.write_row(r, 0, row)
+    workbook.close()
+
+
+def run_import(database, path, batch_size, dry_run=False):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database}'
+        SQL_PROFILING = False
+
+    if os.path.exists(database):
+        os.remove(database)
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        user = User(username='importer', email='importer@example.com')
+        db.session.add(user)
+        db.session.commit()
+        with open(path, 'rb') as f:
+            result = import_bookings(f, path, user.id, dry_run=dry_run, batch_size=batch_size)
+        db.session.remove()
+        db.engine.dispose()
+    return result
+
+
+def run_orm(database, count):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database}'
+        SQL_PROFILING = False
+
+    if os.path.exists(database):
+        os.remove(database)
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        user = User(username='importer', email='importer@example.com')
+        db.session.add(user)
+        db.session.commit()
+        started = time.perf_counter()
+        for row in booking_rows(count):
+            values = dict(zip(COLUMNS, row))
+            values['booking_date'] = date.fromisoformat(values['booking_date'])
+            values['training_date'] = date.fromisoformat(values['training_date'])
+            db.session.add(Booking(user_id=user.id, **values))
+            db.session.commit()
+        elapsed = time.perf_counter() - started
+        db.session.remove()
+        db.engine.dispose()
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-sizes', default='1000,5000,20000')
+    parser.add_argument('--orm-rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, 'bench.db')
+        files = {'csv': os.path.join(tmp, 'bookings.csv'), 'xlsx': os.path.join(tmp, 'bookings.xlsx')}
+        write_csv(files['csv'], args.rows)
+        write_xlsx(files['xlsx'], args.rows)
+
+        print(f"{'file':>5} {'MB':>6} {'batch':>8} {'imported':>9} {'rejected':>9} {'seconds':>8} {'rows/s':>9}")
+        for kind, path in files.items():
+            size = os.path.getsize(path) / 1e6
+            runs = [('dry run', None, True)] + [(int(b), int(b), False) for b in args.batch_sizes.split(',')]
+            for label, batch_size, dry_run in runs:
+                result = run_import(database, path, batch_size, dry_run)
+                print(f'{kind:>5} {size:>6.1f} {label:>8} {result.imported:>9} {result.failed:>9} '
+                      f'{result.elapsed:>8.2f} {result.rows_per_second:>9.0f}')
+        if args.orm_rows:
+            print(f'ORM, one commit per booking: {run_orm(database, args.orm_rows):.0f} rows/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""LDAP login latency: a fresh connection per login against the pooled, cached path.
+
+Usage: python benchmarks/bench_ldap_login.py [--users 200] [--logins 3] [--threads 8]
+                                             [--latency 0.002] [--connect-latency 0.01]
+
+A stub directory on localhost adds ``--latency`` to every response and
+``--connect-latency`` to every new connection (standing in for the network
+and the TLS handshake). ``--threads`` concurrent clients then log each of
+``--users`` staff in ``--logins`` times, as at a shift change. The fresh
+path does what a per-login LDAP3LoginManager bind does: connect, bind as
+the service account, find the user, bind as the user, read the groups.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import ldap3
+
+from config import Config
+from app.ldap_auth import LDAPDirectory
+from tests.ldap_stub import StubDirectory, StubLDAPServer
+
+BASE_DN = 'dc=example,dc=com'
+SERVICE_DN = f'cn=service,{BASE_DN}'
+
+
+def build_directory(users):
+    directory = StubDirectory({SERVICE_DN: {'cn': 'service', 'userPassword': 'secret'}})
+    members = []
+    for i in range(users):
+        dn = f'uid=user{i},ou=people,{BASE_DN}'
+        directory.add(dn, {'objectClass': 'person', 'uid': f'user{i}', 'mail': f'user{i}@example.com',
+                           'userPassword': f'pw{i}'})
+        members.append(dn)
+    directory.add(f'cn=staff,ou=groups,{BASE_DN}', {'objectClass': 'groupOfNames', 'cn': 'staff', 'member': members})
+    return directory
+
+
+def fresh_login(url, username, password):
+    server = ldap3.Server(url, get_info=ldap3.NONE)
+    conn = ldap3.Connection(server, SERVICE_DN, 'secret', auto_bind=True)
+    conn.search(f'ou=people,{BASE_DN}', f'(&(objectClass=person)(uid={username}))', attributes=['uid', 'mail'])
+    dn = conn.response[0]['dn']
+    ok = conn.rebind(dn, password)
+    conn.rebind(SERVICE_DN, 'secret')
+    conn.search(f'ou=groups,{BASE_DN}', f'(&(objectClass=groupOfNames)(member={dn}))', attributes=['cn'])
+    conn.unbind()
+    return ok
+
+
+def pooled(url, threads):
+    config = {key: getattr(Config, key) for key in dir(Config) if key.startswith('LDAP_')}
+    config.update(LDAP_HOST=url, LDAP_BASE_DN=BASE_DN, LDAP_USER_DN='ou=people', LDAP_GROUP_DN='ou=groups',
+                  LDAP_BIND_USER_DN=SERVICE_DN, LDAP_BIND_USER_PASSWORD='secret', LDAP_POOL_SIZE=threads)
+    directory = LDAPDirectory(config)
+    return lambda url, username, password: directory.authenticate(username, password) is not None
+
+
+def run(method, args):
+    with StubLDAPServer(build_directory(args.users), latency=args.latency,
+                        connect_latency=args.connect_latency) as server:
+        login = method(server.url, args.threads) if method is pooled else method
+        attempts = [(f'user{i}', f'pw{i}') for _ in range(args.logins) for i in range(args.users)]
+
+        def timed(credentials):
+            started = time.perf_counter()
+            assert login(server.url, *credentials)
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as executor:
+            latencies = sorted(executor.map(timed, attempts))
+        elapsed = time.perf_counter() - started
+        return elapsed, latencies, server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--logins', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.002)
+    parser.add_argument('--connect-latency', type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(f"{'method':>8} {'logins/s':>9} {'p50 ms':>7} {'p95 ms':>7} {'connections':>11} {'binds':>6} {'searches':>8}")
+    for label, method in (('fresh', fresh_login), ('pooled', pooled)):
+        elapsed, latencies, server = run(method, args)
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        print(f"{label:>8} {len(latencies) / elapsed:>9.0f} {p50:>7.1f} {p95:>7.1f} "
+              f"{server.connections:>11} {server.binds:>6} {server.searches:>8}")
+
+
+if __name__ == '__main__':
+    main()
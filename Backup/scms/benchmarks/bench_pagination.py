@@ -0,0 +1,94 @@
+"""Per-page latency of the keyset-paginated booking listing.
+
+Usage: python benchmarks/bench_pagination.py [--sizes 1000,10000,100000,500000]
+
+Each size gets a fresh SQLite file. The script times the first page, a page
+from the middle of the table and the last page; with seek pagination all
+three should stay flat as the table grows.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from app import create_app, db
+from app.models import Booking, User
+from app.pagination import paginate_bookings, encode_cursor
+
+PER_PAGE = 50
+REPEAT = 20
+
+
+def seed(size, user_id):
+    start = date(2020, 1, 1)
+    rows = [{
+        'user_id': user_id,
+        'client_name': f'Client {i}',
+        'email': f'client{i}@example.com',
+        'mobile_number': '12345678',
+        'booking_date': start + timedelta(days=random.randrange(2000)),
+        'status': 'pending',
+    } for i in range(size)]
+    for offset in range(0, size, 50000):
+        db.session.execute(Booking.__table__.insert(), rows[offset:offset + 50000])
+    db.session.commit()
+
+
+def cursor_at(position):
+    booking_date, booking_id = db.session.query(Booking.booking_date, Booking.id).order_by(
+        Booking.booking_date.desc(), Booking.id.desc()
+    ).offset(position).first()
+    return encode_cursor(booking_date, booking_id)
+
+
+def time_page(user_id, after):
+    samples = []
+    for _ in range(REPEAT):
+        db.session.expire_all()
+        started = time.perf_counter()
+        page = paginate_bookings(Booking.query.filter_by(user_id=user_id), PER_PAGE, after=after)
+        [booking.to_dict() for booking in page.items]
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run(size):
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            user = User(username='bench', email='bench@example.com')
+            db.session.add(user)
+            db.session.commit()
+            seed(size, user.id)
+            first = time_page(user.id, None)
+            middle = time_page(user.id, cursor_at(size // 2))
+            last = time_page(user.id, cursor_at(size - PER_PAGE - 1))
+            db.session.remove()
+            db.engine.dispose()
+    return first, middle, last
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000,500000')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'first ms':>10} {'middle ms':>10} {'last ms':>10}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        first, middle, last = run(size)
+        print(f"{size:>10} {first:>10.2f} {middle:>10.2f} {last:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Booking list pages: full ORM objects + to_dict() against projected read-model rows.
+
+Usage: python benchmarks/bench_read_models.py [--bookings 100000] [--sizes 50,200,5000] [--repeat 20]
+
+Seeds ``--bookings`` bookings for one user, then for each listing size
+times fetching the newest rows and preparing them for the template both
+ways: the old path (Booking objects, to_dict(), strftime per date) and
+read_models (LIST_COLUMNS rows, format_booking_rows). Reports the time
+per row and the peak memory allocated while building one listing.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from app import create_app, db
+from app.models import Booking, User
+from app.pagination import paginate_bookings
+from app.read_models import booking_rows, format_booking_rows
+
+
+def fill(count):
+    rng = random.Random(0)
+    today = date.today()
+    user = User(username='lister', email='lister@example.com')
+    db.session.add(user)
+    db.session.commit()
+    for start in range(0, count, 20000):
+        rows = []
+        for i in range(start, min(count, start + 20000)):
+            booking_date = today - timedelta(days=rng.randrange(3 * 365))
+            rows.append({'user_id': user.id, 'client_name': f'Client {i}', 'email': f'client{i}@example.com',
+                         'mobile_number': '07000000000', 'booking_date': booking_date,
+                         'training_date': booking_date + timedelta(days=30), 'status': 'completed',
+                         'organization_name': 'Northwind Logistics', 'address': '1 High Street',
+                         'reference_number': f'BENCH-{i}'})
+        db.session.execute(Booking.__table__.insert(), rows)
+        db.session.commit()
+    return user.id
+
+
+def orm_listing(user_id, size):
+    # What view_bookings did before read_models.
+    page = paginate_bookings(Booking.query.filter_by(user_id=user_id), size)
+    listing = []
+    for booking in page.items:
+        booking_dict = booking.to_dict()
+        for date_field in ['booking_date', 'training_date']:
+            date_value = booking_dict[date_field]
+            booking_dict[date_field] = date_value.strftime('%Y-%m-%d') if date_value else None
+        listing.append(booking_dict)
+    return listing
+
+
+def row_listing(user_id, size):
+    page = paginate_bookings(booking_rows(Booking.user_id == user_id), size)
+    return format_booking_rows(page.items)
+
+
+def per_row_us(function, user_id, size, repeat):
+    function(user_id, size)
+    db.session.remove()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function(user_id, size)
+        # A request ends with the session removed; keep the identity map from carrying over.
+        db.session.remove()
+    return (time.perf_counter() - started) / repeat / size * 1e6
+
+
+def peak_kb(function, user_id, size):
+    tracemalloc.start()
+    function(user_id, size)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    db.session.remove()
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bookings', type=int, default=100000)
+    parser.add_argument('--sizes', default='50,200,5000')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            SQL_PROFILING = False
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            user_id = fill(args.bookings)
+            print(f"{'rows':>6} {'orm us/row':>11} {'rows us/row':>12} {'orm peak KB':>12} {'rows peak KB':>13}")
+            for size in (int(s) for s in args.sizes.split(',')):
+                assert [b['id'] for b in orm_listing(user_id, size)] == [r.id for r in row_listing(user_id, size)]
+                db.session.remove()
+                print(f'{size:>6} {per_row_us(orm_listing, user_id, size, args.repeat):>11.2f} '
+                      f'{per_row_us(row_listing, user_id, size, args.repeat):>12.2f} '
+                      f'{peak_kb(orm_listing, user_id, size):>12.0f} {peak_kb(row_listing, user_id, size):>13.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Booking reference allocation: LIKE scan against the per-day sequence.
+
+Usage: python benchmarks/bench_reference_numbers.py [--existing 0,20000] [--processes 4] [--bookings 200]
+
+For each count of bookings already on file, a fresh SQLite database is
+seeded and ``--processes`` processes each create ``--bookings`` bookings
+for today, one commit per booking. The scan reads the highest number with
+a LIKE query and inserts the next one; the sequence lets the Booking
+default allocate. Collisions are inserts rejected by the unique index.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.exc import IntegrityError
+
+from config import Config
+from app import create_app, db
+from app.models import Booking, User, format_reference_number
+
+
+def like_scan_reference_number(day):
+    prefix = day.strftime('%Y%m%d')
+    last = Booking.query.filter(Booking.reference_number.like(f'{prefix}-%')) \
+        .order_by(Booking.reference_number.desc()).first()
+    return format_reference_number(day, int(last.reference_number.split('-')[1]) + 1 if last else 1)
+
+
+def make_app(database_uri):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+    return create_app(BenchConfig)
+
+
+def worker(database_uri, method, count, results):
+    app = make_app(database_uri)
+    collisions = 0
+    with app.app_context():
+        for i in range(count):
+            booking = Booking(user_id=1, client_name=f'Client {i}', email='c@example.com',
+                              mobile_number='1', booking_date=date.today())
+            if method == 'like scan':
+                booking.reference_number = like_scan_reference_number(date.today())
+            db.session.add(booking)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                collisions += 1
+    results.put(collisions)
+
+
+def seed(database_uri, existing):
+    app = make_app(database_uri)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username='bench', email='bench@example.com'))
+        db.session.commit()
+        # Spread the existing bookings over past days, as a live table would be.
+        rows = [{'user_id': 1, 'client_name': f'Old {i}', 'email': 'o@example.com', 'mobile_number': '1',
+                 'status': 'completed', 'booking_date': date.today() - timedelta(days=1 + i % 365)}
+                for i in range(existing)]
+        for offset in range(0, len(rows), 10000):
+            db.session.execute(Booking.__table__.insert(), rows[offset:offset + 10000])
+        db.session.commit()
+        db.engine.dispose()
+
+
+def run(existing, method, processes, bookings):
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(database_uri, existing)
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        workers = [context.Process(target=worker, args=(database_uri, method, bookings, results))
+                   for _ in range(processes)]
+        started = time.perf_counter()
+        for process in workers:
+            process.start()
+        collisions = sum(results.get() for _ in workers)
+        for process in workers:
+            process.join()
+        return time.perf_counter() - started, collisions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--existing', default='0,20000')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--bookings', type=int, default=200)
+    args = parser.parse_args()
+
+    attempts = args.processes * args.bookings
+    print(f"{'existing':>8} {'method':>10} {'seconds':>8} {'attempts':>8} {'collisions':>10}")
+    for existing in (int(e) for e in args.existing.split(',')):
+        for method in ('like scan', 'sequence'):
+            elapsed, collisions = run(existing, method, args.processes, args.bookings)
+            print(f"{existing:>8} {method:>10} {elapsed:>8.2f} {attempts:>8} {collisions:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+"""Latency and query counts for every route, checked against a stored baseline.
+
+Usage: python benchmarks/bench_routes.py [--scale 1k] [--database seeded.db] [--requests 30]
+                                         [--baseline PATH] [--update-baseline] [--tolerance 0.5]
+
+Seeds a fresh SQLite file at ``--scale`` (or copies ``--database``, made
+with ``flask seed``), signs in as an admin and drives each route of the
+main and bookings blueprints through the test client. For every route it
+prints p50/p95/p99 latency and the most queries one request sent.
+
+Against the baseline (benchmarks/baselines/routes-<scale>.json by default)
+a route regresses when it sends more queries, when its p50 grows by more
+than ``--tolerance`` (plus a millisecond of slack), or when it starts to
+fail. Any regression, and any route left out of ROUTES, exits with status
+1. ``--update-baseline`` writes the current numbers instead. Latencies
+are only comparable on one machine, so take the baseline where the check
+runs.
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import event
+
+from config import Config
+from app import create_app, db
+from app.attachments import attachment_store
+from app.jobs import enqueue
+from app.models import Booking, Post, User
+from app.seed import SCALES, SEED_PASSWORD, seed_database
+
+BLUEPRINTS = ('main', 'bookings')
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+ADMIN = 'bench-admin'
+SLACK_MS = 1.0
+
+
+class Route:
+    """One request to time.
+
+    ``path`` and the values of ``data`` are format strings over the
+    fixtures; a fixture that is a list gives each request its own item
+    (rows a request deletes, names it must not reuse). A ``data`` value
+    that is a (content, filename) pair is sent as a file upload. ``client`` is
+    'admin' (signed in once), 'anonymous' or 'fresh' (signed in anew,
+    untimed, before each request).
+    """
+
+    def __init__(self, endpoint, path, method='GET', data=None, status=200, client='admin', requests=None):
+        self.endpoint = endpoint
+        self.path = path
+        self.method = method
+        self.data = data
+        self.status = status
+        self.client = client
+        self.requests = requests
+
+    @property
+    def key(self):
+        return f'{self.method} {self.endpoint}'
+
+    def build(self, fixtures, i):
+        values = {name: value[i] if isinstance(value, list) else value for name, value in fixtures.items()}
+        data = {name: (io.BytesIO(value[0].format(**values).encode()), value[1]) if isinstance(value, tuple)
+                else value.format(**values) for name, value in self.data.items()} if self.data else None
+        return self.path.format(**values), data
+
+
+BOOKING_FORM = {'client_name': 'Bench Client {n}', 'email': 'bench{n}@example.com', 'mobile_number': '07000000000',
+                'booking_date': '{today}', 'training_date': '{next_month}', 'status': 'pending',
+                'organization_name': 'Bench Ltd', 'address': '1 Bench Street'}
+# 100 bookings per import request.
+IMPORT_CSV = 'client_name,email,mobile_number,booking_date,status\n' + ''.join(
+    f'Imported {{n}}-{i},import{i}@example.com,07000000000,{{today}},pending\n' for i in range(100))
+
+ROUTES = [
+    Route('main.index', '/'),
+    Route('main.view_bookings', '/view_bookings'),
+    Route('main.booking_calendar', '/booking_calendar'),
+    Route('main.booking_calendar_events', '/booking_calendar/events?start={month_start}&end={month_end}'),
+    Route('main.login', '/login', client='anonymous'),
+    Route('main.login', '/login', 'POST', {'username': ADMIN, 'password': SEED_PASSWORD}, 302, client='anonymous'),
+    Route('main.logout', '/logout', status=302, client='fresh'),
+    Route('main.create_user', '/create_user'),
+    Route('main.create_user', '/create_user', 'POST',
+          {'username': 'bench-user-{n}', 'email': 'bench-user-{n}@example.com', 'password': 'secret123',
+           'confirm_password': 'secret123'}, 302),
+    Route('main.view_users', '/view_users'),
+    Route('main.edit_user', '/edit_user/{user_id}'),
+    Route('main.edit_user', '/edit_user/{user_id}', 'POST',
+          {'username': '{username}', 'email': '{username}@example.com'}, 302),
+    Route('main.delete_user', '/delete_user/{doomed_user}', 'POST', status=302),
+    Route('main.statistics', '/statistics'),
+    Route('main.booking_trends', '/booking_trends'),
+    Route('main.manual_backup', '/manual_backup'),
+    Route('main.manual_backup', '/manual_backup', 'POST', {'backup_type': 'incremental'}, 302),
+    Route('main.download_backup', '/manual_backup/download', requests=3),
+    Route('main.backup_status', '/backup_status'),
+    Route('main.job_status', '/jobs/{job_id}'),
+    Route('main.identity_cache', '/identity_cache'),
+    Route('main.template_cache', '/template_cache'),
+    Route('main.sql_profile', '/sql_profile'),
+    Route('main.export', '/export/bookings', requests=5),
+    Route('main.create_booking', '/create_booking'),
+    Route('main.create_booking', '/create_booking', 'POST', BOOKING_FORM, 302),
+    Route('main.edit_booking', '/edit_booking/{booking_id}'),
+    Route('main.edit_booking', '/edit_booking/{booking_id}', 'POST', BOOKING_FORM, 302),
+    Route('main.view_posts', '/posts'),
+    Route('main.view_post', '/post/{post_id}'),
+    Route('main.edit_post', '/post/{post_id}/edit'),
+    Route('main.edit_post', '/post/{post_id}/edit', 'POST', {'title': 'Bench post', 'content': 'Edited {n}.'}, 302),
+    Route('main.create_post', '/create_post'),
+    Route('main.create_post', '/create_post', 'POST', {'title': 'Bench post {n}', 'content': 'Timed.'}, 302),
+    Route('main.uploaded_file', '/uploads/{upload_name}'),
+    Route('bookings.create_booking', '/bookings/create'),
+    Route('bookings.create_booking', '/bookings/create', 'POST', BOOKING_FORM, 302),
+    Route('bookings.edit_booking', '/bookings/edit/{booking_id}'),
+    Route('bookings.edit_booking', '/bookings/edit/{booking_id}', 'POST', BOOKING_FORM, 302),
+    Route('bookings.delete_booking', '/bookings/delete/{doomed_booking}', 'POST', status=302),
+    Route('bookings.view_bookings', '/bookings/view'),
+    Route('bookings.search_bookings', '/bookings/search?query=Patel'),
+    Route('bookings.generate_certificate', '/bookings/generate_certificate/{booking_id}', requests=5),
+    Route('bookings.bulk_certificates', '/bookings/bulk_certificates'),
+    Route('bookings.bulk_certificates', '/bookings/bulk_certificates', 'POST',
+          {'training_from': '{last_week}', 'training_to': '{last_week}', 'status': 'completed'}, requests=3),
+    Route('bookings.import_bookings', '/bookings/import'),
+    Route('bookings.import_bookings', '/bookings/import', 'POST', {'file': (IMPORT_CSV, 'bookings.csv')}),
+    Route('bookings.view_attachment', '/bookings/view_attachment/{booking_id}', status=302),
+    Route('bookings.attachment', '/bookings/attachments/{digest}/brief.pdf'),
+    Route('bookings.update_booking_statuses', '/bookings/update_booking_statuses', status=202),
+]
+
+
+def uncovered(app):
+    """Endpoints of the benchmarked blueprints that no Route drives."""
+    routed = {route.endpoint for route in ROUTES}
+    return sorted(rule.endpoint for rule in app.url_map.iter_rules()
+                  if rule.endpoint.split('.')[0] in BLUEPRINTS and rule.endpoint not in routed)
+
+
+def fixtures(app, requests):
+    """Rows the routes point at, added next to the seeded data."""
+    today = date.today()
+    count = requests + 1
+    with app.app_context():
+        admin = User(username=ADMIN, email=f'{ADMIN}@example.com', is_admin=True)
+        admin.set_password(SEED_PASSWORD)
+        db.session.add(admin)
+        db.session.flush()
+        booking = Booking(user_id=admin.id, client_name='Bench Client', email='bench@example.com',
+                          mobile_number='07000000000', booking_date=today, training_date=today + timedelta(days=30),
+                          status='approved', attachment_filename='brief.pdf')
+        booking.attachment_sha256, _ = attachment_store().save(io.BytesIO(b'%PDF-1.4 bench attachment\n' * 512))
+        doomed_bookings = [Booking(user_id=admin.id, client_name=f'Doomed {i}', email='doomed@example.com',
+                                   mobile_number='07000000000', booking_date=today) for i in range(count)]
+        doomed_users = [User(username=f'bench-doomed-{i}', email=f'bench-doomed-{i}@example.com') for i in range(count)]
+        seeded = User.query.filter(User.username.like('seed%')).order_by(User.id).first()
+        post = Post(title='Bench post', content='Timed.', author_id=admin.id)
+        db.session.add_all([booking, post] + doomed_bookings + doomed_users)
+        db.session.flush()
+        job = enqueue('update_booking_statuses', user_id=admin.id)
+        db.session.commit()
+        with open(os.path.join(app.config['UPLOAD_FOLDER'], 'legacy.pdf'), 'wb') as f:
+            f.write(b'%PDF-1.4 legacy upload\n' * 512)
+        return {
+            'n': [str(i) for i in range(count)],
+            'today': today.isoformat(),
+            'next_month': (today + timedelta(days=30)).isoformat(),
+            'last_week': (today - timedelta(days=7)).isoformat(),
+            'month_start': today.replace(day=1).isoformat(),
+            'month_end': (today.replace(day=1) + timedelta(days=42)).isoformat(),
+            'booking_id': booking.id,
+            'post_id': post.id,
+            'digest': booking.attachment_sha256,
+            'doomed_booking': [b.id for b in doomed_bookings],
+            'doomed_user': [u.id for u in doomed_users],
+            'user_id': seeded.id,
+            'username': seeded.username,
+            'job_id': job.id,
+            'upload_name': 'legacy.pdf',
+        }
+
+
+def client_for(app, kind):
+    client = app.test_client()
+    client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    if kind != 'anonymous':
+        client.post('/login', data={'username': ADMIN, 'password': SEED_PASSWORD})
+    return client
+
+
+def measure(app, route, values, requests, queries):
+    admin = client_for(app, 'admin') if route.client == 'admin' else None
+    latencies, counts, statuses = [], [], set()
+    # The first request warms caches and is not counted.
+    for i in range(requests + 1):
+        client = admin or client_for(app, route.client)
+        path, data = route.build(values, i)
+        queries.clear()
+        started = time.perf_counter()
+        response = client.open(path, method=route.method, data=data)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        response.close()
+        statuses.add(response.status_code)
+        if i:
+            latencies.append(elapsed * 1000)
+            counts.append(len(queries))
+    latencies.sort()
+    status = route.status if statuses == {route.status} else max(statuses - {route.status})
+    return {
+        'status': status,
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 3),
+        'p99_ms': round(latencies[max(0, int(len(latencies) * 0.99) - 1)], 3),
+        'queries': max(counts),
+    }
+
+
+def regressions(route, result, baseline, tolerance):
+    problems = []
+    if result['status'] != route.status and (baseline is None or baseline['status'] != result['status']):
+        problems.append(f"status {result['status']}, expected {route.status}")
+    if baseline is None or baseline['status'] != route.status:
+        # Nothing to compare with: new, or already failing when the baseline was taken.
+        return problems
+    if result['queries'] > baseline['queries']:
+        problems.append(f"queries {baseline['queries']} -> {result['queries']}")
+    if result['p50_ms'] > baseline['p50_ms'] * (1 + tolerance) + SLACK_MS:
+        problems.append(f"p50 {baseline['p50_ms']:.1f} -> {result['p50_ms']:.1f} ms")
+    return problems
+
+
+def run(args, database):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database}'
+        UPLOAD_FOLDER = os.path.join(os.path.dirname(database), 'uploads')
+        BACKUP_FOLDER = os.path.join(os.path.dirname(database), 'backups')
+        WTF_CSRF_ENABLED = False
+
+    os.makedirs(BenchConfig.UPLOAD_FOLDER, exist_ok=True)
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        if not args.database:
+            seed_database(SCALES[args.scale])
+        engine = db.engine
+    values = fixtures(app, args.requests)
+
+    queries = []
+    event.listen(engine, 'before_cursor_execute', lambda *a: queries.append(a[2]))
+    results = {}
+    for route in ROUTES:
+        results[route.key] = measure(app, route, values, min(route.requests or args.requests, args.requests), queries)
+    return app, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+    parser.add_argument('--database', help='Seeded SQLite file to copy instead of seeding one')
+    parser.add_argument('--requests', type=int, default=30)
+    parser.add_argument('--baseline')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed p50 growth, as a fraction')
+    args = parser.parse_args()
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f'routes-{args.scale}.json')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, 'bench.db')
+        if args.database:
+            shutil.copyfile(args.database, database)
+        app, results = run(args, database)
+
+    baseline = {}
+    if os.path.exists(baseline_path) and not args.update_baseline:
+        with open(baseline_path) as f:
+            baseline = json.load(f)['routes']
+
+    failures = 0
+    print(f"{'route':<40} {'status':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>7}  vs baseline")
+    for route in ROUTES:
+        result = results[route.key]
+        problems = regressions(route, result, baseline.get(route.key), args.tolerance)
+        failures += bool(problems)
+        if problems:
+            note = 'REGRESSION: ' + '; '.join(problems)
+        elif result['status'] != route.status:
+            note = f"known failure (expected {route.status})"
+        else:
+            note = 'new' if baseline and route.key not in baseline else ''
+        print(f"{route.key:<40} {result['status']:>6} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+              f"{result['p99_ms']:>8.1f} {result['queries']:>7}  {note}")
+
+    missing = uncovered(app)
+    for endpoint in missing:
+        print(f'NOT BENCHMARKED: {endpoint} has no entry in ROUTES')
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, 'w') as f:
+            json.dump({'scale': args.scale, 'requests': args.requests, 'routes': results}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'Baseline written to {baseline_path}')
+    if failures or missing:
+        print(f'{failures} route(s) regressed, {len(missing)} not benchmarked.')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Booking search latency: FTS5 trigram index vs. the old ILIKE scan.
+
+Usage: python benchmarks/bench_search.py [--size 1000000] [--legacy]
+
+Seeds a fresh SQLite file with synthetic bookings (the insert triggers fill
+booking_fts as rows go in) and reports median latency per query.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from app import create_app, db
+from app.models import Booking, User
+from app.search import _fallback_search, search_bookings
+
+FIRST_NAMES = ['Ahmed', 'Fatima', 'Ali', 'Mariam', 'Hassan', 'Noor', 'Yusuf', 'Layla', 'Omar', 'Sara']
+LAST_NAMES = ['Almanaei', 'Khalifa', 'Haddad', 'Saleh', 'Nasser', 'Mansour', 'Rashid', 'Farouk']
+ORGANIZATIONS = ['Gulf Air', 'Bapco', 'Alba', 'Batelco', 'NBB', 'Ministry of Health', 'Tamkeen']
+STATUSES = ['pending', 'approved', 'completed', 'cancelled']
+QUERIES = ['Mariam', 'khalifa', 'batelco', '3391', 'completed', 'zzzz-no-match']
+REPEAT = 10
+
+
+def seed(size, user_id):
+    rng = random.Random(1)
+    for offset in range(0, size, 50000):
+        rows = []
+        for i in range(offset, min(size, offset + 50000)):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            rows.append({
+                'user_id': user_id,
+                'client_name': f'{first} {last}',
+                'email': f'{first.lower()}.{last.lower()}{i}@example.com',
+                'mobile_number': f'3{rng.randrange(10 ** 7):07d}',
+                'organization_name': rng.choice(ORGANIZATIONS),
+                'status': rng.choice(STATUSES),
+            })
+        db.session.execute(Booking.__table__.insert(), rows)
+    db.session.commit()
+
+
+def median_ms(func, query):
+    samples = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        func(query, 50)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1000000)
+    parser.add_argument('--legacy', action='store_true', help='also time the old ILIKE query')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            user = User(username='bench', email='bench@example.com')
+            db.session.add(user)
+            db.session.commit()
+            started = time.perf_counter()
+            seed(args.size, user.id)
+            print(f'seeded {args.size} bookings in {time.perf_counter() - started:.1f}s')
+
+            header = f"{'query':>15} {'fts ms':>10}" + (f" {'ilike ms':>10}" if args.legacy else '')
+            print(header)
+            for query in QUERIES:
+                line = f'{query:>15} {median_ms(search_bookings, query):>10.2f}'
+                if args.legacy:
+                    line += f' {median_ms(_fallback_search, query):>10.2f}'
+                print(line)
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Per-request cost of SQL profiling.
+
+Usage: python benchmarks/bench_sql_profile.py [--requests 500] [--bookings 2000]
+
+Times the statistics page and the paginated booking list for a signed-in
+admin with SQL_PROFILING off and on, against one fresh SQLite file.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from app import create_app, db
+from app.models import Booking, User
+
+PATHS = ['/statistics', '/view_bookings?per_page=50']
+
+
+def seed(bookings):
+    user = User(username='bench', email='bench@example.com', is_admin=True)
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add_all(Booking(user_id=user.id, client_name=f'Client {i % 300}', email='c@example.com',
+                               mobile_number='1', booking_date=date.today() - timedelta(days=i % 400),
+                               status='pending') for i in range(bookings))
+    db.session.commit()
+
+
+def run(path, profiling, requests, bookings):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        WTF_CSRF_ENABLED = False
+        SQL_PROFILING = profiling
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        if not User.query.filter_by(username='bench').first():
+            seed(bookings)
+    client = app.test_client()
+    client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    client.post('/login', data={'username': 'bench', 'password': 'secret'})
+    results = {}
+    for page in PATHS:
+        client.get(page)
+        started = time.perf_counter()
+        for _ in range(requests):
+            client.get(page)
+        results[page] = (time.perf_counter() - started) / requests * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--bookings', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'page':<28} {'off us':>8} {'on us':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        off = run(path, False, args.requests, args.bookings)
+        on = run(path, True, args.requests, args.bookings)
+    for page in PATHS:
+        print(f"{page:<28} {off[page]:>8.0f} {on[page]:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""Statistics and trends page queries: counting booking against the daily rollup.
+
+Usage: python benchmarks/bench_statistics.py [--sizes 10000,100000,500000] [--repeat 20]
+
+Each size seeds that many bookings spread over three years and twenty
+users in a fresh SQLite file, then times the queries the statistics page
+used to run on booking against the rollup reads that replace them, plus
+the twelve-month trends data. The last column is the cost the triggers
+add to inserting 10000 more bookings.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import func
+
+from config import Config
+from app import create_app, db
+from app.models import Booking, User
+from app import stats
+
+STATUSES = ['pending', 'approved', 'completed', 'cancelled']
+
+
+def rows(count, user_ids, offset=0):
+    today = date.today()
+    return [{
+        'user_id': random.choice(user_ids),
+        'client_name': f'Client {random.randrange(2000)}',
+        'email': f'client{i}@example.com',
+        'mobile_number': '12345678',
+        'booking_date': today - timedelta(days=random.randrange(3 * 365)),
+        'status': random.choice(STATUSES),
+        'reference_number': f'BENCH-{i}',
+    } for i in range(offset, offset + count)]
+
+
+def insert(batch):
+    for start in range(0, len(batch), 50000):
+        db.session.execute(Booking.__table__.insert(), batch[start:start + 50000])
+    db.session.commit()
+
+
+def table_statistics():
+    # What statistics() ran before the rollup.
+    total = Booking.query.count()
+    monthly = Booking.query.filter(Booking.booking_date >= date.today().replace(day=1)).count()
+    completed = Booking.query.filter_by(status='completed').count()
+    since = date.today() - timedelta(days=30)
+    daily = db.session.query(Booking.booking_date, func.count(Booking.id)) \
+        .filter(Booking.booking_date >= since).group_by(Booking.booking_date).all()
+    statuses = db.session.query(Booking.status, func.count(Booking.id)).group_by(Booking.status).all()
+    clients = db.session.query(Booking.client_name, func.count(Booking.id)).group_by(Booking.client_name) \
+        .order_by(func.count(Booking.id).desc()).limit(5).all()
+    return total, monthly, completed, daily, statuses, clients
+
+
+def table_trends():
+    start = date.today().replace(day=1) - timedelta(days=335)
+    in_range = Booking.booking_date >= start
+    month = func.strftime('%Y-%m', Booking.booking_date)
+    weekday = func.strftime('%w', Booking.booking_date)
+    monthly = db.session.query(month, func.count(Booking.id)).filter(in_range).group_by(month).all()
+    weekdays = db.session.query(weekday, func.count(Booking.id)).filter(in_range).group_by(weekday).all()
+    statuses = db.session.query(Booking.status, func.count(Booking.id)).filter(in_range).group_by(Booking.status).all()
+    return monthly, weekdays, statuses
+
+
+def timed(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+        db.session.rollback()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def run(size, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            users = [User(username=f'user{i}', email=f'user{i}@example.com') for i in range(20)]
+            db.session.add_all(users)
+            db.session.commit()
+            user_ids = [u.id for u in users]
+            insert(rows(size, user_ids))
+
+            results = {
+                'table': timed(table_statistics, repeat),
+                'rollup': timed(stats.statistics_summary, repeat),
+                'table trends': timed(table_trends, repeat),
+                'rollup trends': timed(stats.booking_trends, repeat),
+            }
+
+            extra = rows(10000, user_ids, offset=size)
+            started = time.perf_counter()
+            insert(extra)
+            with_triggers = time.perf_counter() - started
+            with db.engine.begin() as connection:
+                for trigger in ('ai', 'ad', 'au'):
+                    connection.exec_driver_sql(f'DROP TRIGGER booking_daily_stats_{trigger}')
+            for row in extra:
+                row['reference_number'] += '-again'
+            started = time.perf_counter()
+            insert(extra)
+            results['insert overhead'] = (with_triggers - (time.perf_counter() - started)) * 1000
+            db.session.remove()
+            db.engine.dispose()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,500000')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'bookings':>9} {'table ms':>9} {'rollup ms':>10} {'table trends':>13} {'rollup trends':>14} "
+          f"{'insert +ms/10k':>15}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        r = run(size, args.repeat)
+        print(f"{size:>9} {r['table']:>9.1f} {r['rollup']:>10.1f} {r['table trends']:>13.1f} "
+              f"{r['rollup trends']:>14.1f} {r['insert overhead']:>15.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Booking status sweep: ORM object loop against chunked set-based UPDATEs.
+
+Usage: python benchmarks/bench_status_sweep.py [--sizes 10000,100000] [--chunk 5000]
+
+Each size seeds that many overdue pending/approved bookings (plus as many
+future ones) in a fresh SQLite file and times both sweeps on a copy.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from app import create_app, db
+from app.models import Booking, User
+from app.tasks import sweep_booking_statuses
+
+
+def seed(size, user_id):
+    today = date.today()
+    rows = [{
+        'user_id': user_id,
+        'client_name': f'Client {i}',
+        'email': f'client{i}@example.com',
+        'mobile_number': '12345678',
+        'training_date': today + timedelta(days=random.randrange(1, 365) * (-1 if i % 2 else 1)),
+        'status': random.choice(['pending', 'approved']),
+    } for i in range(size * 2)]
+    for offset in range(0, len(rows), 50000):
+        db.session.execute(Booking.__table__.insert(), rows[offset:offset + 50000])
+    db.session.commit()
+
+
+def orm_loop():
+    bookings = Booking.query.filter(
+        Booking.training_date < date.today(),
+        Booking.status.in_(['pending', 'approved'])
+    ).all()
+    for booking in bookings:
+        booking.status = 'completed'
+    db.session.commit()
+    return len(bookings)
+
+
+def run(size, chunk):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        seeded = os.path.join(tmp, 'seeded.db')
+
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{seeded}'
+            STATUS_SWEEP_CHUNK = chunk
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            user = User(username='bench', email='bench@example.com')
+            db.session.add(user)
+            db.session.commit()
+            seed(size, user.id)
+            db.session.remove()
+            db.engine.dispose()
+
+        for label, sweep in (('orm loop', orm_loop), ('set-based', lambda: sweep_booking_statuses()[0])):
+            path = os.path.join(tmp, f'{label}.db')
+            shutil.copy(seeded, path)
+
+            class RunConfig(BenchConfig):
+                SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+            app = create_app(RunConfig)
+            with app.app_context():
+                started = time.perf_counter()
+                updated = sweep()
+                results[label] = (updated, time.perf_counter() - started)
+                db.session.remove()
+                db.engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000')
+    parser.add_argument('--chunk', type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'overdue':>8} {'method':>10} {'updated':>8} {'seconds':>8}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        for label, (updated, seconds) in run(size, args.chunk).items():
+            print(f"{size:>8} {label:>10} {updated:>8} {seconds:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Template caches: worker start-up compile time and per-request render time.
+
+Usage: python benchmarks/bench_templates.py [--scale 1k] [--requests 200]
+
+First compiles every template the way a freshly forked worker does, with
+no bytecode cache, then against a cold and a warm shared bytecode
+directory. Then seeds a database and times pages that use {% cache %}
+fragments with the fragment cache off and on, and prints the fragment
+hit rates and the render time they saved.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from app import create_app, db
+from app.models import User
+from app.seed import SCALES, SEED_PASSWORD, seed_database
+
+PAGES = ['/statistics', '/bookings/view', '/view_bookings']
+
+
+def compile_all(config):
+    app = create_app(config)
+    names = app.jinja_env.list_templates(extensions=['html'])
+    started = time.perf_counter()
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names), (time.perf_counter() - started) * 1000
+
+
+def page_times(config, requests):
+    app = create_app(config)
+    client = app.test_client()
+    client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    client.post('/login', data={'username': 'bench-admin', 'password': SEED_PASSWORD})
+    results = {}
+    for path in PAGES:
+        client.get(path)
+        times = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.get(path)
+            times.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, (path, response.status_code)
+        results[path] = statistics.median(times)
+    with app.app_context():
+        stats = app.extensions['fragment_cache'].stats() if 'fragment_cache' in app.extensions else None
+    return results, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            WTF_CSRF_ENABLED = False
+            SQL_PROFILING = False
+            JINJA_BYTECODE_CACHE = False
+            FRAGMENT_CACHE_SIZE = 0
+
+        class BytecodeConfig(BenchConfig):
+            JINJA_BYTECODE_CACHE = True
+            JINJA_BYTECODE_CACHE_DIR = os.path.join(tmp, 'jinja')
+
+        class CachedConfig(BytecodeConfig):
+            FRAGMENT_CACHE_SIZE = 512
+
+        os.makedirs(BytecodeConfig.JINJA_BYTECODE_CACHE_DIR)
+        count, plain = compile_all(BenchConfig)
+        _, cold = compile_all(BytecodeConfig)
+        _, warm = compile_all(BytecodeConfig)
+        print(f'Compiling {count} templates in a new worker: {plain:.1f} ms without a bytecode cache, '
+              f'{cold:.1f} ms filling it, {warm:.1f} ms from it')
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            seed_database(SCALES[args.scale])
+            admin = User(username='bench-admin', email='bench-admin@example.com', is_admin=True)
+            admin.set_password(SEED_PASSWORD)
+            db.session.add(admin)
+            db.session.commit()
+
+        off, _ = page_times(BenchConfig, args.requests)
+        on, stats = page_times(CachedConfig, args.requests)
+        print(f"\n{'page':<16} {'off ms':>8} {'on ms':>8}")
+        for path in PAGES:
+            print(f'{path:<16} {off[path]:>8.2f} {on[path]:>8.2f}')
+        print(f"\n{'fragment':<26} {'hit rate':>9} {'render ms':>10} {'saved ms':>9}")
+        for name, fragment in stats['fragments'].items():
+            print(f"{name:<26} {fragment['hit_rate']:>9.3f} {fragment['render_ms']:>10.3f} {fragment['saved_ms']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Authenticated request cost with and without the identity cache.
+
+Usage: python benchmarks/bench_user_loader.py [--requests 2000]
+
+Logs in once against a fresh SQLite file and then times a run of requests
+to a small admin-only JSON view, counting the SELECTs on the user table.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import event
+
+from config import Config
+from app import create_app, db
+from app.models import User
+
+
+def run(path, cache_size, requests):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        WTF_CSRF_ENABLED = False
+        IDENTITY_CACHE_SIZE = cache_size
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        if not User.query.filter_by(username='bench').first():
+            user = User(username='bench', email='bench@example.com', is_admin=True)
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+        engine = db.engine
+
+    selects = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM user' in statement:
+            selects.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    client = app.test_client()
+    client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    client.post('/login', data={'username': 'bench', 'password': 'secret'})
+    selects.clear()
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get('/identity_cache')
+    elapsed = time.perf_counter() - started
+    return elapsed / requests * 1e6, len(selects)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'cache':>6} {'us/request':>10} {'user SELECTs':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        for label, size in (('off', 0), ('on', 1024)):
+            per_request, selects = run(path, size, args.requests)
+            print(f"{label:>6} {per_request:>10.0f} {selects:>12}")
+
+
+if __name__ == '__main__':
+    main()
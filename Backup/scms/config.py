@@ -7,14 +7,124 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY') or 'you-will-never-guess'
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL') or 'sqlite:///app.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # WAL lets online backups and readers run without blocking writers ('' leaves the file alone)
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'wal')
+
+    # Booking listings
+    BOOKINGS_PER_PAGE = int(os.getenv('BOOKINGS_PER_PAGE') or 50)
+    BOOKINGS_MAX_PER_PAGE = int(os.getenv('BOOKINGS_MAX_PER_PAGE') or 200)
+
+    SEARCH_RESULTS_LIMIT = int(os.getenv('SEARCH_RESULTS_LIMIT') or 50)
+    SEARCH_RANK_WINDOW = int(os.getenv('SEARCH_RANK_WINDOW') or 200)
+
+    # Bulk certificate generation; CERTIFICATE_WORKERS=0 uses every core
+    CERTIFICATE_ACHIEVEMENT = os.getenv('CERTIFICATE_ACHIEVEMENT') or 'Certificate of Completion'
+    CERTIFICATE_WORKERS = int(os.getenv('CERTIFICATE_WORKERS') or 0)
+
+    # Longest date range the booking calendar feed returns in one request (days)
+    CALENDAR_MAX_DAYS = int(os.getenv('CALENDAR_MAX_DAYS') or 400)
+
+    # Bulk booking import (`flask import-bookings` and /bookings/import): rows per INSERT and
+    # commit, and how many rejected rows are reported back with their errors
+    BOOKING_IMPORT_BATCH_SIZE = int(os.getenv('BOOKING_IMPORT_BATCH_SIZE') or 5000)
+    BOOKING_IMPORT_MAX_ERRORS = int(os.getenv('BOOKING_IMPORT_MAX_ERRORS') or 1000)
+
+    # Streaming exports (/export/<dataset> and `flask export`): rows fetched per round trip
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE') or 2000)
+
+    # Dashboard snapshot is fully recomputed at least this often (seconds)
+    DASHBOARD_SNAPSHOT_TTL = int(os.getenv('DASHBOARD_SNAPSHOT_TTL') or 300)
+
+    # Compiled templates are cached on disk for every worker (default: a per-user temp directory).
+    # Fragments inside {% cache %} tags are kept per worker: entries (0 = off) and default lifetime
+    # in seconds; commits drop the fragments that depend on the tables they touch.
+    JINJA_BYTECODE_CACHE = os.getenv('JINJA_BYTECODE_CACHE', '1').lower() in ('1', 'true', 'yes')
+    JINJA_BYTECODE_CACHE_DIR = os.getenv('JINJA_BYTECODE_CACHE_DIR')
+    FRAGMENT_CACHE_SIZE = int(os.getenv('FRAGMENT_CACHE_SIZE') or 512)
+    FRAGMENT_CACHE_TTL = int(os.getenv('FRAGMENT_CACHE_TTL') or 300)
+
+    # Read-only pages answer 304 Not Modified from per-table write counters; the build id in their
+    # ETags defaults to a hash of the app's code and templates (set it to the release to pin it)
+    CONDITIONAL_GET = os.getenv('CONDITIONAL_GET', '1').lower() in ('1', 'true', 'yes')
+    ETAG_BUILD_ID = os.getenv('ETAG_BUILD_ID')
+
+    # HTML/JSON/text responses at least this many bytes are gzip- (or Brotli-) compressed; the
+    # levels are kept low because they are paid per request
+    COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', '1').lower() in ('1', 'true', 'yes')
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE') or 500)
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL') or 6)
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY') or 4)
+    # `flask build-assets` writes fingerprinted, precompressed static files here (default: app/static_build)
+    ASSET_BUILD_FOLDER = os.getenv('ASSET_BUILD_FOLDER')
+
+    # Per-request SQL profiling: query count and DB time in a Server-Timing header (admins and
+    # debug mode only), per-endpoint totals on /sql_profile, and a warning when one SELECT runs
+    # this many times in a request. Off unless set, or when running under `flask --debug`.
+    SQL_PROFILING = os.getenv('SQL_PROFILING', os.getenv('FLASK_DEBUG', '0')).lower() in ('1', 'true', 'yes')
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD') or 10)
+
+    # Users cached by the login user loader: entries per worker (0 = off) and lifetime in seconds.
+    # IDENTITY_CACHE_SIGNAL names a file shared by the workers; its mtime is bumped whenever a
+    # user changes so the other workers drop their copies on their next request.
+    IDENTITY_CACHE_SIZE = int(os.getenv('IDENTITY_CACHE_SIZE') or 1024)
+    IDENTITY_CACHE_TTL = int(os.getenv('IDENTITY_CACHE_TTL') or 60)
+    IDENTITY_CACHE_SIGNAL = os.getenv('IDENTITY_CACHE_SIGNAL')
+
+    # Background jobs run by `flask worker`; delays are in seconds
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS') or 3)
+    JOB_RETRY_BACKOFF = int(os.getenv('JOB_RETRY_BACKOFF') or 30)
+    JOB_RETRY_MAX_DELAY = int(os.getenv('JOB_RETRY_MAX_DELAY') or 3600)
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL') or 2)
+    JOB_LOCK_TIMEOUT = int(os.getenv('JOB_LOCK_TIMEOUT') or 600)
+
+    # Booking status sweep: run interval in seconds (0 = only on request) and rows per UPDATE
+    # (0 = one UPDATE). Set STATUS_SWEEP_LOG_USER to a username to record each sweep in its log.
+    STATUS_SWEEP_INTERVAL = int(os.getenv('STATUS_SWEEP_INTERVAL') or 3600)
+    STATUS_SWEEP_CHUNK = int(os.getenv('STATUS_SWEEP_CHUNK') or 5000)
+    STATUS_SWEEP_LOG_USER = os.getenv('STATUS_SWEEP_LOG_USER')
+
+    # Booking attachments: uploads land in a content-addressed store (default UPLOAD_FOLDER/objects).
+    # Set ATTACHMENT_ACCEL_PREFIX to an nginx `internal` location aliased to that store to serve
+    # them with X-Accel-Redirect, or USE_X_SENDFILE=1 for an X-Sendfile front end.
+    UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+    ATTACHMENT_FOLDER = os.getenv('ATTACHMENT_FOLDER')
+    ATTACHMENT_ACCEL_PREFIX = os.getenv('ATTACHMENT_ACCEL_PREFIX')
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+
+    # Database backups; pages are copied in steps with a pause in between
+    BACKUP_FOLDER = os.getenv('BACKUP_FOLDER') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backups')
+    BACKUP_PAGES_PER_STEP = int(os.getenv('BACKUP_PAGES_PER_STEP') or 256)
+    BACKUP_STEP_PAUSE = float(os.getenv('BACKUP_STEP_PAUSE') or 0.01)
+    BACKUP_MAX_RESTARTS = int(os.getenv('BACKUP_MAX_RESTARTS') or 3)
+    # Average chunk size of the deduplicated backup store, in database pages
+    BACKUP_CHUNK_PAGES = int(os.getenv('BACKUP_CHUNK_PAGES') or 16)
+    # Full backup archives: comma-separated glob patterns, and compression threads (0 = all cores)
+    BACKUP_ARCHIVE_INCLUDE = [p for p in (os.getenv('BACKUP_ARCHIVE_INCLUDE') or '').split(',') if p]
+    BACKUP_ARCHIVE_EXCLUDE = [p for p in (os.getenv('BACKUP_ARCHIVE_EXCLUDE') or '').split(',') if p]
+    BACKUP_ARCHIVE_WORKERS = int(os.getenv('BACKUP_ARCHIVE_WORKERS') or 0)
     
     # LDAP Configuration
+    # With LDAP_ENABLED, staff without a local password sign in against the directory;
+    # LDAP_ADMIN_GROUP names the group (cn) whose members are admins here.
+    LDAP_ENABLED = os.getenv('LDAP_ENABLED', '').lower() in ('1', 'true', 'yes')
     LDAP_HOST = os.getenv('LDAP_HOST') or 'default-ldap-host'
     LDAP_BASE_DN = os.getenv('LDAP_BASE_DN') or 'default-base-dn'
     LDAP_USER_DN = os.getenv('LDAP_USER_DN') or 'default-user-dn'
     LDAP_GROUP_DN = os.getenv('LDAP_GROUP_DN') or 'default-group-dn'
     LDAP_BIND_USER_DN = os.getenv('LDAP_BIND_USER_DN') or 'default-bind-user-dn'
     LDAP_BIND_USER_PASSWORD = os.getenv('LDAP_BIND_USER_PASSWORD') or 'default-bind-user-password'
+    LDAP_USER_LOGIN_ATTR = os.getenv('LDAP_USER_LOGIN_ATTR') or 'uid'
+    LDAP_USER_OBJECT_FILTER = os.getenv('LDAP_USER_OBJECT_FILTER') or '(objectClass=person)'
+    LDAP_GROUP_OBJECT_FILTER = os.getenv('LDAP_GROUP_OBJECT_FILTER') or '(objectClass=groupOfNames)'
+    LDAP_GROUP_MEMBERS_ATTR = os.getenv('LDAP_GROUP_MEMBERS_ATTR') or 'member'
+    LDAP_ADMIN_GROUP = os.getenv('LDAP_ADMIN_GROUP')
+    # Connections per pool and per worker, seconds to wait for a free one, seconds idle before a
+    # connection is health-checked, seconds user entries and groups are cached, network timeout
+    LDAP_POOL_SIZE = int(os.getenv('LDAP_POOL_SIZE') or 10)
+    LDAP_POOL_TIMEOUT = float(os.getenv('LDAP_POOL_TIMEOUT') or 5)
+    LDAP_HEALTH_CHECK_INTERVAL = int(os.getenv('LDAP_HEALTH_CHECK_INTERVAL') or 30)
+    LDAP_CACHE_TTL = int(os.getenv('LDAP_CACHE_TTL') or 300)
+    LDAP_TIMEOUT = int(os.getenv('LDAP_TIMEOUT') or 5)
 
 class ProductionConfig(Config):
     DEBUG = False
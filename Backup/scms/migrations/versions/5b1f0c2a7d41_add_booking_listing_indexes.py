@@ -0,0 +1,28 @@
+"""add booking listing indexes
+
+Revision ID: 5b1f0c2a7d41
+Revises: d86dfb468d52
+Create Date: 2026-10-17 09:12:44.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b1f0c2a7d41'
+down_revision = 'd86dfb468d52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_booking_date', ['booking_date'], unique=False)
+        batch_op.create_index('ix_booking_user_id_booking_date', ['user_id', 'booking_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_user_id_booking_date')
+        batch_op.drop_index('ix_booking_booking_date')
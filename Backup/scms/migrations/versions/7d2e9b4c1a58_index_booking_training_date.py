@@ -0,0 +1,26 @@
+"""index booking training_date for the calendar feed
+
+Revision ID: 7d2e9b4c1a58
+Revises: 3f9a1c7d5e20
+Create Date: 2026-10-17 16:02:51.774120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2e9b4c1a58'
+down_revision = '3f9a1c7d5e20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.create_index('ix_booking_training_date', ['training_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_training_date')
@@ -0,0 +1,94 @@
+"""convert booking dates to DATE
+
+Revision ID: 8c3e6a9f2b17
+Revises: 5b1f0c2a7d41
+Create Date: 2026-10-17 11:40:02.517390
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c3e6a9f2b17'
+down_revision = '5b1f0c2a7d41'
+branch_labels = None
+depends_on = None
+
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%d/%m/%Y')
+
+booking = sa.table(
+    'booking',
+    sa.column('id', sa.Integer),
+    sa.column('booking_date', sa.String),
+    sa.column('training_date', sa.String),
+)
+
+
+def _normalise(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _backfill():
+    # The String(10) columns hold whatever the old code wrote. Rewrite every
+    # value as ISO 8601 so SQLAlchemy's DATE type can read it back; anything
+    # unparseable becomes NULL rather than failing on every later read.
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(booking.c.id, booking.c.booking_date, booking.c.training_date)).fetchall()
+    updates = []
+    for row in rows:
+        booking_date = _normalise(row.booking_date)
+        training_date = _normalise(row.training_date)
+        if (booking_date, training_date) != (row.booking_date, row.training_date):
+            updates.append({'row_id': row.id, 'new_booking_date': booking_date, 'new_training_date': training_date})
+    if updates:
+        bind.execute(
+            booking.update().where(booking.c.id == sa.bindparam('row_id')).values(
+                booking_date=sa.bindparam('new_booking_date'),
+                training_date=sa.bindparam('new_training_date'),
+            ),
+            updates,
+        )
+
+
+def upgrade():
+    _backfill()
+    # A SQLite batch copy would CAST the text through NUMERIC affinity and
+    # turn '2024-09-01' into 2024. DATE is stored as ISO text there anyway, so
+    # reflect the columns as DATE and let the rows copy over verbatim.
+    reflect_args = [sa.Column('booking_date', sa.Date()), sa.Column('training_date', sa.Date())]
+    with op.batch_alter_table('booking', schema=None, reflect_args=reflect_args) as batch_op:
+        batch_op.alter_column('booking_date',
+               existing_type=sa.String(length=10),
+               type_=sa.Date(),
+               existing_nullable=True,
+               postgresql_using='booking_date::date')
+        batch_op.alter_column('training_date',
+               existing_type=sa.String(length=10),
+               type_=sa.Date(),
+               existing_nullable=True,
+               postgresql_using='training_date::date')
+        batch_op.create_index('ix_booking_status_training_date', ['status', 'training_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('booking', schema=None) as batch_op:
+        batch_op.drop_index('ix_booking_status_training_date')
+        batch_op.alter_column('training_date',
+               existing_type=sa.Date(),
+               type_=sa.String(length=10),
+               existing_nullable=True)
+        batch_op.alter_column('booking_date',
+               existing_type=sa.Date(),
+               type_=sa.String(length=10),
+               existing_nullable=True)
@@ -0,0 +1,50 @@
+"""add per-day booking reference sequence
+
+Revision ID: 9a4f6d2c8b31
+Revises: e1b7c3f8a902
+Create Date: 2026-10-17 18:02:51.730164
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4f6d2c8b31'
+down_revision = 'e1b7c3f8a902'
+branch_labels = None
+depends_on = None
+
+booking = sa.table('booking', sa.column('reference_number', sa.String))
+
+
+def _seed(reference_sequence):
+    # Start each day's counter after the highest number already issued so
+    # new bookings never collide with ones numbered by the old LIKE scan.
+    last_values = {}
+    for (reference_number,) in op.get_bind().execute(sa.select(booking.c.reference_number)):
+        day, _, sequence = (reference_number or '').partition('-')
+        try:
+            day = datetime.strptime(day, '%Y%m%d').date()
+            sequence = int(sequence)
+        except ValueError:
+            continue
+        last_values[day] = max(last_values.get(day, 0), sequence)
+    if last_values:
+        op.bulk_insert(reference_sequence, [{'day': day, 'last_value': value}
+                                            for day, value in sorted(last_values.items())])
+
+
+def upgrade():
+    reference_sequence = op.create_table('reference_sequence',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('last_value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    _seed(reference_sequence)
+
+
+def downgrade():
+    op.drop_table('reference_sequence')
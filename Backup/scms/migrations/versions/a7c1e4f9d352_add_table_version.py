@@ -0,0 +1,46 @@
+"""add table_version write counters
+
+Revision ID: a7c1e4f9d352
+Revises: f3c8a5e2d619
+Create Date: 2026-10-17 09:12:48.215367
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c1e4f9d352'
+down_revision = 'f3c8a5e2d619'
+branch_labels = None
+depends_on = None
+
+TABLES = ('booking', 'certificate', 'post', 'user')
+ACTIONS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def _bump(table):
+    return (f"INSERT INTO table_version(table_name, version, changed_at) VALUES ('{table}', 1, CURRENT_TIMESTAMP) "
+            f"ON CONFLICT(table_name) DO UPDATE SET version = version + 1, changed_at = excluded.changed_at; ")
+
+
+def upgrade():
+    op.create_table('table_version',
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    if op.get_bind().dialect.name == 'sqlite':
+        for table in TABLES:
+            for action in ACTIONS:
+                op.execute(f'CREATE TRIGGER {table}_version_a{action[0].lower()} AFTER {action} ON "{table}" '
+                           f'BEGIN {_bump(table)}END')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for table in TABLES:
+            for action in ACTIONS:
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_version_a{action[0].lower()}')
+    op.drop_table('table_version')
@@ -0,0 +1,27 @@
+"""add content hash of booking attachments
+
+Revision ID: b6e2d9f4a173
+Revises: 9a4f6d2c8b31
+Create Date: 2026-10-17 18:40:12.118503
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e2d9f4a173'
+down_revision = '9a4f6d2c8b31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A plain ADD COLUMN: a batch copy of booking would drop the search triggers.
+    op.add_column('booking', sa.Column('attachment_sha256', sa.String(length=64), nullable=True))
+    op.create_index('ix_booking_attachment_sha256', 'booking', ['attachment_sha256'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_booking_attachment_sha256', table_name='booking')
+    op.drop_column('booking', 'attachment_sha256')
@@ -0,0 +1,57 @@
+"""index booking reference numbers for search
+
+Revision ID: b8d3f6a2c914
+Revises: a7c1e4f9d352
+Create Date: 2026-10-17 11:40:02.518733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d3f6a2c914'
+down_revision = 'a7c1e4f9d352'
+branch_labels = None
+depends_on = None
+
+OLD_COLUMNS = 'client_name, email, mobile_number, organization_name, status'
+NEW_COLUMNS = 'reference_number, ' + OLD_COLUMNS
+
+
+def _values(row, columns):
+    return ', '.join(f'{row}.{column.strip()}' for column in columns.split(','))
+
+
+def _drop():
+    op.execute('DROP TRIGGER IF EXISTS booking_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS booking_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS booking_fts_ai')
+    op.execute('DROP TABLE IF EXISTS booking_fts')
+
+
+def _create(columns):
+    new_values, old_values = _values('new', columns), _values('old', columns)
+    op.execute(f"CREATE VIRTUAL TABLE booking_fts USING fts5({columns}, content='booking', content_rowid='id', tokenize='trigram')")
+    op.execute(f"CREATE TRIGGER booking_fts_ai AFTER INSERT ON booking BEGIN "
+               f"INSERT INTO booking_fts(rowid, {columns}) VALUES (new.id, {new_values}); END")
+    op.execute(f"CREATE TRIGGER booking_fts_ad AFTER DELETE ON booking BEGIN "
+               f"INSERT INTO booking_fts(booking_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END")
+    op.execute(f"CREATE TRIGGER booking_fts_au AFTER UPDATE OF {columns} ON booking BEGIN "
+               f"INSERT INTO booking_fts(booking_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+               f"INSERT INTO booking_fts(rowid, {columns}) VALUES (new.id, {new_values}); END")
+    op.execute("INSERT INTO booking_fts(booking_fts) VALUES ('rebuild')")
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _drop()
+    _create(NEW_COLUMNS)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _drop()
+    _create(OLD_COLUMNS)
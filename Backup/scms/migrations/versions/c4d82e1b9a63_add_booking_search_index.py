@@ -0,0 +1,43 @@
+"""add booking full-text search index
+
+Revision ID: c4d82e1b9a63
+Revises: 8c3e6a9f2b17
+Create Date: 2026-10-17 13:05:27.904113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d82e1b9a63'
+down_revision = '8c3e6a9f2b17'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'client_name, email, mobile_number, organization_name, status'
+NEW_VALUES = 'new.client_name, new.email, new.mobile_number, new.organization_name, new.status'
+OLD_VALUES = 'old.client_name, old.email, old.mobile_number, old.organization_name, old.status'
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(f"CREATE VIRTUAL TABLE booking_fts USING fts5({COLUMNS}, content='booking', content_rowid='id', tokenize='trigram')")
+    op.execute(f"CREATE TRIGGER booking_fts_ai AFTER INSERT ON booking BEGIN "
+               f"INSERT INTO booking_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES}); END")
+    op.execute(f"CREATE TRIGGER booking_fts_ad AFTER DELETE ON booking BEGIN "
+               f"INSERT INTO booking_fts(booking_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES}); END")
+    op.execute(f"CREATE TRIGGER booking_fts_au AFTER UPDATE OF {COLUMNS} ON booking BEGIN "
+               f"INSERT INTO booking_fts(booking_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES}); "
+               f"INSERT INTO booking_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES}); END")
+    op.execute("INSERT INTO booking_fts(booking_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute('DROP TRIGGER IF EXISTS booking_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS booking_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS booking_fts_ai')
+    op.execute('DROP TABLE IF EXISTS booking_fts')
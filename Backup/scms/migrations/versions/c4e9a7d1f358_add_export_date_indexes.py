@@ -0,0 +1,31 @@
+"""add certificate date and user log timestamp indexes
+
+Revision ID: c4e9a7d1f358
+Revises: b8d3f6a2c914
+Create Date: 2026-10-17 15:41:09.527316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e9a7d1f358'
+down_revision = 'b8d3f6a2c914'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Date-filtered exports read these in index order instead of sorting the table first.
+    with op.batch_alter_table('certificate', schema=None) as batch_op:
+        batch_op.create_index('ix_certificate_date', ['date'], unique=False)
+    with op.batch_alter_table('user_log', schema=None) as batch_op:
+        batch_op.create_index('ix_user_log_timestamp', ['timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user_log', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_log_timestamp')
+    with op.batch_alter_table('certificate', schema=None) as batch_op:
+        batch_op.drop_index('ix_certificate_date')
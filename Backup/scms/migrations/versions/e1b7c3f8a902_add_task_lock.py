@@ -0,0 +1,29 @@
+"""add task lock table
+
+Revision ID: e1b7c3f8a902
+Revises: 7d2e9b4c1a58
+Create Date: 2026-10-17 17:11:38.402917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1b7c3f8a902'
+down_revision = '7d2e9b4c1a58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('task_lock',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('owner', sa.String(length=100), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('task_lock')
@@ -0,0 +1,60 @@
+"""add booking_daily_stats rollup
+
+Revision ID: f3c8a5e2d619
+Revises: b6e2d9f4a173
+Create Date: 2026-10-17 19:24:37.402815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8a5e2d619'
+down_revision = 'b6e2d9f4a173'
+branch_labels = None
+depends_on = None
+
+
+def _match(row):
+    return f"day IS {row}.booking_date AND status = {row}.status AND user_id = {row}.user_id"
+
+
+def _count(row):
+    return (f"UPDATE booking_daily_stats SET bookings = bookings + 1 WHERE {_match(row)}; "
+            f"INSERT INTO booking_daily_stats(day, status, user_id, bookings) "
+            f"SELECT {row}.booking_date, {row}.status, {row}.user_id, 1 "
+            f"WHERE NOT EXISTS (SELECT 1 FROM booking_daily_stats WHERE {_match(row)}); ")
+
+
+def _uncount(row):
+    return (f"UPDATE booking_daily_stats SET bookings = bookings - 1 WHERE {_match(row)}; "
+            f"DELETE FROM booking_daily_stats WHERE {_match(row)} AND bookings <= 0; ")
+
+
+def upgrade():
+    op.create_table('booking_daily_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('bookings', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'status', 'user_id', name='uq_booking_daily_stats_day_status_user')
+    )
+    op.execute('INSERT INTO booking_daily_stats(day, status, user_id, bookings) '
+               'SELECT booking_date, status, user_id, count(*) FROM booking GROUP BY booking_date, status, user_id')
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(f"CREATE TRIGGER booking_daily_stats_ai AFTER INSERT ON booking BEGIN {_count('new')}END")
+        op.execute(f"CREATE TRIGGER booking_daily_stats_ad AFTER DELETE ON booking BEGIN {_uncount('old')}END")
+        op.execute(f"CREATE TRIGGER booking_daily_stats_au AFTER UPDATE OF booking_date, status, user_id ON booking "
+                   f"WHEN old.booking_date IS NOT new.booking_date OR old.status IS NOT new.status "
+                   f"OR old.user_id IS NOT new.user_id BEGIN {_uncount('old')}{_count('new')}END")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS booking_daily_stats_au')
+        op.execute('DROP TRIGGER IF EXISTS booking_daily_stats_ad')
+        op.execute('DROP TRIGGER IF EXISTS booking_daily_stats_ai')
+    op.drop_table('booking_daily_stats')
@@ -0,0 +1,52 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from config import Config
+from app import create_app, db as _db
+from app.models import User
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    WTF_CSRF_ENABLED = False
+    SQL_PROFILING = True
+
+
+@pytest.fixture
+def app(tmp_path):
+    TestConfig.UPLOAD_FOLDER = str(tmp_path)
+    TestConfig.BACKUP_FOLDER = str(tmp_path / 'backups')
+    app = create_app(TestConfig)
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+
+
+@pytest.fixture
+def db(app):
+    return _db
+
+
+@pytest.fixture
+def user(db):
+    user = User(username='admin', email='admin@example.com', is_admin=True)
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, user):
+    # Talisman redirects plain HTTP, so present every request as proxied https.
+    client = app.test_client()
+    client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    client.post('/login', data={'username': 'admin', 'password': 'secret'})
+    return client
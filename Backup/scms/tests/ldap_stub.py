@@ -0,0 +1,229 @@
+"""A small LDAP server that runs in a thread, for tests and benchmarks.
+
+It speaks enough LDAPv3 over real TCP for the login path: simple binds,
+searches with equality/presence/and/or/not filters, and unbind. ``latency``
+delays every response and ``connect_latency`` every new connection, to
+stand in for a directory on the other side of a network (and the TLS
+handshake to it). Not for production use.
+"""
+import socket
+import socketserver
+import threading
+import time
+
+SUCCESS = 0
+INVALID_CREDENTIALS = 49
+
+# BER tags of the protocol operations and filter choices handled here.
+BIND_REQUEST, BIND_RESPONSE, UNBIND_REQUEST = 0x60, 0x61, 0x42
+SEARCH_REQUEST, SEARCH_ENTRY, SEARCH_DONE = 0x63, 0x64, 0x65
+FILTER_AND, FILTER_OR, FILTER_NOT, FILTER_EQUALITY, FILTER_PRESENT = 0xa0, 0xa1, 0xa2, 0xa3, 0x87
+
+
+def _read_message(sock):
+    # One BER element: tag, definite length, content.
+    header = _read_exactly(sock, 2)
+    if header is None:
+        return None
+    length = header[1]
+    extra = b''
+    if length & 0x80:
+        extra = _read_exactly(sock, length & 0x7f)
+        length = int.from_bytes(extra, 'big')
+    return header + extra + _read_exactly(sock, length)
+
+
+def _read_exactly(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def _elements(data):
+    """Yield (tag, value) for each BER element in ``data``."""
+    pos = 0
+    while pos < len(data):
+        tag, length = data[pos], data[pos + 1]
+        pos += 2
+        if length & 0x80:
+            size = length & 0x7f
+            length = int.from_bytes(data[pos:pos + size], 'big')
+            pos += size
+        yield tag, data[pos:pos + length]
+        pos += length
+
+
+def _encode(tag, value):
+    length = len(value)
+    if length < 0x80:
+        return bytes([tag, length]) + value
+    size = (length.bit_length() + 7) // 8
+    return bytes([tag, 0x80 | size]) + length.to_bytes(size, 'big') + value
+
+
+def _integer(tag, value):
+    return _encode(tag, value.to_bytes(value.bit_length() // 8 + 1, 'big', signed=True))
+
+
+def _string(value, tag=0x04):
+    return _encode(tag, value.encode() if isinstance(value, str) else value)
+
+
+def _message(message_id, tag, content):
+    return _encode(0x30, _integer(0x02, message_id) + _encode(tag, content))
+
+
+def _result(code):
+    return _integer(0x0a, code) + _string('') + _string('')
+
+
+def _entry(dn, attributes):
+    partial = b''.join(_encode(0x30, _string(name) + _encode(0x31, b''.join(_string(v) for v in values)))
+                       for name, values in attributes.items())
+    return _string(dn) + _encode(0x30, partial)
+
+
+class StubDirectory:
+    """Entries keyed by DN; attribute names are matched case-insensitively."""
+
+    def __init__(self, entries=None):
+        self.entries = {}
+        for dn, attributes in (entries or {}).items():
+            self.add(dn, attributes)
+
+    def add(self, dn, attributes):
+        normalised = {}
+        for name, values in attributes.items():
+            values = values if isinstance(values, (list, tuple)) else [values]
+            normalised[name.lower()] = [str(value) for value in values]
+        self.entries[dn.lower()] = (dn, normalised)
+
+    def check_password(self, dn, password):
+        if not dn:
+            return not password
+        entry = self.entries.get(dn.lower())
+        return entry is not None and password in entry[1].get('userpassword', [])
+
+    def search(self, base, scope, search_filter):
+        base = base.lower()
+        for key, (dn, attributes) in self.entries.items():
+            if scope == 0 and key != base:
+                continue
+            if scope == 1 and key.partition(',')[2] != base:
+                continue
+            if base and not (key == base or key.endswith(',' + base)):
+                continue
+            if self._matches(search_filter, attributes):
+                yield dn, attributes
+
+    def _matches(self, search_filter, attributes):
+        tag, value = search_filter
+        if tag == FILTER_AND:
+            return all(self._matches(f, attributes) for f in _elements(value))
+        if tag == FILTER_OR:
+            return any(self._matches(f, attributes) for f in _elements(value))
+        if tag == FILTER_NOT:
+            return not self._matches(next(_elements(value)), attributes)
+        if tag == FILTER_PRESENT:
+            name = value.decode().lower()
+            return name == 'objectclass' or name in attributes
+        if tag == FILTER_EQUALITY:
+            name, wanted = (v.decode() for _, v in _elements(value))
+            return any(v.lower() == wanted.lower() for v in attributes.get(name.lower(), []))
+        return False
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server.stub
+        server.connections += 1
+        server.sockets.add(self.request)
+        try:
+            time.sleep(server.connect_latency)
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._serve(server)
+        except OSError:
+            pass
+        finally:
+            server.sockets.discard(self.request)
+
+    def _serve(self, server):
+        while True:
+            data = _read_message(self.request)
+            if not data:
+                return
+            _, envelope = next(_elements(data))
+            parts = _elements(envelope)
+            message_id = int.from_bytes(next(parts)[1], 'big', signed=True)
+            tag, request = next(parts)
+            time.sleep(server.latency)
+            if tag == UNBIND_REQUEST:
+                return
+            if tag == BIND_REQUEST:
+                server.binds += 1
+                _, (_, dn), (_, password) = _elements(request)
+                ok = server.directory.check_password(dn.decode(), password.decode())
+                code = SUCCESS if ok else INVALID_CREDENTIALS
+                self.request.sendall(_message(message_id, BIND_RESPONSE, _result(code)))
+            elif tag == SEARCH_REQUEST:
+                server.searches += 1
+                fields = list(_elements(request))
+                base, scope, search_filter = fields[0][1].decode(), fields[1][1][0], fields[6]
+                wanted = {v.decode().lower() for _, v in _elements(fields[7][1])}
+                out = b''
+                for dn, attributes in server.directory.search(base, scope, search_filter):
+                    selected = {k: v for k, v in attributes.items()
+                                if k != 'userpassword' and (not wanted or '*' in wanted or k in wanted)}
+                    out += _message(message_id, SEARCH_ENTRY, _entry(dn, selected))
+                self.request.sendall(out + _message(message_id, SEARCH_DONE, _result(SUCCESS)))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class StubLDAPServer:
+    """Serve ``directory`` on 127.0.0.1 from a background thread.
+
+    Use as a context manager; ``url`` is what LDAP_HOST should be set to.
+    The ``connections``, ``binds`` and ``searches`` counters show how much
+    work the client really sent.
+    """
+
+    def __init__(self, directory, latency=0, connect_latency=0):
+        self.directory = directory
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.connections = self.binds = self.searches = 0
+        self.sockets = set()
+        self._server = _Server(('127.0.0.1', 0), _Handler)
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f'ldap://127.0.0.1:{self._server.server_address[1]}'
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def drop_connections(self):
+        """Close every client connection, as a directory restart or idle timeout would."""
+        for sock in list(self.sockets):
+            sock.shutdown(socket.SHUT_RDWR)
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,90 @@
+import hashlib
+import io
+import os
+
+from app.attachments import attachment_store
+from app.models import Booking
+
+PDF = b'%PDF-1.4\n' + bytes(range(256)) * 64
+
+
+def create_booking(client, name, filename, data):
+    return client.post('/bookings/create', content_type='multipart/form-data', data={
+        'client_name': name, 'email': 'ada@example.com', 'mobile_number': '1',
+        'booking_date': '2024-09-01', 'training_date': '2024-10-01', 'status': 'pending',
+        'attachment': (io.BytesIO(data), filename),
+    })
+
+
+def test_uploads_are_stored_once_per_content(app, client, db):
+    create_booking(client, 'Ada', 'report.pdf', PDF)
+    create_booking(client, 'Grace', 'copy of report.pdf', PDF)
+    create_booking(client, 'Alan', 'report.pdf', PDF + b'changed')
+
+    ada, grace, alan = Booking.query.order_by(Booking.id).all()
+    assert ada.attachment_sha256 == grace.attachment_sha256 == hashlib.sha256(PDF).hexdigest()
+    assert (ada.attachment_filename, grace.attachment_filename) == ('report.pdf', 'copy_of_report.pdf')
+    assert alan.attachment_sha256 != ada.attachment_sha256
+
+    store = attachment_store()
+    with open(store.path(ada.attachment_sha256), 'rb') as f:
+        assert f.read() == PDF
+    objects = [name for _, _, names in os.walk(store.root) for name in names]
+    assert len(objects) == 2
+
+
+def test_attachment_is_served_immutable_with_ranges(client, db):
+    create_booking(client, 'Ada', 'report.pdf', PDF)
+    booking = Booking.query.one()
+
+    redirect = client.get(f'/bookings/view_attachment/{booking.id}')
+    assert redirect.status_code == 302
+    url = redirect.headers['Location']
+    assert booking.attachment_sha256 in url
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == PDF
+    assert response.mimetype == 'application/pdf'
+    assert response.headers['ETag'] == f'"{booking.attachment_sha256}"'
+    assert response.cache_control.immutable and response.cache_control.private
+
+    assert client.get(url, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    unknown = '0' * 64
+    assert client.get(f'/bookings/attachments/{unknown}/report.pdf',
+                      headers={'If-None-Match': f'"{unknown}"'}).status_code == 404
+
+    partial = client.get(url, headers={'Range': 'bytes=9-18'})
+    assert partial.status_code == 206
+    assert partial.data == PDF[9:19]
+    assert partial.headers['Content-Range'] == f'bytes 9-18/{len(PDF)}'
+
+
+def test_accel_redirect_leaves_the_body_to_nginx(app, client, db):
+    app.config['ATTACHMENT_ACCEL_PREFIX'] = '/_attachments/'
+    create_booking(client, 'Ada', 'report.pdf', PDF)
+    digest = Booking.query.one().attachment_sha256
+
+    response = client.get(f'/bookings/attachments/{digest}/report.pdf')
+    assert response.status_code == 200
+    assert response.data == b''
+    assert response.headers['X-Accel-Redirect'] == f'/_attachments/{digest[:2]}/{digest}'
+    assert response.headers['ETag'] == f'"{digest}"'
+
+
+def test_unknown_digest_is_not_served(client, db):
+    assert client.get(f"/bookings/attachments/{'0' * 64}/report.pdf").status_code == 404
+
+
+def test_import_attachments_moves_legacy_uploads(app, db, user):
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], 'old.pdf'), 'wb') as f:
+        f.write(PDF)
+    booking = Booking(user_id=user.id, client_name='Ada', email='ada@example.com', mobile_number='1',
+                      attachment_filename='old.pdf')
+    db.session.add(booking)
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['import-attachments', '--delete'])
+    assert '1 attachments imported' in result.output
+    assert db.session.get(Booking, booking.id).attachment_sha256 == hashlib.sha256(PDF).hexdigest()
+    assert not os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], 'old.pdf'))
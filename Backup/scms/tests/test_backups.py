@@ -0,0 +1,78 @@
+import os
+import sqlite3
+
+import pytest
+
+from app import backups
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'source.db')
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, body TEXT)')
+    connection.executemany('INSERT INTO item (body) VALUES (?)', [('x' * 500,) for _ in range(2000)])
+    connection.commit()
+    connection.close()
+    return path
+
+
+def count_items(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute('SELECT count(*) FROM item').fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_create_backup_verifies_and_records_manifest(source, tmp_path):
+    directory = str(tmp_path / 'backups')
+    entry = backups.create_backup(source, directory, 'incremental', pages=16, pause=0)
+
+    path = os.path.join(directory, entry['filename'])
+    assert count_items(path) == 2000
+    assert entry['integrity'] == 'ok'
+    assert entry['steps'] > 1
+    assert entry['size'] == os.path.getsize(path)
+    assert entry['sha256'] == backups.file_checksum(path)
+    assert backups.read_manifest(directory) == [entry]
+    assert set(os.listdir(directory)) == {entry['filename'], backups.MANIFEST_NAME}
+
+
+def test_backup_finishes_in_one_step_after_repeated_restarts(source, tmp_path, monkeypatch):
+    writer = sqlite3.connect(source)
+
+    def write_between_steps(seconds):
+        writer.execute("INSERT INTO item (body) VALUES ('late')")
+        writer.commit()
+    monkeypatch.setattr(backups.time, 'sleep', write_between_steps)
+
+    target = str(tmp_path / 'copy.db')
+    stats = backups.online_backup(source, target, pages=16, pause=0.01, max_restarts=2)
+    writer.close()
+
+    assert stats['restarts'] == 3
+    assert count_items(target) == count_items(source)
+
+
+def test_failed_integrity_check_leaves_no_backup(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(backups, 'integrity_check', lambda path: 'page 3 is never used')
+    directory = str(tmp_path / 'backups')
+
+    with pytest.raises(backups.BackupError):
+        backups.create_backup(source, directory, 'incremental')
+    assert os.listdir(directory) == []
+
+
+def test_file_database_runs_in_wal_mode(tmp_path):
+    from config import Config
+    from app import create_app, db
+
+    class FileConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'app.db'}"
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        assert db.session.execute(db.text('PRAGMA journal_mode')).scalar() == 'wal'
+        db.session.remove()
+        db.engine.dispose()
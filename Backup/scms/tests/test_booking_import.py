@@ -0,0 +1,112 @@
+import io
+from datetime import date
+
+import pytest
+import xlsxwriter
+
+from app.booking_import import ImportFileError, import_bookings
+from app.models import Booking, BookingDailyStats
+
+CSV = (
+    '\ufeffName,Email,Phone,Booking Date,Training Date,Status,Organisation\r\n'
+    'Ada Lovelace,ada@example.com,07000000001,2024-09-01,,approved,Analytical Ltd\r\n'
+    'No Email,,07000000002,2024-09-01,,,\r\n'
+    'Bad Date,bad@example.com,07000000003,31/02/2024,,,\r\n'
+    ',,,,,,\r\n'
+    'Grace Hopper,grace@example.com,07000000004,02/09/2024,2024-10-15,,\r\n'
+    'Wrong Status,wrong@example.com,07000000005,2024-09-01,,finished,\r\n'
+)
+
+
+def xlsx_file(rows):
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {'in_memory': True})
+    sheet = workbook.add_worksheet()
+    dates = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            if isinstance(value, date):
+                sheet.write_datetime(r, c, value, dates)
+            elif value is not None:
+                sheet.write(r, c, value)
+    workbook.close()
+    buffer.seek(0)
+    return buffer
+
+
+def test_csv_rows_are_validated_and_inserted_in_batches(db, user):
+    result = import_bookings(io.BytesIO(CSV.encode()), 'bookings.csv', user.id, batch_size=1)
+
+    assert (result.rows, result.imported, result.failed) == (5, 2, 3)
+    assert [(number, errors[0].split()[0]) for number, errors in result.errors] == [
+        (3, 'email'), (4, 'booking_date'), (7, 'status')]
+
+    ada, grace = Booking.query.order_by(Booking.id).all()
+    assert (ada.client_name, ada.status, ada.organization_name, ada.training_date) == (
+        'Ada Lovelace', 'approved', 'Analytical Ltd', date(2024, 10, 1))
+    assert (grace.booking_date, grace.training_date, grace.status) == (date(2024, 9, 2), date(2024, 10, 15), 'pending')
+    assert [ada.reference_number, grace.reference_number] == ['20240901-0001', '20240902-0001']
+    assert sum(s.bookings for s in BookingDailyStats.query) == 2
+
+
+def test_xlsx_is_read_with_dates_numbers_and_gaps(db, user):
+    stream = xlsx_file([
+        ['client_name', 'email', 'mobile_number', 'booking_date', 'notes', 'address'],
+        ['Ada Lovelace', 'ada@example.com', 7000000001, date(2024, 9, 1), 'ignored', None],
+        ['Alan Turing', 'alan@example.com', '07000000002', '2024-09-03', None, '1 Bletchley Park'],
+        ['Too Long', 'long@example.com', '07000000003', date(2024, 9, 1), None, 'x' * 300],
+    ])
+    result = import_bookings(stream, 'Bookings.XLSX', user.id)
+
+    assert (result.rows, result.imported) == (3, 2)
+    assert result.errors == [(4, ['address is longer than 255 characters'])]
+    ada, alan = Booking.query.order_by(Booking.id).all()
+    assert (ada.mobile_number, ada.booking_date, ada.address) == ('7000000001', date(2024, 9, 1), None)
+    assert (alan.booking_date, alan.address) == (date(2024, 9, 3), '1 Bletchley Park')
+
+
+def test_xlsx_errors_name_the_worksheet_row_across_blank_rows(db, user):
+    stream = xlsx_file([
+        ['client_name', 'email', 'mobile_number', 'booking_date'],
+        [],
+        [],
+        ['Ada Lovelace', 'ada@example.com', '07000000001', date(2024, 9, 1)],
+        ['No Email', None, '07000000002', date(2024, 9, 1)],
+        [],
+        ['Bad Date', 'bad@example.com', '07000000003', 'soon'],
+    ])
+    result = import_bookings(stream, 'bookings.xlsx', user.id)
+
+    assert (result.rows, result.imported) == (3, 1)
+    # Blank rows are not written to the sheet at all; errors still point at rows 5 and 7.
+    assert [(number, errors[0].split()[0]) for number, errors in result.errors] == [(5, 'email'), (7, 'booking_date')]
+
+
+def test_dry_run_and_unreadable_files_import_nothing(db, user):
+    result = import_bookings(io.BytesIO(CSV.encode()), 'bookings.csv', user.id, dry_run=True)
+    assert (result.imported, result.failed) == (2, 3)
+    assert Booking.query.count() == 0
+
+    with pytest.raises(ImportFileError, match='Missing column'):
+        import_bookings(io.BytesIO(b'client_name,email\nAda,ada@example.com\n'), 'bookings.csv', user.id)
+    with pytest.raises(ImportFileError, match='xlsx'):
+        import_bookings(io.BytesIO(b'not a zip'), 'bookings.xlsx', user.id)
+    with pytest.raises(ImportFileError):
+        import_bookings(io.BytesIO(CSV.encode()), 'bookings.txt', user.id)
+
+
+def test_import_command_and_upload_page(app, client, db, user, tmp_path):
+    path = tmp_path / 'bookings.csv'
+    path.write_text(CSV, encoding='utf-8')
+    output = app.test_cli_runner().invoke(args=['import-bookings', str(path), '--username', 'admin']).output
+    assert 'Row 3: email is required' in output
+    assert '5 rows read, 2 imported, 3 rejected' in output
+
+    response = client.post('/bookings/import', data={'file': (io.BytesIO(CSV.encode()), 'more.csv')})
+    assert response.status_code == 200
+    assert b'5 rows read, 2 imported, 3 rejected' in response.data
+    assert b'status must be one of' in response.data
+    assert Booking.query.count() == 4
+
+    response = client.post('/bookings/import', data={'file': (io.BytesIO(b'x'), 'bookings.pdf')})
+    assert b'Only CSV and Excel' in response.data
@@ -0,0 +1,48 @@
+import zipfile
+from datetime import date
+from io import BytesIO
+
+from app.dashboard import get_snapshot
+from app.models import Booking, Certificate
+
+
+def add_booking(db, user, name, training_date, status='completed', organization='Acme'):
+    db.session.add(Booking(user_id=user.id, client_name=name, email='c@example.com', mobile_number='1',
+                           booking_date=training_date, training_date=training_date,
+                           status=status, organization_name=organization))
+
+
+def test_bulk_certificates_stream_zip_and_record(app, client, db, user):
+    app.config['CERTIFICATE_WORKERS'] = 2
+    add_booking(db, user, 'Alice', date(2024, 10, 1))
+    add_booking(db, user, 'Bob', date(2024, 10, 2))
+    add_booking(db, user, 'Carol', date(2024, 10, 3), status='pending')
+    add_booking(db, user, 'Dave', date(2024, 10, 4), organization='Other')
+    add_booking(db, user, 'Erin', date(2024, 12, 1))
+    db.session.commit()
+    assert get_snapshot()['total_certificates'] == 0
+
+    response = client.post('/bookings/bulk_certificates', data={
+        'training_from': '2024-10-01',
+        'training_to': '2024-10-31',
+        'organization_name': 'Acme',
+        'status': 'completed',
+    })
+    assert response.status_code == 200
+    assert response.mimetype == 'application/zip'
+    assert not response.is_sequence  # streamed, not buffered
+
+    archive = zipfile.ZipFile(BytesIO(response.get_data()))
+    names = sorted(archive.namelist())
+    assert len(names) == 2
+    assert names[0].endswith('_Alice.pdf') and names[1].endswith('_Bob.pdf')
+    assert archive.read(names[0]).startswith(b'%PDF')
+
+    assert sorted(c.client_name for c in Certificate.query.all()) == ['Alice', 'Bob']
+    assert get_snapshot()['total_certificates'] == 2
+
+
+def test_bulk_certificates_requires_admin(client, db, user):
+    user.is_admin = False
+    db.session.commit()
+    assert client.get('/bookings/bulk_certificates').status_code == 403
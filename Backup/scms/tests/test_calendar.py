@@ -0,0 +1,55 @@
+from datetime import date
+
+from app.models import Booking
+
+
+def add_booking(db, user, name, training_date, status='approved'):
+    booking = Booking(user_id=user.id, client_name=name, email='c@example.com', mobile_number='1',
+                      training_date=training_date, status=status)
+    db.session.add(booking)
+    db.session.commit()
+    return booking
+
+
+def test_feed_returns_only_the_requested_window(client, db, user):
+    add_booking(db, user, 'Before', date(2024, 8, 31))
+    inside = add_booking(db, user, 'Inside', date(2024, 9, 15), status='pending')
+    add_booking(db, user, 'End', date(2024, 10, 1))
+    add_booking(db, user, 'Undated', None)
+
+    response = client.get('/booking_calendar/events?start=2024-09-01T00:00:00%2B03:00&end=2024-10-01T00:00:00%2B03:00')
+    assert response.status_code == 200
+    assert response.get_json() == [{
+        'title': 'Inside - pending',
+        'start': '2024-09-15',
+        'url': f'/edit_booking/{inside.id}',
+        'color': '#ffc107',
+    }]
+
+
+def test_feed_revalidates_with_etag(client, db, user):
+    booking = add_booking(db, user, 'Ada', date(2024, 9, 15))
+    url = '/booking_calendar/events?start=2024-09-01&end=2024-10-01'
+
+    etag = client.get(url).headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+    booking.status = 'completed'
+    db.session.commit()
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()[0]['title'] == 'Ada - completed'
+
+
+def test_feed_rejects_bad_window(client):
+    assert client.get('/booking_calendar/events?start=2024-09-01').status_code == 400
+    assert client.get('/booking_calendar/events?start=2024-10-01&end=2024-09-01').status_code == 400
+    assert client.get('/booking_calendar/events?start=soon&end=later').status_code == 400
+
+
+def test_calendar_page_no_longer_embeds_bookings(client, db, user):
+    add_booking(db, user, 'Embedded Client', date(2024, 9, 15))
+    page = client.get('/booking_calendar')
+    assert page.status_code == 200
+    assert b'Embedded Client' not in page.data
+    assert b'/booking_calendar/events' in page.data
@@ -0,0 +1,41 @@
+import os
+import shutil
+from io import BytesIO
+
+from PyPDF2 import PdfReader
+
+from app.certificates import background_pdf, render_certificate
+from app.models import Booking
+
+IMAGE_DIR = os.path.join(os.path.dirname(__file__), '..', 'app', 'static', 'images')
+
+
+def test_certificate_contains_booking_details(tmp_path):
+    buffer = render_certificate('Jane Doe', '2024-10-01', IMAGE_DIR)
+    text = PdfReader(buffer).pages[0].extract_text()
+    assert 'Jane Doe' in text
+    assert '2024-10-01' in text
+    assert 'Certificate of Completion' in text
+
+
+def test_background_rebuilt_only_when_images_change(tmp_path):
+    image_dir = tmp_path / 'images'
+    shutil.copytree(IMAGE_DIR, image_dir)
+    first = background_pdf(str(image_dir))
+    assert background_pdf(str(image_dir)) is first
+
+    stamp = image_dir / 'stamp.png'
+    stat = stamp.stat()
+    os.utime(stamp, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert background_pdf(str(image_dir)) is not first
+
+
+def test_generate_certificate_route(client, db, user):
+    booking = Booking(user_id=user.id, client_name='John Roe', email='j@example.com', mobile_number='1',
+                      booking_date='2024-09-01', training_date='2024-10-01')
+    db.session.add(booking)
+    db.session.commit()
+    response = client.get(f'/bookings/generate_certificate/{booking.id}')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert 'John Roe' in PdfReader(BytesIO(response.data)).pages[0].extract_text()
@@ -0,0 +1,69 @@
+import gzip
+import os
+
+from flask import render_template_string
+
+from config import Config
+from app import create_app
+from app.assets import build_assets
+from app.models import Post
+
+
+def test_html_and_json_are_gzipped_for_clients_that_ask(client, db, user):
+    for i in range(20):
+        db.session.add(Post(title=f'Notice {i}', content='Parking is closed on Friday. ' * 5, author_id=user.id))
+    db.session.commit()
+
+    plain = client.get('/posts')
+    assert 'Content-Encoding' not in plain.headers and plain.headers['Vary'] == 'Accept-Encoding, Cookie'
+
+    zipped = client.get('/posts', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(zipped.data) == plain.data
+    assert int(zipped.headers['Content-Length']) < len(plain.data) / 4
+    revalidated = client.get('/posts', headers={'Accept-Encoding': 'gzip', 'If-None-Match': zipped.headers['ETag']})
+    assert revalidated.status_code == 304
+
+    small = client.get('/template_cache', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    streamed = client.get('/export/bookings', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in streamed.headers and streamed.data.startswith(b'\xef\xbb\xbf')
+
+
+def test_built_assets_are_fingerprinted_precompressed_and_immutable(tmp_path):
+    source, target = tmp_path / 'static', tmp_path / 'build'
+    (source / 'images').mkdir(parents=True)
+    css = b'.booking-row { padding: 4px; }\n' * 200
+    (source / 'site.css').write_bytes(css)
+    (source / 'images' / 'logo.png').write_bytes(os.urandom(2048))
+
+    class AssetConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        ASSET_BUILD_FOLDER = str(target)
+
+    app = create_app(AssetConfig)
+    with app.test_request_context():
+        assert render_template_string("{{ asset_url('site.css') }}") == '/static/site.css'
+
+    manifest, _ = build_assets(str(source), str(target))
+    built = manifest['site.css']
+    assert built.startswith('site.') and built.endswith('.css') and built != 'site.css'
+    assert os.path.exists(target / (built + '.gz'))
+    assert not os.path.exists(target / (manifest['images/logo.png'] + '.gz'))
+    assert build_assets(str(source), str(target)) == (manifest, 0)
+
+    app = create_app(AssetConfig)
+    with app.test_request_context():
+        assert render_template_string("{{ asset_url('site.css') }}") == f'/assets/{built}'
+
+    client = app.test_client()
+    client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    plain = client.get(f'/assets/{built}')
+    assert plain.data == css and 'Content-Encoding' not in plain.headers
+    assert 'immutable' in plain.headers['Cache-Control'] and 'max-age=31536000' in plain.headers['Cache-Control']
+    zipped = client.get(f'/assets/{built}', headers={'Accept-Encoding': 'gzip'})
+    assert zipped.headers['Content-Encoding'] == 'gzip' and zipped.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(zipped.data) == css and len(zipped.data) < len(css) / 10
+    assert client.get(f"/assets/{manifest['images/logo.png']}", headers={'Accept-Encoding': 'gzip'}).status_code == 200
+    assert client.get('/assets/manifest.json').status_code == 404
+    assert client.get('/assets/../config.py').status_code == 404
@@ -0,0 +1,85 @@
+from datetime import date
+
+from sqlalchemy import event, update
+
+from app.conditional import table_versions, version_ddl
+from app.models import Booking, Post
+
+
+def count_queries(db):
+    queries = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *a: queries.append(a[2]))
+    return queries
+
+
+def test_post_pages_answer_304_until_a_post_changes(client, db, user):
+    post = Post(title='Opening hours', content='Nine to five.', author_id=user.id)
+    db.session.add(post)
+    db.session.commit()
+
+    for path in ('/posts', f'/post/{post.id}'):
+        first = client.get(path)
+        assert first.status_code == 200 and b'Opening hours' in first.data
+        assert first.headers['ETag'].startswith('W/') and 'Last-Modified' in first.headers
+        assert 'no-cache' in first.headers['Cache-Control']
+
+        queries = count_queries(db)
+        again = client.get(path, headers={'If-None-Match': first.headers['ETag']})
+        assert again.status_code == 304 and again.headers['ETag'] == first.headers['ETag']
+        # Only the watermark is read; no posts are loaded and nothing is rendered.
+        assert not any('FROM post' in sql for sql in queries)
+
+    etag = client.get('/posts').headers['ETag']
+    # A Core write, as another worker would make it, still moves the version.
+    db.session.execute(update(Post).where(Post.id == post.id).values(title='Closing hours'))
+    db.session.commit()
+    changed = client.get('/posts', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and b'Closing hours' in changed.data
+
+
+def test_pages_with_flashed_messages_are_not_tagged(client, db, user):
+    post = Post(title='Draft', content='...', author_id=user.id)
+    db.session.add(post)
+    db.session.commit()
+    etag = client.get(f'/post/{post.id}').headers['ETag']
+
+    client.post(f'/post/{post.id}/edit', data={'title': 'Draft', 'content': 'Same again.'})
+    flashed = client.get(f'/post/{post.id}', headers={'If-None-Match': etag})
+    assert flashed.status_code == 200 and b'has been updated' in flashed.data
+    assert 'ETag' not in flashed.headers
+
+
+def test_fragments_follow_versions_written_elsewhere(client, db, user):
+    booking = Booking(user_id=user.id, client_name='Ada', email='ada@example.com', mobile_number='1',
+                      booking_date=date.today())
+    db.session.add(booking)
+    db.session.commit()
+    etag = client.get('/statistics').headers['ETag']
+    before = table_versions('booking')['booking'][0]
+
+    # Bypasses the ORM events that would drop the cached top-clients fragment in this worker.
+    db.session.execute(update(Booking).values(client_name='Grace'))
+    db.session.commit()
+    assert table_versions('booking')['booking'][0] == before + 1
+
+    page = client.get('/statistics', headers={'If-None-Match': etag})
+    assert page.status_code == 200
+    assert b'Grace' in page.data and b'Ada' not in page.data
+
+
+def test_pages_are_not_tagged_without_the_version_triggers(app, client, db, user, caplog):
+    with db.engine.begin() as connection:
+        for statement in version_ddl('post'):
+            connection.exec_driver_sql(f'DROP TRIGGER {statement.split()[5]}')
+    post = Post(title='Opening hours', content='Nine to five.', author_id=user.id)
+    db.session.add(post)
+    db.session.commit()
+
+    first = client.get('/posts')
+    assert first.status_code == 200 and 'ETag' not in first.headers
+    assert 'table_version triggers are missing' in caplog.text
+    post.title = 'Closing hours'
+    db.session.commit()
+    # Nothing moves the version any more, so a stale tag must not earn a 304.
+    again = client.get('/posts', headers={'If-None-Match': first.headers.get('ETag', '*')})
+    assert again.status_code == 200 and b'Closing hours' in again.data
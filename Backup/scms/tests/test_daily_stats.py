@@ -0,0 +1,108 @@
+import re
+from datetime import date, timedelta
+
+from sqlalchemy import event, func, update
+
+from app.models import Booking, BookingDailyStats, User
+from app.stats import booking_trends, rebuild_daily_stats
+
+
+def booking(user, days, status='pending', name='Client'):
+    return Booking(user_id=user.id, client_name=name, email='c@example.com', mobile_number='1',
+                   booking_date=date.today() + timedelta(days=days) if days is not None else None,
+                   training_date=date.today() + timedelta(days=days or 0), status=status)
+
+
+def by_key(rows):
+    return sorted(rows, key=lambda row: (str(row[0]), row[1:]))
+
+
+def rollup(db):
+    return by_key((row.day, row.status, row.user_id, row.bookings) for row in BookingDailyStats.query)
+
+
+def counted(db):
+    rows = db.session.query(Booking.booking_date, Booking.status, Booking.user_id, func.count(Booking.id)) \
+        .group_by(Booking.booking_date, Booking.status, Booking.user_id).all()
+    return by_key(tuple(row) for row in rows)
+
+
+def test_rollup_follows_orm_and_bulk_writes(db, user):
+    other = User(username='other', email='other@example.com')
+    db.session.add(other)
+    db.session.commit()
+    bookings = [booking(user, -3), booking(user, -3), booking(other, -3), booking(user, 0, 'completed'),
+                booking(user, None)]
+    db.session.add_all(bookings)
+    db.session.commit()
+    assert rollup(db) == counted(db)
+
+    bookings[0].status = 'completed'
+    bookings[1].booking_date = date.today()
+    bookings[2].user_id = user.id
+    bookings[3].client_name = 'Renamed'
+    db.session.delete(bookings[4])
+    db.session.commit()
+    assert rollup(db) == counted(db)
+
+    db.session.execute(update(Booking).where(Booking.status == 'pending').values(status='cancelled'))
+    db.session.commit()
+    assert rollup(db) == counted(db)
+    assert sum(row[3] for row in rollup(db)) == 4
+
+
+def test_rebuild_restores_a_damaged_rollup(app, db, user):
+    db.session.add_all([booking(user, d, status) for d in (-2, -1, -1) for status in ('pending', 'completed')])
+    db.session.commit()
+    expected = rollup(db)
+    db.session.execute(BookingDailyStats.__table__.delete())
+    db.session.execute(BookingDailyStats.__table__.insert().values(day=date.today(), status='x', user_id=0, bookings=9))
+    db.session.commit()
+
+    assert rebuild_daily_stats() == 6
+    assert rollup(db) == expected
+    result = app.test_cli_runner().invoke(args=['rebuild-booking-stats'])
+    assert 'rebuilt for 6 bookings' in result.output
+    assert rollup(db) == expected
+
+
+def test_trends_group_rollup_by_month_and_weekday(db, user):
+    today = date(2026, 3, 18)
+    days = [date(2026, 3, 2), date(2026, 3, 9), date(2026, 2, 10), date(2025, 12, 31), date(2025, 11, 30)]
+    for day in days:
+        db.session.add(Booking(user_id=user.id, client_name=f'Client {day}', email='c@example.com', mobile_number='1',
+                               booking_date=day, training_date=day, status='completed'))
+    db.session.commit()
+
+    trends = booking_trends(months=4, today=today)
+    assert (trends['start'], trends['end']) == (date(2025, 12, 1), date(2026, 3, 31))
+    assert trends['monthly_bookings'] == [{'month': '2025-12', 'count': 1}, {'month': '2026-02', 'count': 1},
+                                          {'month': '2026-03', 'count': 2}]
+    assert trends['day_of_week_popularity'] == [{'day': 'Monday', 'count': 2}, {'day': 'Tuesday', 'count': 1},
+                                                {'day': 'Wednesday', 'count': 1}]
+    assert trends['status_distribution'] == [{'status': 'completed', 'count': 4}]
+    assert [c['name'] for c in trends['clients']][0] == 'Client 2026-03-09'
+    assert len(trends['clients']) == 4
+
+
+def test_statistics_pages_do_not_count_the_booking_table(client, db, user):
+    db.session.add_all([booking(user, -d, 'completed' if d % 2 else 'pending', f'Client {d % 3}')
+                        for d in range(0, 60)])
+    db.session.commit()
+
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        statistics = client.get('/statistics')
+        trends = client.get('/booking_trends?months=3')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert statistics.status_code == 200 and trends.status_code == 200
+    assert b'<p class="card-text display-4">60</p>' in statistics.data
+    assert b'Client 0' in statistics.data and b'Client 1' in trends.data
+    for statement in statements:
+        if re.search(r'FROM booking\b(?!_)', statement):
+            # Only range-bounded reads of booking rows remain.
+            assert re.search(r'booking\.(booking_date|training_date) (>=|BETWEEN)', statement), statement
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from app.dashboard import get_snapshot
+from app.models import Booking, Certificate, Post
+
+
+def make_booking(user, booking_date, status='pending'):
+    return Booking(
+        user_id=user.id,
+        client_name='Client',
+        email='client@example.com',
+        mobile_number='12345678',
+        booking_date=booking_date,
+        status=status
+    )
+
+
+def test_snapshot_follows_commits(db, user):
+    assert get_snapshot()['total_bookings'] == 0
+
+    upcoming = make_booking(user, date.today() + timedelta(days=3))
+    db.session.add_all([upcoming, make_booking(user, date.today() - timedelta(days=400), status='approved')])
+    db.session.add(Certificate(client_name='Client', achievement='Training', date=date.today(), user_id=user.id))
+    db.session.add(Post(title='Hello', content='World', author_id=user.id))
+    db.session.commit()
+
+    snapshot = get_snapshot()
+    assert snapshot['total_bookings'] == 2
+    assert snapshot['status_counts'] == {'pending': 1, 'approved': 1}
+    assert snapshot['recent_bookings'] == 1
+    assert snapshot['total_certificates'] == 1
+    assert snapshot['total_users'] == 1
+    assert [b['id'] for b in snapshot['upcoming_bookings']] == [upcoming.id]
+    assert [p['title'] for p in snapshot['recent_posts']] == ['Hello']
+
+    upcoming.status = 'approved'
+    db.session.commit()
+    assert get_snapshot()['status_counts'] == {'approved': 2}
+
+    db.session.delete(upcoming)
+    db.session.commit()
+    snapshot = get_snapshot()
+    assert snapshot['total_bookings'] == 1
+    assert snapshot['upcoming_bookings'] == []
+
+
+def test_rolled_back_writes_are_ignored(db, user):
+    get_snapshot()
+    db.session.add(make_booking(user, date.today()))
+    db.session.flush()
+    db.session.rollback()
+    assert get_snapshot()['total_bookings'] == 0
+
+
+def test_index_sends_no_aggregate_queries(app, client, db, user):
+    db.session.add(make_booking(user, date.today() + timedelta(days=1)))
+    db.session.commit()
+    client.get('/')
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get('/')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 200
+    assert not [s for s in statements if 'count(' in s.lower() or 'FROM booking' in s]
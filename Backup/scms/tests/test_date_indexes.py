@@ -0,0 +1,61 @@
+import re
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from app.jobs import work
+from app.models import Booking
+
+DATE_RANGE = re.compile(r'booking\.(booking_date|training_date)\s*[<>]|\(booking\.booking_date, booking\.id\)\s*[<>]')
+
+
+def explain(connection, statement, parameters):
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+        return ' | '.join(row[-1] for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def test_booking_date_columns_are_dates(db, user):
+    booking = Booking(user_id=user.id, client_name='Client', email='c@example.com', mobile_number='1',
+                      booking_date='2024-09-01', training_date='2024-10-01')
+    db.session.add(booking)
+    db.session.commit()
+    db.session.expire_all()
+    assert db.session.get(Booking, booking.id).booking_date == date(2024, 9, 1)
+    assert db.session.get(Booking, booking.id).training_date == date(2024, 10, 1)
+
+
+def test_route_date_filters_use_index_range_scans(client, db, user):
+    for offset in range(-40, 40, 4):
+        db.session.add(Booking(user_id=user.id, client_name='Client', email='c@example.com', mobile_number='1',
+                               booking_date=date.today() + timedelta(days=offset),
+                               training_date=date.today() + timedelta(days=offset + 30),
+                               status='pending'))
+    db.session.commit()
+
+    captured = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if DATE_RANGE.search(statement):
+            captured.append((statement, parameters))
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        for path in ['/', '/statistics', '/view_bookings?per_page=3', '/bookings/view?per_page=3',
+                     f'/booking_calendar/events?start={date.today()}&end={date.today() + timedelta(days=42)}']:
+            assert client.get(path).status_code == 200
+        assert client.get('/bookings/update_booking_statuses').status_code == 202
+        work('test-worker', burst=True)
+        first_page = client.get('/view_bookings?per_page=3')
+        cursor = re.search(rb'after=([\w-]+)', first_page.data).group(1).decode()
+        assert client.get(f'/view_bookings?per_page=3&after={cursor}').status_code == 200
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert captured
+    with db.engine.connect() as connection:
+        for statement, parameters in captured:
+            plan = explain(connection, statement, parameters)
+            assert 'SCAN booking' not in plan.replace('SCAN booking USING COVERING INDEX', ''), (statement, plan)
+            assert 'INDEX ix_booking_' in plan, (statement, plan)
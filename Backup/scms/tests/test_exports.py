@@ -0,0 +1,108 @@
+import csv
+import io
+import zipfile
+from datetime import date, datetime
+
+from flask import g
+from sqlalchemy import text
+
+from app.booking_import import read_rows
+from app.exports import DATASETS, export_query, write_xlsx
+from app.models import Booking, Certificate, User, UserLog
+
+
+def add_bookings(db, user, count):
+    db.session.add_all(Booking(user_id=user.id, client_name=f'Client {i}', email=f'c{i}@example.com',
+                               mobile_number='07000000000', booking_date=date(2024, 9, 1 + i % 28),
+                               status='completed') for i in range(count))
+    db.session.commit()
+
+
+def test_csv_export_streams_in_chunks_and_reads_back_as_an_import(app, client, db, user):
+    app.config['EXPORT_CHUNK_SIZE'] = 10
+    add_bookings(db, user, 25)
+
+    response = client.get('/export/bookings')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'].startswith('attachment; filename=bookings_')
+    chunks = list(response.response)
+    assert len(chunks) == 4  # three batches of rows and a final empty flush
+
+    rows = list(read_rows(io.BytesIO(b''.join(chunks)), 'bookings.csv'))
+    assert len(rows) == 25
+    assert rows[0][1] == {'client_name': 'Client 0', 'email': 'c0@example.com', 'mobile_number': '07000000000',
+                          'booking_date': '2024-09-01', 'training_date': '', 'status': 'completed',
+                          'organization_name': '', 'address': ''}
+
+    filtered = client.get('/export/bookings?from=2024-09-02&to=2024-09-03').data.decode('utf-8-sig')
+    assert [row['client_name'] for row in csv.DictReader(io.StringIO(filtered))] == [
+        'Client 1', 'Client 2']
+
+
+def test_csv_export_escapes_formulas_and_imports_them_unchanged(app, client, db, user):
+    db.session.add(Booking(user_id=user.id, client_name='=HYPERLINK("http://evil.example","x")',
+                           email='c@example.com', mobile_number='+447000000000', booking_date=date(2024, 9, 1),
+                           organization_name='@SUM(A1)', address='-1+2'))
+    db.session.commit()
+
+    data = client.get('/export/bookings').data
+    row = next(csv.DictReader(io.StringIO(data.decode('utf-8-sig'))))
+    assert row['client_name'] == '\'=HYPERLINK("http://evil.example","x")'
+    assert (row['mobile_number'], row['organization_name'], row['address']) == ("'+447000000000", "'@SUM(A1)", "'-1+2")
+    assert row['email'] == 'c@example.com'
+
+    _, values = next(read_rows(io.BytesIO(data), 'bookings.csv'))
+    assert values['client_name'] == '=HYPERLINK("http://evil.example","x")'
+    assert (values['mobile_number'], values['organization_name'], values['address']) == ('+447000000000', '@SUM(A1)', '-1+2')
+
+
+def test_xlsx_export_and_date_filters_on_timestamps(app, client, db, user):
+    db.session.add(Certificate(client_name='Ada', achievement='Safety', date=date(2024, 9, 1), user_id=user.id))
+    db.session.add_all([UserLog(user_id=user.id, action='login', timestamp=datetime(2024, 9, 1, 23, 59)),
+                        UserLog(user_id=user.id, action='logout', timestamp=datetime(2024, 9, 2, 0, 1))])
+    db.session.commit()
+
+    response = client.get('/export/certificates?format=xlsx')
+    assert response.mimetype == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    with zipfile.ZipFile(io.BytesIO(response.data)) as workbook:
+        assert b'Safety' in workbook.read('xl/worksheets/sheet1.xml')
+
+    logs = list(db.session.execute(export_query('user_logs', date(2024, 9, 1), date(2024, 9, 1))))
+    assert [row.action for row in logs] == ['login']
+
+    buffer = io.BytesIO()
+    assert write_xlsx(export_query('user_logs'), buffer) == 2
+
+    assert client.get('/export/passwords').status_code == 404
+    assert client.get('/export/bookings?format=pdf').status_code == 404
+
+
+def test_exports_read_in_index_order_without_sorting(db):
+    for dataset in DATASETS:
+        for start, end in ((None, None), (date(2024, 9, 1), date(2024, 9, 30))):
+            query = export_query(dataset, start, end)
+            compiled = query.compile(db.engine, compile_kwargs={'literal_binds': True})
+            plan = ' '.join(row[-1] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {compiled}')))
+            # A temp B-tree means the whole table is sorted before the first row is sent.
+            assert 'TEMP B-TREE' not in plan, (dataset, start, plan)
+
+
+def test_export_command_and_admin_only(app, db, user, tmp_path):
+    add_bookings(db, user, 3)
+    output = tmp_path / 'bookings.xlsx'
+    result = app.test_cli_runner().invoke(args=['export', 'bookings', '--format', 'xlsx', '--output', str(output)])
+    assert result.exit_code == 0
+    with open(output, 'rb') as f:
+        rows = list(read_rows(f, 'bookings.xlsx'))
+    assert [values['booking_date'] for _, values in rows] == [45536, 45537, 45538]
+
+    staff = User(username='staff', email='staff@example.com')
+    staff.set_password('secret')
+    db.session.add(staff)
+    db.session.commit()
+    g.pop('_login_user', None)
+    client = app.test_client()
+    client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    client.post('/login', data={'username': 'staff', 'password': 'secret'})
+    assert client.get('/export/bookings').status_code == 403
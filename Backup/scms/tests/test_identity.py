@@ -0,0 +1,94 @@
+from flask import g
+from sqlalchemy import event
+
+from app import db
+from app.identity import IdentityCache
+from app.models import User
+
+
+def user_selects(db):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('SELECT') and 'FROM user' in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    return statements
+
+
+def fetch(client, url, method='GET', **kwargs):
+    # Requests share the fixture's app context, and with it Flask-Login's
+    # loaded user and the session; drop both so each request goes through
+    # the user loader like a fresh one would.
+    g.pop('_login_user', None)
+    db.session.remove()
+    return client.open(url, method=method, **kwargs)
+
+
+def login(app, username, password):
+    client = app.test_client()
+    client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    fetch(client, '/login', method='POST', data={'username': username, 'password': password})
+    return client
+
+
+def test_user_loader_skips_the_database_once_cached(client):
+    fetch(client, '/identity_cache')
+    selects = user_selects(db)
+
+    response = fetch(client, '/identity_cache')
+    assert selects == []
+    stats = response.get_json()
+    assert stats['hits'] >= 1 and stats['size'] == 1
+
+
+def test_edit_and_delete_user_take_effect_on_next_request(app, client):
+    member = User(username='member', email='member@example.com')
+    member.set_password('password1')
+    db.session.add(member)
+    db.session.commit()
+    member_id = member.id
+    member_client = login(app, 'member', 'password1')
+    assert fetch(member_client, '/identity_cache').status_code == 403
+
+    fetch(client, f'/edit_user/{member_id}', method='POST',
+          data={'username': 'member', 'email': 'member@example.com', 'is_admin': 'y'})
+    assert fetch(member_client, '/identity_cache').status_code == 200
+
+    fetch(client, f'/delete_user/{member_id}', method='POST')
+    assert fetch(member_client, '/identity_cache').status_code == 302
+
+
+def test_cache_is_bounded_and_expires():
+    cache = IdentityCache(maxsize=2, ttl=60)
+    for user_id in (1, 2, 3):
+        cache.put(user_id, {'id': user_id}, cache.generation)
+    assert cache.get(1) is None
+    assert cache.get(3) == {'id': 3}
+    assert cache.stats()['evictions'] == 1
+
+    cache.ttl = -1
+    assert cache.get(3) is None
+
+
+def test_row_read_before_an_invalidation_is_not_cached():
+    cache = IdentityCache()
+    generation = cache.generation
+    cache.invalidate([1])
+    cache.put(1, {'id': 1}, generation)
+    assert cache.get(1) is None
+
+
+def test_signal_file_reaches_other_workers(tmp_path):
+    signal = str(tmp_path / 'identity.signal')
+    worker_a, worker_b = IdentityCache(signal=signal), IdentityCache(signal=signal)
+    worker_b.put(1, {'id': 1}, worker_b.generation)
+    worker_b.put(2, {'id': 2}, worker_b.generation)
+
+    worker_a.invalidate([1])
+    assert worker_b.get(2) is None
+
+    worker_b.put(2, {'id': 2}, worker_b.generation)
+    worker_a.invalidate([1])
+    assert worker_b.get(2) is None
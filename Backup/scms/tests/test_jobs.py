@@ -0,0 +1,104 @@
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import jobs
+from app.models import Booking, Job
+
+
+@pytest.fixture
+def flaky_task():
+    calls = []
+
+    @jobs.task('flaky')
+    def flaky(job, fail_times=0):
+        calls.append(job.attempt)
+        if len(calls) <= fail_times:
+            raise RuntimeError('boom')
+        job.progress(50, 'halfway')
+        return {'calls': len(calls)}
+
+    yield calls
+    jobs._registry.pop('flaky', None)
+
+
+def test_enqueue_rejects_unknown_task(app):
+    with pytest.raises(ValueError):
+        jobs.enqueue('no_such_task')
+
+
+def test_claim_locks_job_for_one_worker(db, flaky_task):
+    job = jobs.enqueue('flaky')
+
+    claimed = jobs.claim_next('worker-a')
+    assert claimed.id == job.id
+    assert (claimed.status, claimed.locked_by, claimed.attempts) == ('running', 'worker-a', 1)
+    assert jobs.claim_next('worker-b') is None
+
+
+def test_failed_job_is_retried_with_backoff(app, db, flaky_task):
+    app.config['JOB_RETRY_BACKOFF'] = 10
+    job = jobs.enqueue('flaky', {'fail_times': 1}, max_attempts=2)
+
+    assert jobs.work('worker', burst=True) == 1
+    job = db.session.get(Job, job.id)
+    assert job.status == 'queued'
+    assert 'RuntimeError: boom' in job.error
+    assert job.run_at > datetime.utcnow() + timedelta(seconds=5)
+
+    # Not due yet, so a burst worker finds nothing to do.
+    assert jobs.work('worker', burst=True) == 0
+
+    job.run_at = datetime.utcnow()
+    db.session.commit()
+    assert jobs.work('worker', burst=True) == 1
+    job = db.session.get(Job, job.id)
+    assert (job.status, job.progress, job.result, job.attempts) == ('succeeded', 100, {'calls': 2}, 2)
+    assert flaky_task == [1, 2]
+
+
+def test_job_fails_after_max_attempts(db, flaky_task):
+    job = jobs.enqueue('flaky', {'fail_times': 5}, max_attempts=1)
+
+    jobs.work('worker', burst=True)
+    job = db.session.get(Job, job.id)
+    assert job.status == 'failed'
+    assert job.finished_at is not None
+
+
+def test_stale_running_job_is_requeued(app, db, flaky_task):
+    job = jobs.enqueue('flaky')
+    jobs.claim_next('crashed-worker')
+    job.locked_at = datetime.utcnow() - timedelta(seconds=app.config['JOB_LOCK_TIMEOUT'] + 1)
+    db.session.commit()
+
+    assert jobs.requeue_stale() == 1
+    assert db.session.get(Job, job.id).status == 'queued'
+
+
+def test_manual_backup_returns_job_id(client, db):
+    response = client.post('/manual_backup', data={'backup_type': 'incremental'})
+    assert response.status_code == 302
+    job = Job.query.one()
+    assert (job.name, job.payload, job.status) == ('backup_database', {'backup_type': 'incremental'}, 'queued')
+
+    page = client.get('/backup_status')
+    assert f'#{job.id}'.encode() in page.data
+    assert client.get(f'/jobs/{job.id}').get_json()['status'] == 'queued'
+
+
+def test_update_booking_statuses_runs_in_worker(client, db, user):
+    booking = Booking(user_id=user.id, client_name='Ada', email='ada@example.com', mobile_number='1',
+                      training_date=date.today() - timedelta(days=1), status='approved')
+    db.session.add(booking)
+    db.session.commit()
+
+    response = client.get('/bookings/update_booking_statuses')
+    assert response.status_code == 202
+    assert db.session.get(Booking, booking.id).status == 'approved'
+
+    jobs.work('worker', burst=True)
+    job = Job.query.one()
+    assert (job.status, job.result['updated']) == ('succeeded', 1)
+    assert db.session.get(Booking, booking.id).status == 'completed'
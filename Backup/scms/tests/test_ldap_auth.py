@@ -0,0 +1,107 @@
+import pytest
+from flask import g
+
+from app import ldap_auth
+from tests.ldap_stub import StubDirectory, StubLDAPServer
+from app.models import User
+
+PEOPLE = 'ou=people,dc=example,dc=com'
+ADA = f'uid=ada,{PEOPLE}'
+
+
+@pytest.fixture
+def directory(app):
+    entries = StubDirectory({
+        'cn=service,dc=example,dc=com': {'cn': 'service', 'userPassword': 'service-secret'},
+        ADA: {'objectClass': 'person', 'uid': 'ada', 'mail': 'ada@example.com', 'userPassword': 'lovelace'},
+        f'uid=alan,{PEOPLE}': {'objectClass': 'person', 'uid': 'alan', 'userPassword': 'turing'},
+        'cn=admins,ou=groups,dc=example,dc=com': {'objectClass': 'groupOfNames', 'cn': 'admins', 'member': [ADA]},
+    })
+    with StubLDAPServer(entries) as server:
+        app.config.update(
+            LDAP_ENABLED=True, LDAP_HOST=server.url, LDAP_BASE_DN='dc=example,dc=com',
+            LDAP_USER_DN='ou=people', LDAP_GROUP_DN='ou=groups',
+            LDAP_BIND_USER_DN='cn=service,dc=example,dc=com', LDAP_BIND_USER_PASSWORD='service-secret',
+            LDAP_ADMIN_GROUP='admins', LDAP_POOL_SIZE=2,
+        )
+        ldap_auth.init_app(app)
+        yield server
+
+
+def login(app, username, password):
+    client = app.test_client()
+    client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    # Requests share the fixture's app context; forget the last signed-in user.
+    g.pop('_login_user', None)
+    return client.post('/login', data={'username': username, 'password': password})
+
+
+def test_directory_login_creates_local_user(app, db, directory):
+    response = login(app, 'ada', 'lovelace')
+    assert response.status_code == 302 and response.headers['Location'] == '/'
+
+    user = User.query.filter_by(username='ada').one()
+    assert (user.email, user.is_admin, user.password_hash) == ('ada@example.com', True, None)
+    assert login(app, 'alan', 'turing').status_code == 302
+    assert User.query.filter_by(username='alan').one().is_admin is False
+
+
+def test_repeat_logins_reuse_connections_and_cached_lookups(app, db, directory):
+    for _ in range(5):
+        assert ldap_auth.authenticate('ada', 'lovelace')['groups'] == ['admins']
+
+    # One search connection and one bind connection; the user and group
+    # lookups happen once, but every login binds to check the password.
+    assert directory.connections == 2
+    assert directory.searches == 2
+    assert directory.binds == 1 + 5
+
+
+def test_wrong_or_empty_password_is_rejected(app, db, directory):
+    assert ldap_auth.authenticate('ada', 'wrong') is None
+    assert ldap_auth.authenticate('ada', '') is None
+    assert ldap_auth.authenticate('nobody', 'lovelace') is None
+    response = login(app, 'ada', 'wrong')
+    assert response.headers['Location'] == '/login'
+    assert User.query.filter_by(username='ada').first() is None
+
+
+def test_directory_cannot_sign_in_as_a_local_account(app, db, directory):
+    local = User(username='ada', email='ada.local@example.com', is_admin=True)
+    local.set_password('localpw')
+    db.session.add(local)
+    db.session.commit()
+
+    assert login(app, 'ada', 'lovelace').headers['Location'] == '/login'
+    assert ldap_auth.directory_user('ada', 'lovelace') is None
+    db.session.refresh(local)
+    assert (local.email, local.is_admin) == ('ada.local@example.com', True)
+    assert login(app, 'ada', 'localpw').headers['Location'] == '/'
+
+
+def test_dropped_connections_are_replaced(app, db, directory):
+    assert ldap_auth.authenticate('ada', 'lovelace')
+    directory.drop_connections()
+
+    assert ldap_auth.authenticate('ada', 'lovelace')
+    stats = app.extensions['ldap_directory'].stats()
+    assert stats['bind_pool']['discarded'] == 1
+    assert stats['bind_pool']['open'] == 1
+
+
+def test_idle_connections_are_health_checked(app, db, directory):
+    pool = app.extensions['ldap_directory'].search_pool
+    pool.health_interval = 0
+    ldap_auth.authenticate('ada', 'lovelace')
+    directory.drop_connections()
+    app.extensions['ldap_directory'].cache.ttl = 0
+
+    assert ldap_auth.authenticate('ada', 'lovelace')
+    assert pool.stats()['discarded'] == 1
+
+
+def test_unreachable_directory_fails_login_cleanly(app, db, directory):
+    directory.stop()
+    with pytest.raises(ldap_auth.LDAPUnavailable):
+        ldap_auth.authenticate('ada', 'lovelace')
+    assert login(app, 'ada', 'lovelace').headers['Location'] == '/login'
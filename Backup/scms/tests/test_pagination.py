@@ -0,0 +1,64 @@
+from datetime import date
+
+from app.models import Booking
+from app.pagination import paginate_bookings, encode_cursor, decode_cursor
+
+
+def add_bookings(db, user, dates):
+    for i, booking_date in enumerate(dates):
+        db.session.add(Booking(
+            user_id=user.id,
+            client_name=f'Client {i}',
+            email=f'client{i}@example.com',
+            mobile_number='12345678',
+            booking_date=booking_date,
+            status='pending'
+        ))
+    db.session.commit()
+
+
+def expected_order():
+    bookings = Booking.query.all()
+    dated = sorted((b for b in bookings if b.booking_date), key=lambda b: (b.booking_date, b.id), reverse=True)
+    undated = sorted((b for b in bookings if not b.booking_date), key=lambda b: b.id, reverse=True)
+    return [b.id for b in dated + undated]
+
+
+def test_cursor_round_trip():
+    token = encode_cursor(date(2024, 9, 1), 42)
+    assert decode_cursor(token) == (date(2024, 9, 1), 42)
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+    assert decode_cursor('not-a-cursor') is None
+
+
+def test_walks_every_booking_forwards_and_backwards(db, user):
+    add_bookings(db, user, ['2024-09-01', '2024-09-03', None, '2024-09-03', '2024-08-30', None, '2024-09-02'])
+    expected = expected_order()
+
+    pages = []
+    page = paginate_bookings(Booking.query, 3)
+    pages.append(page)
+    while page.has_next:
+        page = paginate_bookings(Booking.query, 3, after=page.next_cursor)
+        pages.append(page)
+    assert [b.id for p in pages for b in p.items] == expected
+    assert not pages[0].has_prev
+
+    backwards = [page]
+    while page.has_prev:
+        page = paginate_bookings(Booking.query, 3, before=page.prev_cursor)
+        backwards.append(page)
+    assert [[b.id for b in p.items] for p in backwards[::-1]] == [[b.id for b in p.items] for p in pages]
+
+
+def test_view_bookings_pages(client, db, user):
+    add_bookings(db, user, [f'2024-09-{day:02d}' for day in range(1, 6)])
+    response = client.get('/view_bookings?per_page=2')
+    assert response.status_code == 200
+    assert b'Client 4' in response.data
+    assert b'Client 2' not in response.data
+    assert b'Older' in response.data
+
+    response = client.get('/bookings/view?per_page=2')
+    assert response.status_code == 200
+    assert b'Client 4' in response.data
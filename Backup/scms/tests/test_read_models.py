@@ -0,0 +1,51 @@
+from datetime import date
+
+from app.pagination import paginate_bookings
+from app.read_models import BookingRow, booking_rows, format_booking_rows
+from app.search import search_booking_rows, search_bookings
+from app.models import Booking
+
+
+def add_booking(db, user, name, booking_date):
+    booking = Booking(user_id=user.id, client_name=name, email=f'{name.lower()}@example.com',
+                      mobile_number='07000000000', booking_date=booking_date)
+    db.session.add(booking)
+    db.session.commit()
+    return booking
+
+
+def test_rows_page_like_bookings_and_format_dates_once(db, user):
+    for i in range(5):
+        add_booking(db, user, f'Client {i}', date(2024, 9, 1 + i % 2))
+    add_booking(db, user, 'Undated', None)
+
+    first = paginate_bookings(booking_rows(Booking.user_id == user.id), 4)
+    second = paginate_bookings(booking_rows(Booking.user_id == user.id), 4, after=first.next_cursor)
+    rows = format_booking_rows(first.items + second.items, missing='N/A')
+
+    assert all(type(row) is BookingRow for row in rows)
+    assert [row.client_name for row in rows] == ['Client 3', 'Client 1', 'Client 4', 'Client 2', 'Client 0', 'Undated']
+    assert [row.booking_date for row in rows] == ['2024-09-02'] * 2 + ['2024-09-01'] * 3 + ['N/A']
+    assert rows[0].booking_date is rows[1].booking_date
+    assert format_booking_rows(second.items)[-1].training_date is None
+
+
+def test_search_rows_match_search_bookings(db, user):
+    add_booking(db, user, 'Alice Johnson', date(2024, 9, 1))
+    add_booking(db, user, 'Johnny Smith', date(2024, 9, 2))
+    for query in ('john', 'jo', 'smith'):
+        assert [row.id for row in search_booking_rows(query)] == [b.id for b in search_bookings(query)]
+
+
+def test_list_pages_render_rows(client, db, user):
+    booking = add_booking(db, user, 'Ada Lovelace', date(2024, 9, 1))
+    booking.training_date = date(2024, 10, 1)
+    db.session.commit()
+    for path in ('/view_bookings', '/bookings/view', '/bookings/search?query=lovelace'):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert b'Ada Lovelace' in response.data and b'2024-09-01' in response.data
+
+    events = client.get('/booking_calendar/events?start=2024-09-01&end=2024-11-01').json
+    assert events == [{'title': 'Ada Lovelace - pending', 'start': '2024-10-01',
+                       'url': f'/edit_booking/{booking.id}', 'color': '#ffc107'}]
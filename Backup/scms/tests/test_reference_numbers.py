@@ -0,0 +1,81 @@
+import multiprocessing
+from datetime import date
+
+from config import Config
+from app import create_app, db as _db
+from app.models import Booking, ReferenceSequence, User
+
+WORKERS = 4
+BOOKINGS_PER_WORKER = 50
+
+
+def make_booking(user, **fields):
+    return Booking(user_id=user.id, client_name='Ada', email='ada@example.com', mobile_number='1', **fields)
+
+
+def test_reference_numbers_count_up_per_booking_day(db, user):
+    bookings = [make_booking(user, booking_date=day)
+                for day in (date(2024, 9, 1), date(2024, 9, 1), date(2024, 9, 2), date(2024, 9, 1))]
+    db.session.add_all(bookings)
+    db.session.commit()
+
+    assert [b.reference_number for b in bookings] == [
+        '20240901-0001', '20240901-0002', '20240902-0001', '20240901-0003']
+    assert Booking.generate_reference_number(date(2024, 9, 2)) == '20240902-0002'
+
+
+def test_rolled_back_numbers_are_reused_without_gaps(db, user):
+    db.session.add(make_booking(user, booking_date=date(2024, 9, 1)))
+    db.session.flush()
+    db.session.rollback()
+    assert db.session.get(ReferenceSequence, date(2024, 9, 1)) is None
+
+    db.session.add(make_booking(user, booking_date=date(2024, 9, 1)))
+    db.session.add(make_booking(user, booking_date=date(2024, 9, 1)))
+    db.session.commit()
+    numbers = sorted(b.reference_number for b in Booking.query)
+    assert numbers == ['20240901-0001', '20240901-0002']
+    assert db.session.get(ReferenceSequence, date(2024, 9, 1)).last_value == 2
+
+
+def create_bookings(database_uri, user_id, count):
+    class WorkerConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+
+    app = create_app(WorkerConfig)
+    with app.app_context():
+        for i in range(count):
+            _db.session.add(Booking(user_id=user_id, client_name=f'Client {i}', email='c@example.com',
+                                    mobile_number='1', booking_date=date.today()))
+            _db.session.commit()
+
+
+def test_concurrent_processes_never_collide(tmp_path):
+    database_uri = f"sqlite:///{tmp_path / 'stress.db'}"
+
+    class StressConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+
+    app = create_app(StressConfig)
+    with app.app_context():
+        _db.create_all()
+        user = User(username='admin', email='admin@example.com')
+        _db.session.add(user)
+        _db.session.commit()
+        user_id = user.id
+        _db.engine.dispose()
+
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=create_bookings, args=(database_uri, user_id, BOOKINGS_PER_WORKER))
+                 for _ in range(WORKERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    assert [process.exitcode for process in processes] == [0] * WORKERS
+
+    with app.app_context():
+        numbers = [number for (number,) in _db.session.query(Booking.reference_number)]
+        total = WORKERS * BOOKINGS_PER_WORKER
+        assert len(numbers) == len(set(numbers)) == total
+        assert _db.session.get(ReferenceSequence, date.today()).last_value == total
@@ -0,0 +1,68 @@
+from datetime import date
+
+from app.models import Booking
+from app.search import search_bookings, rebuild_search_index
+
+
+def add_booking(db, user, **fields):
+    values = dict(user_id=user.id, client_name='Client', email='client@example.com',
+                  mobile_number='12345678', status='pending')
+    values.update(fields)
+    booking = Booking(**values)
+    db.session.add(booking)
+    db.session.commit()
+    return booking
+
+
+def test_substring_search_uses_index(db, user):
+    alice = add_booking(db, user, client_name='Alice Johnson', organization_name='Acme Training')
+    add_booking(db, user, client_name='Bob Stone', email='bob@stone.org')
+    assert search_bookings('johns') == [alice]
+    assert search_bookings('acme') == [alice]
+    assert [b.client_name for b in search_bookings('stone')] == ['Bob Stone']
+    assert search_bookings('nobody') == []
+
+
+def test_index_follows_updates_and_deletes(db, user):
+    booking = add_booking(db, user, client_name='Carol King')
+    booking.client_name = 'Carol Queen'
+    db.session.commit()
+    assert search_bookings('king') == []
+    assert search_bookings('queen') == [booking]
+
+    Booking.query.filter_by(id=booking.id).update({'status': 'completed'})
+    db.session.commit()
+    assert search_bookings('completed') == [booking]
+
+    db.session.delete(booking)
+    db.session.commit()
+    assert search_bookings('queen') == []
+
+
+def test_numeric_query_matches_id_and_limit(db, user):
+    bookings = [add_booking(db, user, mobile_number=f'5550{i:03d}') for i in range(5)]
+    assert len(search_bookings('5550', limit=3)) == 3
+    assert search_bookings(str(bookings[2].id))[0] == bookings[2]
+
+
+def test_reference_number_search(db, user):
+    first = add_booking(db, user, booking_date=date(2024, 9, 1))
+    second = add_booking(db, user, booking_date=date(2024, 9, 1))
+    assert search_bookings(second.reference_number) == [second]
+    assert search_bookings('20240901')[:2] == [second, first]
+    assert search_bookings('0901-0001') == [first]
+
+
+def test_rebuild_and_search_route(client, db, user):
+    add_booking(db, user, client_name='Dana Scully')
+    assert rebuild_search_index() == 1
+    response = client.get('/bookings/search?query=scull')
+    assert response.status_code == 200
+    assert b'Dana Scully' in response.data
+
+
+def test_whole_name_matches_rank_first(db, user):
+    add_booking(db, user, client_name='Ann Smithson', email='ann@example.com')
+    exact = add_booking(db, user, client_name='Smith')
+    add_booking(db, user, client_name='Joe Bloggs', email='joe@smithfield.com')
+    assert search_bookings('smith')[0] == exact
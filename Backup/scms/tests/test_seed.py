@@ -0,0 +1,50 @@
+import importlib.util
+import os
+
+from flask import g
+from sqlalchemy import func
+
+from app.models import Booking, BookingDailyStats, Certificate, Post, User, UserLog
+from app.seed import SEED_PASSWORD, seed_database
+
+
+def test_seed_fills_every_table_consistently(app, db):
+    added = seed_database(300, seed=7)
+    assert added['users'] == User.query.count() == 10
+    # Every seeded account shares SEED_PASSWORD, so none of them may be an admin.
+    assert User.query.filter_by(is_admin=True).count() == 0
+    assert added['bookings'] == Booking.query.count() == 300
+    assert added['posts'] == Post.query.count() == 15
+    assert added['logs'] == UserLog.query.count() == 300
+    assert added['certificates'] == Certificate.query.count() > 0
+
+    assert db.session.query(func.count(func.distinct(Booking.reference_number))).scalar() == 300
+    assert db.session.query(func.sum(BookingDailyStats.bookings)).scalar() == 300
+    assert Booking.query.filter(Booking.booking_date.is_(None)).count() == 0
+
+    seeded = User.query.filter_by(username='seed0').one()
+    g.pop('_login_user', None)
+    client = app.test_client()
+    client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    response = client.post('/login', data={'username': seeded.username, 'password': SEED_PASSWORD})
+    assert response.headers['Location'] == '/'
+
+
+def test_seed_command_is_repeatable_and_adds_to_existing_data(app, db):
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['seed', '--bookings', '200', '--seed', '3'])
+    assert '200 bookings' in result.output
+    first = [b.client_name for b in Booking.query.order_by(Booking.id)]
+
+    runner.invoke(args=['seed', '--bookings', '200', '--seed', '3'])
+    second = [b.client_name for b in Booking.query.order_by(Booking.id)][200:]
+    assert second == first
+    assert User.query.count() == 20
+
+
+def test_route_benchmark_covers_every_route(app):
+    path = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'bench_routes.py')
+    spec = importlib.util.spec_from_file_location('bench_routes', path)
+    bench_routes = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench_routes)
+    assert bench_routes.uncovered(app) == []
@@ -0,0 +1,62 @@
+from flask import g, jsonify
+
+from app.models import Post, User
+from app.sql_profile import statement_shape
+
+
+def test_statement_shape_folds_literals_and_in_lists():
+    assert statement_shape("SELECT * FROM user WHERE id = 7 AND name = 'o''brien'") == \
+        'SELECT * FROM user WHERE id = ? AND name = ?'
+    assert statement_shape('SELECT anon_1.id FROM booking WHERE id IN (?, ?,\n ?) LIMIT ?') == \
+        statement_shape('SELECT anon_1.id FROM booking WHERE id IN (?) LIMIT ?')
+
+
+def test_admins_get_server_timing_and_n_plus_one_is_flagged(app, db, user, caplog):
+    @app.route('/test/post_authors')
+    def post_authors():
+        # Touches post.author per row, the pattern the profiler should catch.
+        return jsonify([post.author.username for post in Post.query.order_by(Post.id)])
+
+    for i in range(12):
+        author = User(username=f'author{i}', email=f'author{i}@example.com')
+        db.session.add(Post(title=f'Post {i}', content='...', author=author))
+    db.session.commit()
+    db.session.remove()
+
+    client = app.test_client()
+    client.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    anonymous = client.get('/test/post_authors')
+    assert len(anonymous.json) == 12 and 'Server-Timing' not in anonymous.headers
+
+    client.post('/login', data={'username': 'admin', 'password': 'secret'})
+    caplog.clear()
+    response = client.get('/test/post_authors')
+    timing = response.headers.getlist('Server-Timing')
+    assert timing[0].startswith('db;dur=') and timing[0].endswith('desc="13 queries"')
+    assert timing[1].startswith('app;dur=')
+    assert 'Possible N+1 in post_authors: 12 runs of SELECT user.' in caplog.text
+
+    ranked = app.extensions['sql_profile'].ranked()
+    row = next(r for r in ranked if r['endpoint'] == 'post_authors')
+    assert (row['requests'], row['max_queries'], row['n_plus_one']) == (2, 13, 2)
+    assert row['repeated'][0][0] == 12
+
+
+def test_profile_page_ranks_endpoints_for_admins_only(app, client, db, user):
+    client.get('/statistics')
+    page = client.get('/sql_profile')
+    assert page.status_code == 200
+    assert b'main.statistics' in page.data and b'main.login' in page.data
+
+    assert client.post('/sql_profile').status_code == 302
+    assert b'main.statistics' not in client.get('/sql_profile').data
+
+    staff = User(username='staff', email='staff@example.com')
+    staff.set_password('secret')
+    db.session.add(staff)
+    db.session.commit()
+    g.pop('_login_user', None)
+    other = app.test_client()
+    other.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    other.post('/login', data={'username': 'staff', 'password': 'secret'})
+    assert other.get('/sql_profile').status_code == 403
@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+
+from app import jobs
+from app.models import Booking, Job, TaskLock, UserLog
+from app.tasks import sweep_booking_statuses
+
+
+def add_bookings(db, user, statuses, days_ago):
+    for status in statuses:
+        db.session.add(Booking(user_id=user.id, client_name='Client', email='c@example.com', mobile_number='1',
+                               training_date=date.today() - timedelta(days=days_ago), status=status))
+    db.session.commit()
+
+
+def status_counts(db):
+    return dict(db.session.query(Booking.status, db.func.count()).group_by(Booking.status).all())
+
+
+def test_sweep_updates_overdue_bookings_in_chunks(db, user):
+    add_bookings(db, user, ['pending'] * 3 + ['approved'] * 2 + ['cancelled'], days_ago=1)
+    add_bookings(db, user, ['pending'], days_ago=-1)
+
+    assert sweep_booking_statuses(chunk_size=2) == (5, 3)
+    assert status_counts(db) == {'completed': 5, 'cancelled': 1, 'pending': 1}
+    assert sweep_booking_statuses(chunk_size=0) == (0, 1)
+
+
+def test_sweep_refreshes_dashboard_snapshot(app, db, user):
+    add_bookings(db, user, ['pending'], days_ago=1)
+    snapshot = app.extensions['dashboard_snapshot']
+    assert snapshot.get()['status_counts'] == {'pending': 1}
+
+    sweep_booking_statuses()
+    assert snapshot.get()['status_counts'] == {'completed': 1}
+
+
+def test_sweep_skips_while_another_run_holds_the_lock(db, user):
+    add_bookings(db, user, ['pending'], days_ago=1)
+    assert jobs.acquire_lock('update_booking_statuses', 'other-host', 60)
+
+    job = jobs.enqueue('update_booking_statuses')
+    jobs.work('worker', burst=True)
+    assert db.session.get(Job, job.id).result == {'skipped': True}
+    assert status_counts(db) == {'pending': 1}
+
+
+def test_schedule_enqueues_once_per_interval_across_workers(app, db):
+    app.config['STATUS_SWEEP_INTERVAL'] = 3600
+    assert [job.name for job in jobs.enqueue_due('worker-a')] == ['update_booking_statuses']
+    assert jobs.enqueue_due('worker-b') == []
+    assert jobs.enqueue_due('worker-a') == []
+
+    lock = db.session.get(TaskLock, 'schedule:update_booking_statuses')
+    lock.expires_at = lock.expires_at - timedelta(hours=2)
+    db.session.commit()
+    assert len(jobs.enqueue_due('worker-b')) == 1
+
+
+def test_sweep_writes_one_aggregated_user_log(app, db, user):
+    app.config['STATUS_SWEEP_LOG_USER'] = user.username
+    add_bookings(db, user, ['pending'] * 4, days_ago=1)
+
+    jobs.enqueue('update_booking_statuses')
+    jobs.work('worker', burst=True)
+    logs = UserLog.query.all()
+    assert [(log.action, log.details) for log in logs] == [
+        ('booking_status_sweep', 'Marked 4 overdue bookings as completed')
+    ]
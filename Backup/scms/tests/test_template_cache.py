@@ -0,0 +1,68 @@
+from flask import g, render_template_string
+
+from config import Config
+from app import create_app
+from app.models import Booking, Post
+from app.template_cache import invalidate_fragments
+
+TEMPLATE = "{% cache 'posts', depends='post', vary=role %}{{ render() }}{% endcache %}"
+
+
+def test_fragments_are_reused_per_vary_value_until_a_commit_touches_their_table(app, db, user):
+    renders = []
+
+    def render():
+        renders.append(1)
+        return f'render {len(renders)}'
+
+    def page(role='staff'):
+        with app.test_request_context():
+            return render_template_string(TEMPLATE, render=render, role=role)
+
+    assert page() == 'render 1'
+    assert page() == 'render 1'
+    assert page('admin') == 'render 2'
+
+    db.session.add(Booking(user_id=user.id, client_name='Ada', email='ada@example.com', mobile_number='1'))
+    db.session.commit()
+    assert page() == 'render 1'
+
+    db.session.add(Post(title='News', content='...', author_id=user.id))
+    db.session.commit()
+    assert page() == 'render 3'
+
+    invalidate_fragments()
+    assert page('admin') == 'render 4'
+
+    stats = app.extensions['fragment_cache'].stats()
+    assert stats['fragments']['posts']['hits'] == 2
+    assert stats['fragments']['posts']['misses'] == 4
+    assert stats['hit_rate'] == 0.333
+
+
+def test_navigation_is_cached_per_role(app, client, db, user):
+    assert b'Manual Backup' in client.get('/statistics').data
+
+    g.pop('_login_user', None)
+    anonymous = app.test_client()
+    anonymous.environ_base['HTTP_X_FORWARDED_PROTO'] = 'https'
+    login_page = anonymous.get('/login').data
+    assert b'Manual Backup' not in login_page and b'>Login<' in login_page
+
+    g.pop('_login_user', None)
+    stats = client.get('/template_cache').json
+    assert stats['fragments']['fragments']['nav']['misses'] == 2
+    assert stats['fragments']['fragments']['statistics.top_clients']['misses'] == 1
+
+
+def test_compiled_templates_are_shared_through_the_bytecode_directory(tmp_path):
+    class CachedConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        JINJA_BYTECODE_CACHE_DIR = str(tmp_path)
+
+    first, second = create_app(CachedConfig), create_app(CachedConfig)
+    first.jinja_env.get_template('auth/login.html')
+    second.jinja_env.get_template('auth/login.html')
+    assert first.jinja_env.bytecode_cache.misses > 0
+    assert second.jinja_env.bytecode_cache.misses == 0
+    assert second.jinja_env.bytecode_cache.hits == first.jinja_env.bytecode_cache.misses